@@ -1,6 +1,8 @@
 ﻿import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", "dev-secret")
@@ -60,6 +62,9 @@ if USE_SQLITE or DB_ENGINE in ("sqlite", "sqlite3"):
         "default": {
             "ENGINE": "django.db.backends.sqlite3",
             "NAME": sqlite_path,
+            # SQLite ignores select_for_update; taking the write lock at BEGIN (and waiting for it)
+            # keeps read-then-write transactions such as class bookings serialized.
+            "OPTIONS": {"transaction_mode": "IMMEDIATE", "timeout": 20},
         }
     }
 else:
@@ -74,15 +79,103 @@ else:
         }
     }
 
+# Must be shared by every process (gunicorn workers and the run_jobs worker): ETag versions,
+# role/tenancy caches and the platform catalog and AI context stamps are invalidated through it.
+# The default is a table in the main database (`manage.py createcachetable`); Redis or Memcached
+# also work via DJANGO_CACHE_BACKEND/DJANGO_CACHE_LOCATION. A process-local backend (LocMemCache)
+# switches those caches off instead of serving stale data (studio/modules/core/cache.py).
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", "studio_cache"),
+    }
+}
+
+# Seconds a user's group names stay cached across requests (0, or a process-local cache, keeps
+# the lookup per request only).
+STUDIO_ROLE_CACHE_TIMEOUT = int(os.getenv("STUDIO_ROLE_CACHE_TIMEOUT", "300"))
+# Seconds PlatformSetting and the active subscription plans stay in the shared cache (version-stamped on
+# writes; off with a process-local cache).
+STUDIO_PLATFORM_CATALOG_CACHE_TIMEOUT = int(os.getenv("STUDIO_PLATFORM_CATALOG_CACHE_TIMEOUT", "3600"))
+# Seconds a worker trusts its in-process copy before re-checking the shared version stamp.
+STUDIO_PLATFORM_CATALOG_LOCAL_SECONDS = float(os.getenv("STUDIO_PLATFORM_CATALOG_LOCAL_SECONDS", "5"))
+# Seconds a verified SSO access token maps to its identity, capped by the token's own expiry.
+STUDIO_SSO_TOKEN_CACHE_TIMEOUT = int(os.getenv("STUDIO_SSO_TOKEN_CACHE_TIMEOUT", "300"))
+# Browser/proxy freshness of the public marketplace listing (revalidated with ETag afterwards).
+STUDIO_MARKETPLACE_MAX_AGE = int(os.getenv("STUDIO_MARKETPLACE_MAX_AGE", "60"))
+# Seconds a rendered marketplace page stays cached server side (keys change with every marketplace write).
+STUDIO_MARKETPLACE_CACHE_TIMEOUT = int(os.getenv("STUDIO_MARKETPLACE_CACHE_TIMEOUT", "600"))
+# Seconds the owned-organization set of a user stays cached (invalidated on membership writes;
+# 0, or a process-local cache, keeps it per request).
+STUDIO_TENANCY_CACHE_TIMEOUT = int(os.getenv("STUDIO_TENANCY_CACHE_TIMEOUT", "300"))
+# Seconds writes are coalesced before the dashboard snapshot refresh job runs.
+STUDIO_DASHBOARD_REFRESH_DELAY = int(os.getenv("STUDIO_DASHBOARD_REFRESH_DELAY", "30"))
+# Age after which serving a dashboard snapshot also queues a refresh.
+STUDIO_DASHBOARD_SNAPSHOT_MAX_AGE = int(os.getenv("STUDIO_DASHBOARD_SNAPSHOT_MAX_AGE", "900"))
+# Minimum age of the analytics rollups before a query queues an incremental refresh.
+STUDIO_ANALYTICS_REFRESH_INTERVAL = int(os.getenv("STUDIO_ANALYTICS_REFRESH_INTERVAL", "300"))
+# Seconds re-scanned behind each rollup watermark, covering transactions that committed late.
+STUDIO_ANALYTICS_WATERMARK_OVERLAP = int(os.getenv("STUDIO_ANALYTICS_WATERMARK_OVERLAP", "300"))
+# Longest date range (days) one analytics query may cover.
+STUDIO_ANALYTICS_MAX_DAYS = int(os.getenv("STUDIO_ANALYTICS_MAX_DAYS", "731"))
+# Where instructor metrics come from: "table" (materialized monthly rows) or "aggregate" (one ORM query).
+STUDIO_INSTRUCTOR_METRICS_SOURCE = os.getenv("STUDIO_INSTRUCTOR_METRICS_SOURCE", "table")
+# TTL of the cached AI assistant business context sections (0, or a process-local cache, disables it).
+STUDIO_AI_CONTEXT_CACHE_TIMEOUT = int(os.getenv("STUDIO_AI_CONTEXT_CACHE_TIMEOUT", "300"))
+# How long an AI answer can be reused for the same question and context (0 disables the answer cache).
+STUDIO_AI_ANSWER_CACHE_TIMEOUT = int(os.getenv("STUDIO_AI_ANSWER_CACHE_TIMEOUT", "3600"))
+# Trigram similarity (0-1) for reusing answers to near-identical questions; 0 keeps exact matches only.
+STUDIO_AI_ANSWER_CACHE_SIMILARITY = float(os.getenv("STUDIO_AI_ANSWER_CACHE_SIMILARITY", "0"))
+# Approximate token budget (~4 bytes per token) for the business context sent to each AI provider.
+STUDIO_AI_CONTEXT_TOKEN_BUDGETS = {
+    "openai": int(os.getenv("STUDIO_AI_CONTEXT_TOKENS_OPENAI", "6000")),
+    "gemini": int(os.getenv("STUDIO_AI_CONTEXT_TOKENS_GEMINI", "6000")),
+    "ollama": int(os.getenv("STUDIO_AI_CONTEXT_TOKENS_OLLAMA", "2000")),
+}
+# Background jobs (run by `manage.py run_jobs`); eager mode runs them right after commit, in-process.
+STUDIO_JOBS_EAGER = os.getenv("STUDIO_JOBS_EAGER", "0") == "1"
+STUDIO_JOB_MAX_ATTEMPTS = int(os.getenv("STUDIO_JOB_MAX_ATTEMPTS", "5"))
+STUDIO_JOB_RETRY_BASE_SECONDS = int(os.getenv("STUDIO_JOB_RETRY_BASE_SECONDS", "10"))
+STUDIO_JOB_LOCK_TIMEOUT = int(os.getenv("STUDIO_JOB_LOCK_TIMEOUT", "600"))
+# Shared outbound HTTP client (studio/modules/core/http_client.py): pools, timeouts, breaker, retry budget.
+STUDIO_HTTP_TIMEOUT = float(os.getenv("STUDIO_HTTP_TIMEOUT", "10"))
+STUDIO_HTTP_CONNECT_TIMEOUT = float(os.getenv("STUDIO_HTTP_CONNECT_TIMEOUT", "5"))
+STUDIO_HTTP_MAX_CONNECTIONS = int(os.getenv("STUDIO_HTTP_MAX_CONNECTIONS", "50"))
+STUDIO_HTTP_KEEPALIVE_SECONDS = float(os.getenv("STUDIO_HTTP_KEEPALIVE_SECONDS", "60"))
+STUDIO_HTTP_BREAKER_THRESHOLD = int(os.getenv("STUDIO_HTTP_BREAKER_THRESHOLD", "5"))
+STUDIO_HTTP_BREAKER_COOLDOWN = float(os.getenv("STUDIO_HTTP_BREAKER_COOLDOWN", "30"))
+STUDIO_HTTP_RETRY_BUDGET_RATIO = float(os.getenv("STUDIO_HTTP_RETRY_BUDGET_RATIO", "0.2"))
+STUDIO_HTTP_RETRY_BUDGET_MAX = float(os.getenv("STUDIO_HTTP_RETRY_BUDGET_MAX", "10"))
+# Read timeout for AI provider calls (sync and streaming).
+STUDIO_AI_HTTP_TIMEOUT = float(os.getenv("STUDIO_AI_HTTP_TIMEOUT", "60"))
+
 LANGUAGE_CODE = "en-us"
 TIME_ZONE = "UTC"
 USE_I18N = True
 USE_TZ = True
 
 STATIC_URL = "static/"
+
+# Uploaded files (organization logos). Swap the default storage backend for S3 or similar via env.
+MEDIA_URL = os.getenv("DJANGO_MEDIA_URL", "/media/")
+MEDIA_ROOT = os.getenv("DJANGO_MEDIA_ROOT", str(BASE_DIR / "media"))
+STORAGES = {
+    "default": {"BACKEND": os.getenv("DJANGO_DEFAULT_STORAGE", "django.core.files.storage.FileSystemStorage")},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
+# Largest accepted logo upload and the edge of its generated thumbnail, in pixels.
+STUDIO_LOGO_MAX_BYTES = int(os.getenv("STUDIO_LOGO_MAX_BYTES", "2000000"))
+STUDIO_LOGO_THUMBNAIL_SIZE = int(os.getenv("STUDIO_LOGO_THUMBNAIL_SIZE", "256"))
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CORS_ALLOW_ALL_ORIGINS = True
+# Let the SPA revalidate read endpoints itself (If-None-Match) and read the validators back.
+CORS_ALLOW_HEADERS = (*default_headers, "if-none-match")
+CORS_EXPOSE_HEADERS = ("ETag", "Last-Modified")
+
+# Opt-in keyset pagination (?page_size= / ?cursor=) on large list endpoints.
+STUDIO_PAGE_SIZE = int(os.getenv("STUDIO_PAGE_SIZE", "100"))
+STUDIO_MAX_PAGE_SIZE = int(os.getenv("STUDIO_MAX_PAGE_SIZE", "500"))
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
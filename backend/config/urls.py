@@ -1,8 +1,11 @@
-﻿from django.contrib import admin
+﻿from django.conf import settings
+from django.contrib import admin
 from django.http import JsonResponse
-from django.urls import include, path
+from django.urls import include, path, re_path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
+from studio.modules.core.media import LOGO_PATH_PATTERN, serve_logo, serve_media
+
 
 def health(request):
     return JsonResponse({"status": "ok", "service": "backend"})
@@ -15,3 +18,11 @@ urlpatterns = [
     path("api/auth/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("api/", include("studio.urls")),
 ]
+
+# With local storage Django serves the content-hashed logos itself (raster only, cached for a
+# year) and, in development only, the rest of MEDIA_ROOT. With a CDN/S3 MEDIA_URL is absolute.
+if settings.MEDIA_URL.startswith("/"):
+    media_prefix = settings.MEDIA_URL.strip("/")
+    urlpatterns.append(re_path(rf"^{media_prefix}/(?P<path>{LOGO_PATH_PATTERN})$", serve_logo))
+    if settings.DEBUG:
+        urlpatterns.append(re_path(rf"^{media_prefix}/(?P<path>.*)$", serve_media))
@@ -3,11 +3,16 @@
 from .models import (
     AIAssistantConfig,
     AIAssistantInteraction,
+    AIContextSnapshot,
+    BackgroundJob,
+    ClassBooking,
     DashboardSnapshot,
     Establishment,
+    InstructorMonthlyMetrics,
     InstructorProfile,
     InstructorSettlement,
     Invoice,
+    MarketplaceListing,
     MembershipPlan,
     Organization,
     OrganizationMembership,
@@ -15,6 +20,7 @@ from .models import (
     PlatformSetting,
     PlatformSubscriptionPlan,
     Room,
+    RollupWatermark,
     SocialAccount,
     SocialCampaign,
     SocialPost,
@@ -34,11 +40,24 @@ class AIAssistantConfigAdmin(admin.ModelAdmin):
 
 @admin.register(AIAssistantInteraction)
 class AIAssistantInteractionAdmin(admin.ModelAdmin):
-    list_display = ("id", "organization", "user", "provider", "model", "status", "created_at")
-    list_filter = ("provider", "status")
+    list_display = ("id", "organization", "user", "provider", "model", "status", "cache_status", "created_at")
+    list_filter = ("provider", "status", "cache_status")
     search_fields = ("organization__name", "user__username", "question", "answer")
 
 
+@admin.register(AIContextSnapshot)
+class AIContextSnapshotAdmin(admin.ModelAdmin):
+    list_display = ("id", "organization", "digest", "size_bytes", "created_at")
+    search_fields = ("organization__name", "digest")
+
+
+@admin.register(BackgroundJob)
+class BackgroundJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "queue", "status", "attempts", "max_attempts", "run_at", "organization", "created_at")
+    list_filter = ("status", "queue", "name")
+    search_fields = ("name", "idempotency_key", "last_error")
+
+
 @admin.register(Organization)
 class OrganizationAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "subscription_plan", "subscription_status", "subscription_enabled", "is_active", "created_at")
@@ -53,6 +72,13 @@ class EstablishmentAdmin(admin.ModelAdmin):
     list_filter = ("organization", "is_active")
 
 
+@admin.register(MarketplaceListing)
+class MarketplaceListingAdmin(admin.ModelAdmin):
+    list_display = ("id", "name", "organization", "city", "subscription_plan", "updated_at")
+    search_fields = ("name", "city", "search_cities")
+    readonly_fields = ("updated_at",)
+
+
 @admin.register(Room)
 class RoomAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "establishment", "capacity", "is_active")
@@ -62,9 +88,28 @@ class RoomAdmin(admin.ModelAdmin):
 
 @admin.register(StudioClass)
 class StudioClassAdmin(admin.ModelAdmin):
-    list_display = ("id", "name", "organization", "establishment", "instructor", "start_at", "status")
+    list_display = (
+        "id",
+        "name",
+        "organization",
+        "establishment",
+        "instructor",
+        "start_at",
+        "status",
+        "capacity",
+        "booked_count",
+        "waitlist_count",
+    )
     list_filter = ("organization", "establishment", "status")
     search_fields = ("name", "instructor__username")
+    readonly_fields = ("booked_count", "waitlist_count")
+
+
+@admin.register(ClassBooking)
+class ClassBookingAdmin(admin.ModelAdmin):
+    list_display = ("id", "studio_class", "student", "status", "created_at", "canceled_at")
+    list_filter = ("status", "organization")
+    search_fields = ("studio_class__name", "student__first_name", "student__last_name")
 
 
 @admin.register(InstructorProfile)
@@ -105,6 +150,23 @@ class InstructorSettlementAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(InstructorMonthlyMetrics)
+class InstructorMonthlyMetricsAdmin(admin.ModelAdmin):
+    list_display = (
+        "id",
+        "organization",
+        "instructor",
+        "period_year",
+        "period_month",
+        "total_classes",
+        "assigned_hours",
+        "completed_hours",
+        "updated_at",
+    )
+    list_filter = ("organization", "period_year", "period_month")
+    search_fields = ("organization__name", "instructor__username", "instructor__email")
+
+
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ("id", "first_name", "last_name", "organization", "user", "auth_provider", "current_level", "is_active")
@@ -199,7 +261,13 @@ class UserProfileAdmin(admin.ModelAdmin):
 
 @admin.register(DashboardSnapshot)
 class DashboardSnapshotAdmin(admin.ModelAdmin):
-    list_display = ("id", "generated_at")
+    list_display = ("id", "scope", "organization", "generated_at")
+    search_fields = ("scope", "organization__name")
+
+
+@admin.register(RollupWatermark)
+class RollupWatermarkAdmin(admin.ModelAdmin):
+    list_display = ("id", "source", "value", "updated_at")
 
 
 @admin.register(OrganizationMembership)
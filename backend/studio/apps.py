@@ -4,3 +4,19 @@
 class StudioConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "studio"
+
+    def ready(self):
+        from studio.modules.analytics import signals as analytics_signals  # noqa: F401
+        from studio.modules.assistant import signals as assistant_signals  # noqa: F401
+        from studio.modules.bookings import signals as bookings_signals  # noqa: F401
+        from studio.modules.classes import signals as classes_signals  # noqa: F401
+        from studio.modules.core import signals as core_signals  # noqa: F401
+        from studio.modules.dashboard import signals as dashboard_signals  # noqa: F401
+        from studio.modules.users import signals as users_signals  # noqa: F401
+
+        # Job handlers register themselves on import.
+        from studio.modules.analytics import jobs as analytics_jobs  # noqa: F401
+        from studio.modules.assistant import jobs as assistant_jobs  # noqa: F401
+        from studio.modules.classes import jobs as classes_jobs  # noqa: F401
+        from studio.modules.dashboard import jobs as dashboard_jobs  # noqa: F401
+        from studio.modules.payments import jobs as payments_jobs  # noqa: F401
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from studio.models import Organization
+from studio.modules.core.media import backfill_logo_thumbnail
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera las miniaturas faltantes de los logos de organizacion (los migrados desde base64 no "
+        "tienen) y actualiza el marketplace. Es idempotente: solo procesa logos sin miniatura."
+    )
+
+    def handle(self, *args, **options):
+        created = failed = 0
+        for organization in Organization.objects.exclude(logo="").filter(logo_thumbnail="").iterator(chunk_size=50):
+            try:
+                backfill_logo_thumbnail(organization)
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"Organizacion {organization.id}: {exc}")
+                continue
+            created += 1
+        self.stdout.write(self.style.SUCCESS(f"Miniaturas generadas: {created}, con error: {failed}"))
@@ -0,0 +1,205 @@
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from studio.models import (
+    Establishment,
+    InstructorProfile,
+    Organization,
+    Payment,
+    Room,
+    Student,
+    StudentHistory,
+    StudioClass,
+)
+
+User = get_user_model()
+
+BENCHMARK_ORG_NAME = "Benchmark Studio"
+BENCHMARKED_MODELS = (StudioClass, Payment, StudentHistory)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Siembra un dataset grande (opcional) y muestra planes EXPLAIN y tiempos de las consultas "
+        "calientes de clases, pagos e historial, con y sin los indices de studio."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seed", action="store_true", help="Crea/recrea el dataset de benchmark")
+        parser.add_argument("--classes", type=int, default=50_000)
+        parser.add_argument("--payments", type=int, default=50_000)
+        parser.add_argument("--history", type=int, default=20_000)
+        parser.add_argument("--repeat", type=int, default=5, help="Repeticiones por consulta para medir tiempo")
+        parser.add_argument("--compare", action="store_true", help="Repite el analisis sin indices (rollback al final)")
+        parser.add_argument("--cleanup", action="store_true", help="Elimina el dataset de benchmark y termina")
+
+    def handle(self, *args, **options):
+        if options["cleanup"]:
+            Organization.objects.filter(name=BENCHMARK_ORG_NAME).delete()
+            User.objects.filter(username__startswith="bench_instructor_").delete()
+            self.stdout.write(self.style.SUCCESS("Dataset de benchmark eliminado"))
+            return
+
+        if options["seed"]:
+            self._seed(options["classes"], options["payments"], options["history"])
+
+        organization = Organization.objects.filter(name=BENCHMARK_ORG_NAME).first()
+        if not organization:
+            self.stderr.write("No hay dataset de benchmark. Ejecuta con --seed.")
+            return
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"== Con indices ({connection.vendor})"))
+        self._report(organization, options["repeat"])
+
+        if options["compare"]:
+            # A fresh connection avoids reusing statements prepared against the indexed schema.
+            connection.close()
+            try:
+                with transaction.atomic():
+                    self._drop_indexes()
+                    self.stdout.write(self.style.MIGRATE_HEADING("== Sin indices de studio"))
+                    self._report(organization, options["repeat"])
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    def _queries(self, organization):
+        room = Room.objects.filter(establishment__organization=organization).order_by("id").first()
+        instructor_id = (
+            StudioClass.objects.filter(organization=organization, instructor__isnull=False)
+            .values_list("instructor_id", flat=True)
+            .first()
+        )
+        student = Student.objects.filter(organization=organization).order_by("id").first()
+        window_start = timezone.now() + timedelta(days=30)
+        window_end = window_start + timedelta(hours=1)
+        scheduled = StudioClass.objects.filter(status=StudioClass.STATUS_SCHEDULED)
+        return [
+            (
+                "clases por organizacion (listado)",
+                StudioClass.objects.filter(organization=organization).order_by("start_at", "id")[:100],
+            ),
+            (
+                "solapamiento por salon",
+                scheduled.filter(room=room, start_at__lt=window_end, end_at__gt=window_start),
+            ),
+            (
+                "solapamiento por instructor",
+                scheduled.filter(instructor_id=instructor_id, start_at__lt=window_end, end_at__gt=window_start),
+            ),
+            (
+                "pagos por organizacion/estado/tipo",
+                Payment.objects.filter(
+                    organization=organization,
+                    status=Payment.STATUS_APPROVED,
+                    payment_type=Payment.TYPE_MEMBERSHIP,
+                ).order_by("-created_at")[:100],
+            ),
+            (
+                "historial de alumno",
+                StudentHistory.objects.filter(student=student).order_by("-created_at")[:50],
+            ),
+        ]
+
+    def _report(self, organization, repeat):
+        for label, queryset in self._queries(organization):
+            elapsed = []
+            for _ in range(max(1, repeat)):
+                started = time.perf_counter()
+                list(queryset.all())
+                elapsed.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(self.style.SUCCESS(f"-- {label}: mejor {min(elapsed):.2f} ms"))
+            self.stdout.write(queryset.explain())
+
+    def _drop_indexes(self):
+        with connection.cursor() as cursor:
+            for model in BENCHMARKED_MODELS:
+                for index in model._meta.indexes:
+                    cursor.execute(f"DROP INDEX {connection.ops.quote_name(index.name)}")
+
+    def _seed(self, classes_total, payments_total, history_total):
+        Organization.objects.filter(name=BENCHMARK_ORG_NAME).delete()
+        User.objects.filter(username__startswith="bench_instructor_").delete()
+
+        organization = Organization.objects.create(name=BENCHMARK_ORG_NAME, is_active=True)
+        establishment = Establishment.objects.create(organization=organization, name="Sede benchmark")
+        rooms = [
+            Room.objects.create(establishment=establishment, name=f"Salon {index}", capacity=12)
+            for index in range(10)
+        ]
+        instructors = [User.objects.create(username=f"bench_instructor_{index}") for index in range(20)]
+        InstructorProfile.objects.bulk_create(
+            [InstructorProfile(organization=organization, user=instructor) for instructor in instructors]
+        )
+        students = Student.objects.bulk_create(
+            [Student(organization=organization, first_name="Alumno", last_name=str(index)) for index in range(200)]
+        )
+
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        statuses = (StudioClass.STATUS_SCHEDULED, StudioClass.STATUS_COMPLETED, StudioClass.STATUS_CANCELED)
+        StudioClass.objects.bulk_create(
+            (
+                StudioClass(
+                    organization=organization,
+                    establishment=establishment,
+                    room=rooms[index % len(rooms)],
+                    instructor=instructors[index % len(instructors)],
+                    name=f"Clase {index}",
+                    start_at=now + timedelta(hours=index - classes_total // 2),
+                    end_at=now + timedelta(hours=index - classes_total // 2, minutes=50),
+                    capacity=10,
+                    status=statuses[index % len(statuses)],
+                )
+                for index in range(classes_total)
+            ),
+            batch_size=2000,
+        )
+
+        payment_statuses = (Payment.STATUS_APPROVED, Payment.STATUS_PENDING, Payment.STATUS_REJECTED)
+        payment_types = (Payment.TYPE_CLASS, Payment.TYPE_MEMBERSHIP)
+        Payment.objects.bulk_create(
+            (
+                Payment(
+                    organization=organization,
+                    student=students[index % len(students)],
+                    payment_type=payment_types[index % len(payment_types)],
+                    provider=Payment.PROVIDER_MANUAL,
+                    status=payment_statuses[index % len(payment_statuses)],
+                    amount=Decimal("1000.00"),
+                    external_reference=f"BENCH-{organization.id}-{index}",
+                )
+                for index in range(payments_total)
+            ),
+            batch_size=2000,
+        )
+
+        StudentHistory.objects.bulk_create(
+            (
+                StudentHistory(
+                    student=students[index % len(students)],
+                    event_type=StudentHistory.EVENT_MANUAL,
+                    description="Nota de benchmark",
+                )
+                for index in range(history_total)
+            ),
+            batch_size=2000,
+        )
+        if connection.vendor in ("postgresql", "sqlite"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Dataset creado: {classes_total} clases, {payments_total} pagos, {history_total} eventos de historial"
+            )
+        )
@@ -0,0 +1,156 @@
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+
+
+class FakeLLMHandler(BaseHTTPRequestHandler):
+    """
+    Speaks just enough of the OpenAI Responses, Gemini and Ollama APIs for local tests, plus
+    the Google/Facebook endpoints used to verify SSO tokens.
+    """
+
+    protocol_version = "HTTP/1.1"
+    reply = ""
+    delay = 0.0
+    status_code = 200
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.status_code != 200:
+            self._send_json({"error": {"message": "fallo simulado"}}, status_code=self.status_code)
+            return
+        time.sleep(self.delay)
+        if self.path.startswith("/oauth2/v3/userinfo"):
+            self._send_json(
+                {
+                    "sub": "fake-google-1",
+                    "email": "sso.google@example.com",
+                    "given_name": "Usuario",
+                    "family_name": "Google",
+                    "name": "Usuario Google",
+                }
+            )
+        elif self.path.startswith("/debug_token"):
+            self._send_json({"data": {"is_valid": True}})
+        elif self.path.startswith("/me"):
+            self._send_json(
+                {
+                    "id": "fake-facebook-1",
+                    "email": "sso.facebook@example.com",
+                    "first_name": "Usuario",
+                    "last_name": "Facebook",
+                    "name": "Usuario Facebook",
+                }
+            )
+        else:
+            self._send_json({"error": "ruta no soportada"}, status_code=404)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            body = {}
+        if self.status_code != 200:
+            self._send_json({"error": {"message": "fallo simulado"}}, status_code=self.status_code)
+            return
+
+        tokens = [f"{word} " for word in self.reply.split()]
+        if self.path.startswith("/v1/responses"):
+            if body.get("stream"):
+                self._send_stream(
+                    "text/event-stream",
+                    (
+                        f"event: response.output_text.delta\n"
+                        f"data: {json.dumps({'type': 'response.output_text.delta', 'delta': token})}\n\n"
+                        for token in tokens
+                    ),
+                    'event: response.completed\ndata: {"type": "response.completed"}\n\n',
+                )
+            else:
+                self._send_json({"output_text": self.reply})
+        elif ":streamGenerateContent" in self.path:
+            self._send_stream(
+                "text/event-stream",
+                (
+                    f"data: {json.dumps({'candidates': [{'content': {'parts': [{'text': token}]}}]})}\n\n"
+                    for token in tokens
+                ),
+            )
+        elif ":generateContent" in self.path:
+            self._send_json({"candidates": [{"content": {"parts": [{"text": self.reply}]}}]})
+        elif self.path.startswith("/api/generate"):
+            if body.get("stream", True):
+                self._send_stream(
+                    "application/x-ndjson",
+                    (json.dumps({"response": token, "done": False}) + "\n" for token in tokens),
+                    json.dumps({"response": "", "done": True}) + "\n",
+                )
+            else:
+                self._send_json({"response": self.reply, "done": True})
+        else:
+            self._send_json({"error": "ruta no soportada"}, status_code=404)
+
+    def _send_json(self, payload, status_code=200):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, content_type, chunks, trailer=""):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for chunk in chunks:
+            time.sleep(self.delay)
+            self._write_chunk(chunk)
+        if trailer:
+            self._write_chunk(trailer)
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _write_chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+
+class Command(BaseCommand):
+    help = (
+        "Levanta un proveedor IA simulado (OpenAI/Gemini/Ollama, con y sin streaming) para pruebas locales. "
+        "Configura base_url del asistente con la URL del servidor. Tambien simula la verificacion SSO "
+        "(GOOGLE_USERINFO_URL, FACEBOOK_ME_URL, FACEBOOK_DEBUG_TOKEN_URL)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--delay", type=float, default=0.05, help="Segundos de espera entre tokens")
+        parser.add_argument(
+            "--reply",
+            default="Respuesta simulada del asistente: hoy hay clases con cupos disponibles.",
+            help="Texto que devuelve el proveedor",
+        )
+        parser.add_argument("--status", type=int, default=200, help="Codigo HTTP a devolver (para simular fallas)")
+
+    def handle(self, *args, **options):
+        handler = type(
+            "ConfiguredFakeLLMHandler",
+            (FakeLLMHandler,),
+            {"reply": options["reply"], "delay": options["delay"], "status_code": options["status"]},
+        )
+        server = ThreadingHTTPServer((options["host"], options["port"]), handler)
+        self.stdout.write(f"Proveedor IA simulado en http://{options['host']}:{options['port']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from studio.models import Organization
+from studio.modules.classes.services import generate_instructor_settlements_batch, iter_previous_periods
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera/actualiza liquidaciones de instructores para varias organizaciones y meses "
+        "(pensado para cron o ejecucion en segundo plano)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, action="append", help="Id de organizacion (repetible)")
+        parser.add_argument("--year", type=int, help="Anio del ultimo periodo (por defecto el actual)")
+        parser.add_argument("--month", type=int, help="Mes del ultimo periodo (por defecto el actual)")
+        parser.add_argument("--months", type=int, default=1, help="Cantidad de meses hacia atras a liquidar")
+
+    def handle(self, *args, **options):
+        now = timezone.localtime()
+        year = options.get("year") or now.year
+        month = options.get("month") or now.month
+        if month < 1 or month > 12:
+            raise CommandError("month debe estar entre 1 y 12")
+
+        organizations = Organization.objects.filter(is_active=True)
+        if options.get("organization"):
+            organizations = organizations.filter(id__in=options["organization"])
+        organization_ids = list(organizations.order_by("id").values_list("id", flat=True))
+        periods = iter_previous_periods(year, month, options["months"])
+
+        for result in generate_instructor_settlements_batch(organization_ids, periods):
+            label = f"org={result['organization_id']} {result['month']:02d}/{result['year']}"
+            if "skipped" in result:
+                self.stdout.write(f"{label}: {result['skipped']}")
+                continue
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{label}: {result['created_count']} creadas, {result['updated_count']} actualizadas, "
+                    f"{result['kept_paid_count']} pagadas sin cambios"
+                )
+            )
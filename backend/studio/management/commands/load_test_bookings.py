@@ -0,0 +1,144 @@
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from studio.models import ClassBooking, Establishment, Organization, Student, StudioClass
+from studio.modules.bookings.services import book_class, cancel_booking
+
+LOAD_TEST_ORG_NAME = "Load Test Bookings"
+
+
+def _in_thread(function, *args):
+    # Each worker thread opens its own connection; close it so the test does not leak them.
+    try:
+        return function(*args)
+    finally:
+        connection.close()
+
+
+def _book(studio_class, student):
+    try:
+        booking, _created = book_class(studio_class, student)
+    except Exception as exc:
+        return f"error: {exc}"
+    return booking.status
+
+
+def _cancel(booking):
+    try:
+        _booking, promoted_ids = cancel_booking(booking)
+    except Exception as exc:
+        return f"error: {exc}"
+    return len(promoted_ids)
+
+
+class Command(BaseCommand):
+    help = (
+        "Dispara reservas concurrentes sobre una sola clase (y cancelaciones con promocion de la lista "
+        "de espera) y verifica que nunca se supere la capacidad."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--bookings", type=int, default=300, help="Alumnos que reservan a la vez")
+        parser.add_argument("--capacity", type=int, default=25)
+        parser.add_argument("--workers", type=int, default=32, help="Hilos concurrentes")
+        parser.add_argument("--cancellations", type=int, default=10, help="Reservas a cancelar en paralelo")
+        parser.add_argument("--keep", action="store_true", help="No elimina los datos de prueba al terminar")
+
+    def handle(self, *args, **options):
+        bookings_total = options["bookings"]
+        capacity = options["capacity"]
+        if bookings_total < 1 or capacity < 1 or options["workers"] < 1:
+            raise CommandError("--bookings, --capacity y --workers deben ser mayores a 0")
+
+        Organization.objects.filter(name=LOAD_TEST_ORG_NAME).delete()
+        organization = Organization.objects.create(name=LOAD_TEST_ORG_NAME, is_active=True)
+        try:
+            self._run(organization, bookings_total, capacity, options["workers"], options["cancellations"])
+        finally:
+            if not options["keep"]:
+                organization.delete()
+
+    def _run(self, organization, bookings_total, capacity, workers, cancellations):
+        establishment = Establishment.objects.create(organization=organization, name="Sede carga")
+        start_at = timezone.now() + timedelta(days=1)
+        studio_class = StudioClass.objects.create(
+            organization=organization,
+            establishment=establishment,
+            name="Clase carga",
+            start_at=start_at,
+            end_at=start_at + timedelta(hours=1),
+            capacity=capacity,
+        )
+        students = Student.objects.bulk_create(
+            [Student(organization=organization, first_name="Alumno", last_name=str(index)) for index in range(bookings_total)]
+        )
+        # Half of the students ask twice: repeated requests must not take a second seat.
+        requests = [*students, *students[: bookings_total // 2]]
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = Counter(
+                executor.map(lambda student: _in_thread(_book, studio_class, student), requests)
+            )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"{len(requests)} reservas en {elapsed:.2f}s con {workers} hilos ({connection.vendor}): "
+            + ", ".join(f"{outcome}={count}" for outcome, count in sorted(outcomes.items()))
+        )
+        self._check(studio_class, capacity, bookings_total)
+
+        to_cancel = list(
+            ClassBooking.objects.filter(studio_class=studio_class, status=ClassBooking.STATUS_BOOKED)
+            .order_by("?")[:cancellations]
+        )
+        waiting_before = list(
+            ClassBooking.objects.filter(studio_class=studio_class, status=ClassBooking.STATUS_WAITLISTED)
+            .order_by("created_at", "id")
+            .values_list("id", flat=True)
+        )
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(lambda booking: _in_thread(_cancel, booking), to_cancel))
+        errors = [result for result in results if isinstance(result, str)]
+        promoted = sum(result for result in results if isinstance(result, int))
+        self.stdout.write(f"{len(to_cancel)} cancelaciones, {promoted} promovidos desde la lista de espera")
+        if errors:
+            raise CommandError(f"Cancelaciones con error: {errors[:5]}")
+
+        expected_promoted = waiting_before[: len(to_cancel)]
+        promoted_ids = set(
+            ClassBooking.objects.filter(id__in=waiting_before, status=ClassBooking.STATUS_BOOKED).values_list(
+                "id", flat=True
+            )
+        )
+        if promoted_ids != set(expected_promoted):
+            raise CommandError("La lista de espera no se promovio en orden de llegada")
+        self._check(studio_class, capacity, bookings_total - len(to_cancel))
+        self.stdout.write(self.style.SUCCESS("Sin sobreventa: la capacidad se respeto en todas las fases"))
+
+    def _check(self, studio_class, capacity, active_students):
+        statuses = Counter(
+            ClassBooking.objects.filter(studio_class=studio_class)
+            .exclude(status=ClassBooking.STATUS_CANCELED)
+            .values_list("status", flat=True)
+        )
+        seats = sum(statuses[status] for status in ClassBooking.SEAT_STATUSES)
+        waitlisted = statuses[ClassBooking.STATUS_WAITLISTED]
+        self.stdout.write(f"  ocupados={seats} en espera={waitlisted} capacidad={capacity}")
+        if seats > capacity:
+            raise CommandError(f"Sobreventa: {seats} lugares ocupados con capacidad {capacity}")
+        if seats != min(capacity, active_students) or seats + waitlisted != active_students:
+            raise CommandError(
+                f"Conteo inesperado: {seats} ocupados + {waitlisted} en espera para {active_students} alumnos"
+            )
+        studio_class.refresh_from_db(fields=["booked_count", "waitlist_count"])
+        if (studio_class.booked_count, studio_class.waitlist_count) != (seats, waitlisted):
+            raise CommandError(
+                f"Contadores desfasados: booked_count={studio_class.booked_count} "
+                f"waitlist_count={studio_class.waitlist_count}"
+            )
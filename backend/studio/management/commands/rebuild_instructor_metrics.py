@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from studio.models import InstructorMonthlyMetrics
+from studio.modules.classes.metrics import METRIC_FIELDS, compute_expected_metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde cero la tabla de metricas mensuales por instructor a partir de las clases, "
+        "o con --verify solo informa las diferencias (drift) sin modificar nada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Limita el proceso a una organizacion")
+        parser.add_argument("--verify", action="store_true", help="Solo compara y reporta diferencias")
+
+    def handle(self, *args, **options):
+        organization_id = options.get("organization")
+        with transaction.atomic():
+            stored_qs = InstructorMonthlyMetrics.objects.select_for_update()
+            if organization_id:
+                stored_qs = stored_qs.filter(organization_id=organization_id)
+            stored = {
+                (row.organization_id, row.instructor_id, row.period_year, row.period_month): row for row in stored_qs
+            }
+            expected = {
+                key: values for key, values in compute_expected_metrics(organization_id).items() if any(values.values())
+            }
+
+            drift = self._diff(stored, expected)
+            for key, field, stored_value, expected_value in drift[:50]:
+                self.stdout.write(
+                    f"org={key[0]} instructor={key[1]} {key[2]:04d}-{key[3]:02d} {field}: "
+                    f"guardado={stored_value} esperado={expected_value}"
+                )
+            if len(drift) > 50:
+                self.stdout.write(f"... y {len(drift) - 50} diferencias mas")
+
+            if options["verify"]:
+                if drift:
+                    raise CommandError(f"Se encontraron {len(drift)} diferencias en las metricas de instructores")
+                self.stdout.write(self.style.SUCCESS(f"Metricas consistentes ({len(expected)} filas)"))
+                return
+
+            stored_qs.delete()
+            InstructorMonthlyMetrics.objects.bulk_create(
+                (
+                    InstructorMonthlyMetrics(
+                        organization_id=organization,
+                        instructor_id=instructor,
+                        period_year=year,
+                        period_month=month,
+                        **values,
+                    )
+                    for (organization, instructor, year, month), values in expected.items()
+                ),
+                batch_size=1000,
+            )
+        self.stdout.write(
+            self.style.SUCCESS(f"Metricas reconstruidas: {len(expected)} filas ({len(drift)} diferencias corregidas)")
+        )
+
+    def _diff(self, stored, expected):
+        drift = []
+        for key in sorted(set(stored) | set(expected)):
+            row = stored.get(key)
+            values = expected.get(key) or {}
+            for field in METRIC_FIELDS:
+                stored_value = getattr(row, field) if row else 0
+                expected_value = values.get(field, 0)
+                if stored_value != expected_value:
+                    drift.append((key, field, stored_value, expected_value))
+        return drift
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from studio.modules.core.marketplace import rebuild_marketplace_listings
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruye desde cero el listado publico del marketplace (MarketplaceListing) a partir de "
+        "organizaciones y sedes activas, e invalida las respuestas cacheadas."
+    )
+
+    def handle(self, *args, **options):
+        total = rebuild_marketplace_listings()
+        self.stdout.write(self.style.SUCCESS(f"Marketplace reconstruido: {total} organizaciones listadas"))
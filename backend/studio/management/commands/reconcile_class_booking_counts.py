@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from studio.models import StudioClass
+from studio.modules.bookings.services import count_bookings
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula booked_count/waitlist_count de las clases a partir de las reservas, "
+        "o con --verify solo informa las diferencias (drift) sin modificar nada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--organization", type=int, help="Limita el proceso a una organizacion")
+        parser.add_argument("--verify", action="store_true", help="Solo compara y reporta diferencias")
+
+    def handle(self, *args, **options):
+        organization_id = options.get("organization")
+        with transaction.atomic():
+            classes_qs = StudioClass.objects.all()
+            if organization_id:
+                classes_qs = classes_qs.filter(organization_id=organization_id)
+            # Lock the classes before counting: booking changes take the same row lock, so none can
+            # commit between the count and the write below and be taken for drift.
+            stored = {
+                class_id: (booked_count, waitlist_count)
+                for class_id, booked_count, waitlist_count in classes_qs.select_for_update()
+                .order_by("id")
+                .values_list("id", "booked_count", "waitlist_count")
+            }
+            expected = count_bookings(classes_qs.values("id"))
+
+            drift = [
+                (class_id, stored_counts, expected.get(class_id, (0, 0)))
+                for class_id, stored_counts in sorted(stored.items())
+                if stored_counts != expected.get(class_id, (0, 0))
+            ]
+            for class_id, stored_counts, expected_counts in drift[:50]:
+                self.stdout.write(
+                    f"clase={class_id} reservadas/en espera: guardado={stored_counts[0]}/{stored_counts[1]} "
+                    f"esperado={expected_counts[0]}/{expected_counts[1]}"
+                )
+            if len(drift) > 50:
+                self.stdout.write(f"... y {len(drift) - 50} diferencias mas")
+
+            if options["verify"]:
+                if drift:
+                    raise CommandError(f"Se encontraron {len(drift)} clases con contadores desfasados")
+                self.stdout.write(self.style.SUCCESS(f"Contadores consistentes ({len(stored)} clases)"))
+                return
+
+            for class_id, _stored_counts, (booked_count, waitlist_count) in drift:
+                StudioClass.objects.filter(id=class_id).update(booked_count=booked_count, waitlist_count=waitlist_count)
+        self.stdout.write(self.style.SUCCESS(f"Contadores de reservas corregidos en {len(drift)} clases"))
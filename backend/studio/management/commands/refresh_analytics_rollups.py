@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from studio.modules.analytics.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Actualiza las tablas diarias de analiticas (pagos y clases) con los cambios posteriores a cada "
+        "watermark, o las reconstruye desde cero con --full."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Reconstruye todas las filas ignorando los watermarks")
+
+    def handle(self, *args, **options):
+        written = refresh_rollups(full=options["full"])
+        summary = ", ".join(f"{source}={rows}" for source, rows in written.items())
+        self.stdout.write(self.style.SUCCESS(f"Analiticas actualizadas (filas escritas): {summary}"))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from studio.modules.dashboard.snapshots import rebuild_snapshots
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula los snapshots del dashboard (uno por organizacion y uno de plataforma). "
+        "Pensado para correr periodicamente (cron) ademas de los refrescos disparados por escrituras."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--organization",
+            type=int,
+            action="append",
+            dest="organization_ids",
+            help="Limita el proceso a una organizacion (repetible); el snapshot de plataforma siempre se actualiza",
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_snapshots(options.get("organization_ids"))
+        self.stdout.write(self.style.SUCCESS(f"Snapshots del dashboard actualizados: {total}"))
@@ -0,0 +1,65 @@
+import os
+import signal
+import socket
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from studio.modules.jobs.services import claim_next_job, requeue_stale_jobs, run_job
+
+STALE_CHECK_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker de tareas en segundo plano: toma trabajos encolados (facturacion ARCA, liquidaciones, "
+        "consultas IA) y los ejecuta con reintentos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--queue", action="append", dest="queues", help="Cola a procesar (repetible)")
+        parser.add_argument("--once", action="store_true", help="Procesa lo pendiente y termina")
+        parser.add_argument("--sleep", type=float, default=2.0, help="Segundos de espera cuando no hay trabajos")
+        parser.add_argument("--worker-id", default="", help="Identificador del worker (por defecto host:pid)")
+        parser.add_argument("--max-jobs", type=int, default=0, help="Termina luego de N trabajos (0 = sin limite)")
+
+    def handle(self, *args, **options):
+        worker_id = options["worker_id"] or f"{socket.gethostname()}:{os.getpid()}"
+        queues = options["queues"] or None
+        max_jobs = max(0, options["max_jobs"])
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+
+        self.stdout.write(f"Worker {worker_id} iniciado (colas: {', '.join(queues) if queues else 'todas'})")
+        processed = 0
+        last_stale_check = 0.0
+        while not self._stopping:
+            if time.monotonic() - last_stale_check >= STALE_CHECK_SECONDS:
+                close_old_connections()
+                requeued, failed = requeue_stale_jobs()
+                if requeued or failed:
+                    self.stdout.write(f"Trabajos trabados: {requeued} vueltos a encolar, {failed} marcados como fallidos")
+                last_stale_check = time.monotonic()
+
+            close_old_connections()
+            job = claim_next_job(worker_id, queues=queues)
+            if job is None:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+                continue
+
+            job = run_job(job)
+            processed += 1
+            self.stdout.write(f"Job {job.name} #{job.id}: {job.status} (intento {job.attempts}/{job.max_attempts})")
+            if max_jobs and processed >= max_jobs:
+                break
+
+        close_old_connections()
+        self.stdout.write(self.style.SUCCESS(f"Worker {worker_id} detenido ({processed} trabajos procesados)"))
+
+    def _request_stop(self, signum, frame):
+        # Finish the current job before exiting.
+        self._stopping = True
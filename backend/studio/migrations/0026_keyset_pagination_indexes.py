@@ -0,0 +1,39 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0025_aiassistantconfig_aiassistantinteraction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['organization', '-created_at', 'id'], name='invoice_org_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['-created_at', 'id'], name='payment_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['organization', '-created_at', 'id'], name='payment_org_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='socialpost',
+            index=models.Index(fields=['organization', '-created_at', '-id'], name='socialpost_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studioclass',
+            index=models.Index(fields=['start_at', 'id'], name='class_start_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studioclass',
+            index=models.Index(fields=['organization', 'start_at', 'id'], name='class_org_start_id_idx'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:18
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0026_keyset_pagination_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['organization', 'status', 'payment_type', '-created_at'], name='payment_org_status_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studenthistory',
+            index=models.Index(fields=['student', '-created_at'], name='student_history_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studioclass',
+            index=models.Index(fields=['instructor', 'status', 'start_at', 'end_at'], name='class_instr_status_start_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='studioclass',
+            index=models.Index(condition=models.Q(('status', 'scheduled')), fields=['room', 'start_at', 'end_at'], name='class_room_sched_idx'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+from django.db import migrations
+
+CLASS_TABLE = "studio_studioclass"
+SLOT_EXPRESSION = "tstzrange(start_at, end_at, '[)')"
+CONSTRAINTS = (
+    ("class_room_no_overlap", "room_id"),
+    ("class_instructor_no_overlap", "instructor_id"),
+)
+
+
+def add_overlap_constraints(apps, schema_editor):
+    # Exclusion constraints are PostgreSQL-only; SQLite keeps the serializer-level check.
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            SELECT a.id, b.id FROM {CLASS_TABLE} a
+            JOIN {CLASS_TABLE} b ON a.id < b.id
+            WHERE a.status = 'scheduled' AND b.status = 'scheduled'
+              AND a.start_at < b.end_at AND b.start_at < a.end_at
+              AND (a.room_id = b.room_id OR a.instructor_id = b.instructor_id)
+            LIMIT 20
+            """
+        )
+        conflicts = cursor.fetchall()
+        cursor.execute(f"SELECT id FROM {CLASS_TABLE} WHERE status = 'scheduled' AND end_at < start_at LIMIT 20")
+        inverted = [row[0] for row in cursor.fetchall()]
+    if conflicts or inverted:
+        raise RuntimeError(
+            "No se pueden crear las restricciones de solapamiento de clases. "
+            f"Clases programadas superpuestas: {conflicts}. Clases con fin anterior al inicio: {inverted}. "
+            "Cancela o corrige esas clases y vuelve a ejecutar migrate."
+        )
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    for name, column in CONSTRAINTS:
+        schema_editor.execute(
+            f"ALTER TABLE {CLASS_TABLE} ADD CONSTRAINT {name} "
+            f"EXCLUDE USING gist ({column} WITH =, {SLOT_EXPRESSION} WITH &&) "
+            f"WHERE (status = 'scheduled' AND {column} IS NOT NULL)"
+        )
+
+
+def remove_overlap_constraints(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _column in CONSTRAINTS:
+        schema_editor.execute(f"ALTER TABLE {CLASS_TABLE} DROP CONSTRAINT IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("studio", "0027_hot_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(add_overlap_constraints, remove_overlap_constraints),
+    ]
@@ -0,0 +1,98 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:24
+
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+# Frozen copy of the bucketing in studio.modules.classes.metrics as of this migration.
+STATE_FIELDS = ("organization_id", "instructor_id", "status", "start_at", "end_at")
+METRIC_FIELDS = (
+    "total_classes",
+    "scheduled_classes",
+    "completed_classes",
+    "canceled_classes",
+    "assigned_hours",
+    "completed_hours",
+)
+
+
+def _class_hours(start_at, end_at):
+    if not start_at or not end_at or end_at <= start_at:
+        return Decimal("0")
+    return Decimal(str((end_at - start_at).total_seconds() / 3600)).quantize(Decimal("0.01"))
+
+
+def _accumulate(buckets, row):
+    if not row["instructor_id"] or not row["start_at"]:
+        return
+    local_start = timezone.localtime(row["start_at"])
+    key = (row["organization_id"], row["instructor_id"], local_start.year, local_start.month)
+    status = row["status"]
+    hours = _class_hours(row["start_at"], row["end_at"])
+    bucket = buckets.setdefault(key, {field: 0 for field in METRIC_FIELDS})
+    bucket["total_classes"] += 1
+    bucket["scheduled_classes"] += int(status == "scheduled")
+    bucket["completed_classes"] += int(status == "completed")
+    bucket["canceled_classes"] += int(status == "canceled")
+    bucket["assigned_hours"] += hours if status != "canceled" else Decimal("0")
+    bucket["completed_hours"] += hours if status == "completed" else Decimal("0")
+
+
+def populate_instructor_monthly_metrics(apps, schema_editor):
+    StudioClass = apps.get_model("studio", "StudioClass")
+    InstructorMonthlyMetrics = apps.get_model("studio", "InstructorMonthlyMetrics")
+
+    buckets = {}
+    rows = StudioClass.objects.filter(instructor_id__isnull=False).values(*STATE_FIELDS)
+    for row in rows.iterator(chunk_size=2000):
+        _accumulate(buckets, row)
+    InstructorMonthlyMetrics.objects.bulk_create(
+        (
+            InstructorMonthlyMetrics(
+                organization_id=organization_id,
+                instructor_id=instructor_id,
+                period_year=year,
+                period_month=month,
+                **values,
+            )
+            for (organization_id, instructor_id, year, month), values in buckets.items()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0028_class_overlap_exclusion_constraints'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InstructorMonthlyMetrics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period_year', models.PositiveIntegerField()),
+                ('period_month', models.PositiveSmallIntegerField()),
+                ('total_classes', models.IntegerField(default=0)),
+                ('scheduled_classes', models.IntegerField(default=0)),
+                ('completed_classes', models.IntegerField(default=0)),
+                ('canceled_classes', models.IntegerField(default=0)),
+                ('assigned_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('completed_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('instructor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='instructor_monthly_metrics', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='instructor_monthly_metrics', to='studio.organization')),
+            ],
+            options={
+                'ordering': ('organization_id', 'instructor_id', 'period_year', 'period_month'),
+                'unique_together': {('organization', 'instructor', 'period_year', 'period_month')},
+            },
+        ),
+        migrations.RunPython(populate_instructor_monthly_metrics, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0030_background_jobs'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiassistantinteraction',
+            name='answer_cache_key',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='aiassistantinteraction',
+            name='cache_status',
+            field=models.CharField(blank=True, choices=[('miss', 'Miss'), ('hit', 'Hit'), ('similar', 'Similar hit'), ('bypass', 'Bypass')], max_length=20),
+        ),
+        migrations.AddField(
+            model_name='aiassistantinteraction',
+            name='cached_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='cache_hits', to='studio.aiassistantinteraction'),
+        ),
+        migrations.AddField(
+            model_name='aiassistantinteraction',
+            name='context_fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='aiassistantinteraction',
+            name='question_normalized',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddIndex(
+            model_name='aiassistantinteraction',
+            index=models.Index(fields=['organization', 'answer_cache_key', '-created_at'], name='aiinteraction_cache_key_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aiassistantinteraction',
+            index=models.Index(fields=['organization', 'context_fingerprint', '-created_at'], name='aiinteraction_fprint_idx'),
+        ),
+    ]
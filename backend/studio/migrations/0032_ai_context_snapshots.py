@@ -0,0 +1,72 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:37
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copies of studio.modules.assistant.context helpers as of this migration; the digest
+# must stay byte-identical to what store_context_snapshot computed at the time.
+def context_fingerprint(context_payload):
+    encoded = json.dumps(context_payload, sort_keys=True, ensure_ascii=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def serialize_context(context_payload):
+    return json.dumps(context_payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def move_inline_snapshots(apps, schema_editor):
+    AIAssistantInteraction = apps.get_model("studio", "AIAssistantInteraction")
+    AIContextSnapshot = apps.get_model("studio", "AIContextSnapshot")
+
+    snapshot_ids = {}
+    pending = AIAssistantInteraction.objects.filter(context_ref__isnull=True).exclude(context_snapshot={})
+    for interaction in pending.only("id", "organization_id", "context_snapshot").iterator(chunk_size=500):
+        digest = context_fingerprint(interaction.context_snapshot)
+        if digest not in snapshot_ids:
+            snapshot, _created = AIContextSnapshot.objects.get_or_create(
+                digest=digest,
+                defaults={
+                    "organization_id": interaction.organization_id,
+                    "payload": interaction.context_snapshot,
+                    "size_bytes": len(serialize_context(interaction.context_snapshot).encode("utf-8")),
+                },
+            )
+            snapshot_ids[digest] = snapshot.id
+        AIAssistantInteraction.objects.filter(id=interaction.id).update(
+            context_ref_id=snapshot_ids[digest],
+            context_snapshot={},
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0031_ai_answer_cache'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AIContextSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('payload', models.JSONField(blank=True, default=dict)),
+                ('size_bytes', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ai_context_snapshots', to='studio.organization')),
+            ],
+            options={
+                'ordering': ('-created_at', '-id'),
+            },
+        ),
+        migrations.AddField(
+            model_name='aiassistantinteraction',
+            name='context_ref',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='interactions', to='studio.aicontextsnapshot'),
+        ),
+        migrations.RunPython(move_inline_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,85 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Frozen copy of studio.modules.core.marketplace.listing_values as of this migration (logos
+# were still base64 text on the organization; 0034 moves them to files).
+MAX_LOGO_CHARS = 120_000
+
+
+def _time_value(value):
+    return value.isoformat() if value else None
+
+
+def listing_values(organization, establishments):
+    logo = str(organization.logo or "")
+    cities = {(organization.fiscal_city or "").strip().lower()}
+    cities.update((establishment.city or "").strip().lower() for establishment in establishments)
+    cities.discard("")
+    return {
+        "name": organization.name,
+        "city": organization.fiscal_city or "",
+        "address": organization.address or "",
+        "subscription_plan": organization.subscription_plan or "",
+        "logo": logo if len(logo) <= MAX_LOGO_CHARS else "",
+        "establishments": [
+            {
+                "id": establishment.id,
+                "name": establishment.name,
+                "address": establishment.address or "",
+                "city": establishment.city or "",
+                "open_time": _time_value(establishment.open_time),
+                "close_time": _time_value(establishment.close_time),
+                "weekly_hours": establishment.weekly_hours,
+            }
+            for establishment in establishments
+        ],
+        "search_cities": f"|{'|'.join(sorted(cities))}|" if cities else "",
+    }
+
+
+def populate_marketplace_listings(apps, schema_editor):
+    Organization = apps.get_model("studio", "Organization")
+    Establishment = apps.get_model("studio", "Establishment")
+    MarketplaceListing = apps.get_model("studio", "MarketplaceListing")
+
+    for organization in Organization.objects.filter(is_active=True, subscription_enabled=True).iterator(chunk_size=200):
+        establishments = list(
+            Establishment.objects.filter(organization_id=organization.id, is_active=True).order_by("name")
+        )
+        MarketplaceListing.objects.create(
+            organization_id=organization.id,
+            **listing_values(organization, establishments),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0032_ai_context_snapshots'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MarketplaceListing',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=150)),
+                ('city', models.CharField(blank=True, max_length=120)),
+                ('address', models.CharField(blank=True, max_length=250)),
+                ('subscription_plan', models.CharField(blank=True, max_length=80)),
+                ('logo', models.TextField(blank=True)),
+                ('establishments', models.JSONField(blank=True, default=list)),
+                ('search_cities', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('organization', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='marketplace_listing', to='studio.organization')),
+            ],
+            options={
+                'ordering': ('name', 'id'),
+                'indexes': [models.Index(fields=['name', 'id'], name='marketplace_name_idx')],
+            },
+        ),
+        migrations.RunPython(populate_marketplace_listings, migrations.RunPython.noop),
+    ]
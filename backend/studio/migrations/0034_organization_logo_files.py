@@ -0,0 +1,112 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:46
+
+import base64
+import binascii
+import hashlib
+import re
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+
+
+# Frozen, Pillow-free copy of the decoding in studio.modules.core.media as of this migration.
+# The format is taken from the file signature; thumbnails are left empty and generated by
+# `manage.py backfill_logo_thumbnails` (run by entrypoint.prod.sh after migrate).
+LOGO_DATA_URL_RE = re.compile(r"^data:(?P<mime>[\w/+.-]+);base64,(?P<data>.*)$", re.IGNORECASE | re.DOTALL)
+LOGO_SIGNATURES = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+)
+MIME_TYPES = {"png": "image/png", "jpg": "image/jpeg", "webp": "image/webp", "gif": "image/gif"}
+MAX_LISTING_LOGO_CHARS = 120_000
+
+
+def _decode_logo(value):
+    """(content, extension) for a base64 raster logo, or None (SVG and unreadable values are dropped)."""
+    value = (value or "").strip()
+    match = LOGO_DATA_URL_RE.match(value)
+    try:
+        content = base64.b64decode(match.group("data") if match else value, validate=False)
+    except (binascii.Error, ValueError):
+        return None
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return content, "webp"
+    for signature, extension in LOGO_SIGNATURES:
+        if content.startswith(signature):
+            return content, extension
+    return None
+
+
+def move_logos_to_storage(apps, schema_editor):
+    Organization = apps.get_model("studio", "Organization")
+    MarketplaceListing = apps.get_model("studio", "MarketplaceListing")
+
+    organizations = Organization.objects.exclude(logo="").only("id", "logo")
+    for organization in organizations.iterator(chunk_size=50):
+        decoded = _decode_logo(organization.logo)
+        if decoded is None:
+            continue
+        content, extension = decoded
+        logo_name = f"logos/{organization.id}/{hashlib.sha256(content).hexdigest()[:20]}.{extension}"
+        if not default_storage.exists(logo_name):
+            default_storage.save(logo_name, ContentFile(content))
+        Organization.objects.filter(id=organization.id).update(logo_file=logo_name)
+
+    # Listings carried the base64 text; the thumbnail backfill points them at the new files.
+    MarketplaceListing.objects.update(logo="")
+
+
+def inline_logos(apps, schema_editor):
+    Organization = apps.get_model("studio", "Organization")
+    MarketplaceListing = apps.get_model("studio", "MarketplaceListing")
+
+    organizations = Organization.objects.exclude(logo_file="").only("id", "logo_file")
+    for organization in organizations.iterator(chunk_size=50):
+        name = organization.logo_file.name
+        mime = MIME_TYPES.get(name.rsplit(".", 1)[-1])
+        if mime is None or not default_storage.exists(name):
+            continue
+        with default_storage.open(name, "rb") as logo_file:
+            data_url = f"data:{mime};base64,{base64.b64encode(logo_file.read()).decode('ascii')}"
+        Organization.objects.filter(id=organization.id).update(logo=data_url)
+        MarketplaceListing.objects.filter(organization_id=organization.id).update(
+            logo=data_url if len(data_url) <= MAX_LISTING_LOGO_CHARS else ""
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0033_marketplace_listing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='organization',
+            name='logo_file',
+            field=models.FileField(blank=True, max_length=255, upload_to=''),
+        ),
+        migrations.AddField(
+            model_name='organization',
+            name='logo_thumbnail',
+            field=models.FileField(blank=True, max_length=255, upload_to=''),
+        ),
+        migrations.RunPython(move_logos_to_storage, inline_logos),
+        migrations.RemoveField(
+            model_name='organization',
+            name='logo',
+        ),
+        migrations.RenameField(
+            model_name='organization',
+            old_name='logo_file',
+            new_name='logo',
+        ),
+        migrations.AlterField(
+            model_name='marketplacelisting',
+            name='logo',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
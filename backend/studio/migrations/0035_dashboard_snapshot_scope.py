@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 06:10
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def drop_unscoped_snapshots(apps, schema_editor):
+    # Nothing wrote snapshots before they were scoped; any stray row has no scope to migrate to.
+    apps.get_model("studio", "DashboardSnapshot").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0034_organization_logo_files'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_unscoped_snapshots, migrations.RunPython.noop),
+        migrations.AddField(
+            model_name='dashboardsnapshot',
+            name='scope',
+            field=models.CharField(default='', max_length=40, unique=True),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='dashboardsnapshot',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='dashboard_snapshots', to='studio.organization'),
+        ),
+        migrations.AlterField(
+            model_name='dashboardsnapshot',
+            name='generated_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
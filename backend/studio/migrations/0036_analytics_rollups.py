@@ -0,0 +1,75 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0035_dashboard_snapshot_scope'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=40, unique=True)),
+                ('value', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='RollupDirtyDay',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=40)),
+                ('organization_id', models.BigIntegerField()),
+                ('day', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'unique_together': {('source', 'organization_id', 'day')},
+            },
+        ),
+        migrations.CreateModel(
+            name='ClassDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('start_hour', models.PositiveSmallIntegerField()),
+                ('status', models.CharField(max_length=20)),
+                ('classes_count', models.PositiveIntegerField(default=0)),
+                ('booked_hours', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('capacity', models.PositiveIntegerField(default=0)),
+                ('establishment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_daily_rollups', to='studio.establishment')),
+                ('instructor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='class_daily_rollups', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_daily_rollups', to='studio.organization')),
+                ('room', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='class_daily_rollups', to='studio.room')),
+            ],
+            options={
+                'ordering': ('organization_id', 'day', 'start_hour', 'id'),
+                'indexes': [models.Index(fields=['organization', 'day'], name='class_rollup_org_day_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PaymentDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('payment_type', models.CharField(max_length=32)),
+                ('status', models.CharField(max_length=20)),
+                ('currency', models.CharField(max_length=8)),
+                ('payments_count', models.PositiveIntegerField(default=0)),
+                ('amount', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='payment_daily_rollups', to='studio.organization')),
+            ],
+            options={
+                'ordering': ('organization_id', 'day', 'id'),
+                'indexes': [models.Index(fields=['organization', 'day'], name='payment_rollup_org_day_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0036_analytics_rollups'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassBooking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('booked', 'Reservada'), ('waitlisted', 'En lista de espera'), ('canceled', 'Cancelada'), ('attended', 'Asistio'), ('no_show', 'No asistio')], default='booked', max_length=20)),
+                ('promoted_at', models.DateTimeField(blank=True, null=True)),
+                ('canceled_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='created_class_bookings', to=settings.AUTH_USER_MODEL)),
+                ('organization', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_bookings', to='studio.organization')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='class_bookings', to='studio.student')),
+                ('studio_class', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='studio.studioclass')),
+            ],
+            options={
+                'ordering': ('studio_class_id', 'created_at', 'id'),
+                'indexes': [models.Index(fields=['studio_class', 'status', 'created_at', 'id'], name='booking_class_status_idx'), models.Index(fields=['student', 'created_at'], name='booking_student_created_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status', 'canceled'), _negated=True), fields=('studio_class', 'student'), name='booking_class_student_active_uniq')],
+            },
+        ),
+    ]
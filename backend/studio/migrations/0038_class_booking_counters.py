@@ -0,0 +1,37 @@
+# Generated by Django 5.1.7 on 2026-10-18 05:06
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_booking_counts(apps, schema_editor):
+    StudioClass = apps.get_model("studio", "StudioClass")
+    booked = Count("bookings", filter=Q(bookings__status__in=("booked", "attended", "no_show")))
+    waitlisted = Count("bookings", filter=Q(bookings__status="waitlisted"))
+    for class_id, booked_count, waitlist_count in (
+        StudioClass.objects.annotate(booked=booked, waitlisted=waitlisted)
+        .filter(Q(booked__gt=0) | Q(waitlisted__gt=0))
+        .values_list("id", "booked", "waitlisted")
+    ):
+        StudioClass.objects.filter(id=class_id).update(booked_count=booked_count, waitlist_count=waitlist_count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0037_class_bookings'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='studioclass',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='studioclass',
+            name='waitlist_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_booking_counts, migrations.RunPython.noop),
+    ]
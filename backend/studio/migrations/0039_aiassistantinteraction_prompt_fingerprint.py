@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('studio', '0038_class_booking_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='aiassistantinteraction',
+            name='prompt_fingerprint',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+    ]
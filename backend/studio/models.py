@@ -4,10 +4,13 @@ Keeps compatibility with imports like `from studio.models import ...`
 while each domain owns its own models file (Odoo-style modularization).
 """
 
-from studio.modules.core.models import Establishment, Organization, OrganizationMembership, Room
-from studio.modules.assistant.models import AIAssistantConfig, AIAssistantInteraction
-from studio.modules.classes.models import InstructorProfile, InstructorSettlement, StudioClass
+from studio.modules.core.models import Establishment, MarketplaceListing, Organization, OrganizationMembership, Room
+from studio.modules.analytics.models import ClassDailyRollup, PaymentDailyRollup, RollupDirtyDay, RollupWatermark
+from studio.modules.assistant.models import AIAssistantConfig, AIAssistantInteraction, AIContextSnapshot
+from studio.modules.bookings.models import ClassBooking
+from studio.modules.classes.models import InstructorMonthlyMetrics, InstructorProfile, InstructorSettlement, StudioClass
 from studio.modules.dashboard.models import DashboardSnapshot
+from studio.modules.jobs.models import BackgroundJob
 from studio.modules.payments.models import Invoice, MembershipPlan, Payment
 from studio.modules.social.models import SocialAccount, SocialCampaign, SocialPost
 from studio.modules.students.models import Student, StudentHistory
@@ -17,11 +20,15 @@ __all__ = [
     "Organization",
     "Establishment",
     "Room",
+    "MarketplaceListing",
     "AIAssistantConfig",
     "AIAssistantInteraction",
+    "AIContextSnapshot",
     "InstructorProfile",
+    "InstructorMonthlyMetrics",
     "InstructorSettlement",
     "StudioClass",
+    "ClassBooking",
     "OrganizationMembership",
     "Student",
     "StudentHistory",
@@ -35,4 +42,9 @@ __all__ = [
     "PlatformSetting",
     "PlatformSubscriptionPlan",
     "DashboardSnapshot",
+    "BackgroundJob",
+    "PaymentDailyRollup",
+    "ClassDailyRollup",
+    "RollupWatermark",
+    "RollupDirtyDay",
 ]
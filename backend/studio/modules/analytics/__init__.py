@@ -0,0 +1 @@
+"""Analytics module: daily rollups of payments and classes and the time-series query API."""
@@ -0,0 +1,30 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+from studio.modules.jobs.services import enqueue_job, register_job
+
+from .rollups import get_watermark, refresh_rollups
+
+REFRESH_ROLLUPS_JOB = "analytics.refresh_rollups"
+
+
+@register_job(REFRESH_ROLLUPS_JOB, max_attempts=3)
+def refresh_rollups_job(payload, job):
+    return {"rows": refresh_rollups(full=bool(payload.get("full")))}
+
+
+def enqueue_rollup_refresh_if_due():
+    """Queue an incremental refresh when the rollups are older than STUDIO_ANALYTICS_REFRESH_INTERVAL."""
+    interval = max(1, int(getattr(settings, "STUDIO_ANALYTICS_REFRESH_INTERVAL", 300)))
+    watermark = get_watermark()
+    if watermark is not None and timezone.now() - watermark < timedelta(seconds=interval):
+        return None
+    # One job per interval, however many readers notice the rollups are behind.
+    return enqueue_job(
+        REFRESH_ROLLUPS_JOB,
+        {},
+        idempotency_key=f"{REFRESH_ROLLUPS_JOB}:{int(time.time() // interval)}",
+    )
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import models
+
+from studio.modules.core.models import Establishment, Organization, Room
+
+
+class PaymentDailyRollup(models.Model):
+    """Payments per organization/day/type/status/currency, maintained by analytics/rollups.py."""
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="payment_daily_rollups")
+    day = models.DateField()
+    payment_type = models.CharField(max_length=32)
+    status = models.CharField(max_length=20)
+    currency = models.CharField(max_length=8)
+    payments_count = models.PositiveIntegerField(default=0)
+    amount = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ("organization_id", "day", "id")
+        indexes = [models.Index(fields=["organization", "day"], name="payment_rollup_org_day_idx")]
+
+    def __str__(self):
+        return f"{self.organization_id} {self.day} {self.payment_type}/{self.status} {self.amount} {self.currency}"
+
+
+class ClassDailyRollup(models.Model):
+    """Classes per organization/day/start hour/establishment/room/instructor/status, see analytics/rollups.py."""
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="class_daily_rollups")
+    day = models.DateField()
+    start_hour = models.PositiveSmallIntegerField()
+    establishment = models.ForeignKey(Establishment, on_delete=models.CASCADE, related_name="class_daily_rollups")
+    room = models.ForeignKey(Room, on_delete=models.SET_NULL, null=True, blank=True, related_name="class_daily_rollups")
+    instructor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="class_daily_rollups",
+    )
+    status = models.CharField(max_length=20)
+    classes_count = models.PositiveIntegerField(default=0)
+    booked_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    capacity = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ("organization_id", "day", "start_hour", "id")
+        indexes = [models.Index(fields=["organization", "day"], name="class_rollup_org_day_idx")]
+
+    def __str__(self):
+        return f"{self.organization_id} {self.day} {self.start_hour:02d}h {self.status} x{self.classes_count}"
+
+
+class RollupWatermark(models.Model):
+    """Highest source updated_at already folded into a rollup table."""
+
+    source = models.CharField(max_length=40, unique=True)
+    value = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: {self.value}"
+
+
+class RollupDirtyDay(models.Model):
+    """Days a watermark cannot see (deleted rows, classes moved to another day), recomputed on the next refresh."""
+
+    source = models.CharField(max_length=40)
+    # Plain id: rows are written while cascading an organization delete, after which there is nothing to point at.
+    organization_id = models.BigIntegerField()
+    day = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("source", "organization_id", "day")
+
+    def __str__(self):
+        return f"{self.source} {self.organization_id} {self.day}"
@@ -0,0 +1,181 @@
+"""
+Daily rollups of payments and classes.
+
+Each refresh folds in the source rows whose updated_at is past the source's watermark (minus
+STUDIO_ANALYTICS_WATERMARK_OVERLAP, so rows from transactions that committed late are not
+missed) plus the days signals marked dirty, and recomputes those (organization, day) buckets
+from scratch. Recomputing whole days keeps the refresh idempotent; reporting queries then
+read the narrow rollup tables instead of Payment and StudioClass.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone
+
+from studio.models import Payment, StudioClass
+from studio.modules.classes.metrics import duration_to_hours
+
+from .models import ClassDailyRollup, PaymentDailyRollup, RollupDirtyDay, RollupWatermark
+
+PAYMENTS_SOURCE = "payments"
+CLASSES_SOURCE = "classes"
+
+
+def _payment_rollups(organization_id, rows):
+    return [
+        PaymentDailyRollup(
+            organization_id=organization_id,
+            day=row["day"],
+            payment_type=row["payment_type"],
+            status=row["status"],
+            currency=row["currency"],
+            payments_count=row["payments_count"],
+            amount=row["amount"] or 0,
+        )
+        for row in rows
+    ]
+
+
+def _class_rollups(organization_id, rows):
+    return [
+        ClassDailyRollup(
+            organization_id=organization_id,
+            day=row["day"],
+            start_hour=row["start_hour"],
+            establishment_id=row["establishment_id"],
+            room_id=row["room_id"],
+            instructor_id=row["instructor_id"],
+            status=row["status"],
+            classes_count=row["classes_count"],
+            booked_hours=duration_to_hours(row["booked_time"]),
+            capacity=row["capacity"] or 0,
+        )
+        for row in rows
+    ]
+
+
+# Per source: model, the timestamp that decides the day, rollup model, extra dimensions, grouping and aggregates.
+ROLLUP_SOURCES = {
+    PAYMENTS_SOURCE: {
+        "model": Payment,
+        "date_field": "created_at",
+        "rollup": PaymentDailyRollup,
+        "annotations": {},
+        "group_by": ("payment_type", "status", "currency"),
+        "aggregates": lambda: {"payments_count": Count("id"), "amount": Sum("amount")},
+        "build": _payment_rollups,
+    },
+    CLASSES_SOURCE: {
+        "model": StudioClass,
+        "date_field": "start_at",
+        "rollup": ClassDailyRollup,
+        "annotations": {"start_hour": ExtractHour("start_at")},
+        "group_by": ("start_hour", "establishment_id", "room_id", "instructor_id", "status"),
+        "aggregates": lambda: {
+            "classes_count": Count("id"),
+            "booked_time": Sum(ExpressionWrapper(F("end_at") - F("start_at"), output_field=DurationField())),
+            "capacity": Sum("capacity"),
+        },
+        "build": _class_rollups,
+    },
+}
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min), timezone.get_current_timezone())
+
+
+def _source_rows(spec, organization_id, days=None):
+    queryset = spec["model"].objects.filter(organization_id=organization_id)
+    if days is not None:
+        # The range lets the (organization, timestamp) indexes do the work; day__in trims the gaps.
+        queryset = queryset.filter(
+            **{
+                f"{spec['date_field']}__gte": _day_start(min(days)),
+                f"{spec['date_field']}__lt": _day_start(max(days) + timedelta(days=1)),
+            }
+        )
+    queryset = queryset.annotate(day=TruncDate(spec["date_field"]), **spec["annotations"])
+    if days is not None:
+        queryset = queryset.filter(day__in=days)
+    return queryset.order_by().values("day", *spec["group_by"]).annotate(**spec["aggregates"]())
+
+
+def rebuild_days(source, organization_id, days=None):
+    """Recompute an organization's rollup rows for the given days (all days when None)."""
+    spec = ROLLUP_SOURCES[source]
+    existing = spec["rollup"].objects.filter(organization_id=organization_id)
+    if days is not None:
+        days = sorted(days)
+        existing = existing.filter(day__in=days)
+    existing.delete()
+    rollups = spec["build"](organization_id, _source_rows(spec, organization_id, days))
+    spec["rollup"].objects.bulk_create(rollups, batch_size=500)
+    return len(rollups)
+
+
+def _changed_days(spec, since, until):
+    return set(
+        spec["model"].objects.filter(updated_at__gt=since, updated_at__lte=until)
+        .annotate(day=TruncDate(spec["date_field"]))
+        .order_by()
+        .values_list("organization_id", "day")
+        .distinct()
+    )
+
+
+def mark_dirty_day(source, organization_id, moment):
+    """Queue an (organization, day) bucket the watermark cannot notice (e.g. a deleted row)."""
+    if not organization_id or moment is None:
+        return
+    RollupDirtyDay.objects.bulk_create(
+        [RollupDirtyDay(source=source, organization_id=organization_id, day=timezone.localdate(moment))],
+        ignore_conflicts=True,
+    )
+
+
+def refresh_source(source, full=False):
+    """Fold the changes since the watermark into one rollup table; returns the rollup rows written."""
+    spec = ROLLUP_SOURCES[source]
+    until = timezone.now()
+    overlap = timedelta(seconds=int(getattr(settings, "STUDIO_ANALYTICS_WATERMARK_OVERLAP", 300)))
+    with transaction.atomic():
+        # The row lock serializes concurrent refreshes of the same source.
+        watermark, _created = RollupWatermark.objects.select_for_update().get_or_create(source=source)
+        dirty = list(RollupDirtyDay.objects.filter(source=source).values_list("id", "organization_id", "day"))
+
+        if full or watermark.value is None:
+            spec["rollup"].objects.all().delete()
+            organization_ids = spec["model"].objects.order_by().values_list("organization_id", flat=True).distinct()
+            written = sum(rebuild_days(source, organization_id) for organization_id in list(organization_ids))
+        else:
+            keys = _changed_days(spec, watermark.value - overlap, until)
+            keys.update((organization_id, day) for _id, organization_id, day in dirty)
+            days_by_organization = defaultdict(set)
+            for organization_id, day in keys:
+                days_by_organization[organization_id].add(day)
+            written = sum(
+                rebuild_days(source, organization_id, days) for organization_id, days in days_by_organization.items()
+            )
+
+        RollupDirtyDay.objects.filter(id__in=[row[0] for row in dirty]).delete()
+        watermark.value = until
+        watermark.save(update_fields=["value", "updated_at"])
+    return written
+
+
+def refresh_rollups(full=False):
+    return {source: refresh_source(source, full=full) for source in ROLLUP_SOURCES}
+
+
+def get_watermark():
+    """Oldest watermark across sources: every rollup includes the changes up to this moment."""
+    values = list(RollupWatermark.objects.filter(source__in=ROLLUP_SOURCES).values_list("value", flat=True))
+    if len(values) < len(ROLLUP_SOURCES) or None in values:
+        return None
+    return min(values)
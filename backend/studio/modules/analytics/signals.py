@@ -0,0 +1,31 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from studio.models import Payment, StudioClass
+from studio.modules.classes.signals import PREVIOUS_STATE_ATTR
+
+from .rollups import CLASSES_SOURCE, PAYMENTS_SOURCE, mark_dirty_day
+
+# Inserts and updates reach the rollups through updated_at watermarks; these receivers only
+# record the days that would otherwise keep counting a row that left them.
+
+
+@receiver(post_save, sender=StudioClass, dispatch_uid="studio_analytics_class_saved")
+def mark_previous_class_day(sender, instance, created, **kwargs):
+    previous = getattr(instance, PREVIOUS_STATE_ATTR, None)
+    if created or not previous:
+        return
+    previous_day = (previous["organization_id"], timezone.localdate(previous["start_at"]))
+    if previous_day != (instance.organization_id, timezone.localdate(instance.start_at)):
+        mark_dirty_day(CLASSES_SOURCE, previous["organization_id"], previous["start_at"])
+
+
+@receiver(post_delete, sender=StudioClass, dispatch_uid="studio_analytics_class_deleted")
+def mark_deleted_class_day(sender, instance, **kwargs):
+    mark_dirty_day(CLASSES_SOURCE, instance.organization_id, instance.start_at)
+
+
+@receiver(post_delete, sender=Payment, dispatch_uid="studio_analytics_payment_deleted")
+def mark_deleted_payment_day(sender, instance, **kwargs):
+    mark_dirty_day(PAYMENTS_SOURCE, instance.organization_id, instance.created_at)
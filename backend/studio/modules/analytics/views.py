@@ -0,0 +1,181 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import F, Sum
+from django.db.models.functions import TruncMonth, TruncWeek
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from studio.modules.core.services import get_owned_org_ids
+from studio.modules.users.services import is_owner, is_platform_admin
+
+from .jobs import enqueue_rollup_refresh_if_due
+from .models import ClassDailyRollup, PaymentDailyRollup
+from .rollups import get_watermark
+
+BUCKETS = {
+    "day": lambda: F("day"),
+    "week": lambda: TruncWeek("day"),
+    "month": lambda: TruncMonth("day"),
+}
+REVENUE_DIMENSIONS = {"payment_type": "payment_type", "status": "status", "currency": "currency"}
+OCCUPANCY_DIMENSIONS = {
+    "establishment": "establishment_id",
+    "room": "room_id",
+    "instructor": "instructor_id",
+    "status": "status",
+    "hour": "start_hour",
+}
+REVENUE_FILTERS = {"payment_type": "payment_type", "status": "status", "currency": "currency"}
+OCCUPANCY_FILTERS = {
+    "establishment_id": "establishment_id",
+    "room_id": "room_id",
+    "instructor_id": "instructor_id",
+    "status": "status",
+}
+
+
+def _resolve_organization_ids(request):
+    """(organization ids or None for every organization, error response)."""
+    user = request.user
+    requested = request.query_params.get("organization_id")
+    if requested:
+        try:
+            requested = int(requested)
+        except (TypeError, ValueError):
+            return None, Response({"detail": "organization_id debe ser numerico"}, status=status.HTTP_400_BAD_REQUEST)
+
+    if is_platform_admin(user):
+        return ([requested] if requested else None), None
+    if not is_owner(user):
+        return None, Response({"detail": "Solo owner/admin puede consultar analiticas"}, status=status.HTTP_403_FORBIDDEN)
+    owned = get_owned_org_ids(user)
+    if requested:
+        if requested not in owned:
+            return None, Response({"detail": "No puedes consultar otra organizacion"}, status=status.HTTP_403_FORBIDDEN)
+        return [requested], None
+    return list(owned), None
+
+
+def _parse_date(value, field):
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} debe tener formato YYYY-MM-DD")
+
+
+def _parse_filter(param, value):
+    if not param.endswith("_id"):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{param} debe ser numerico")
+
+
+def _parse_query(request, dimensions):
+    params = request.query_params
+    bucket = params.get("bucket") or "day"
+    if bucket not in BUCKETS:
+        raise ValueError("bucket debe ser day, week o month")
+
+    date_to = _parse_date(params["date_to"], "date_to") if params.get("date_to") else timezone.localdate()
+    date_from = (
+        _parse_date(params["date_from"], "date_from") if params.get("date_from") else date_to - timedelta(days=90)
+    )
+    if date_from > date_to:
+        raise ValueError("date_from no puede ser posterior a date_to")
+    max_days = int(getattr(settings, "STUDIO_ANALYTICS_MAX_DAYS", 731))
+    if (date_to - date_from).days >= max_days:
+        raise ValueError(f"El rango no puede superar {max_days} dias")
+
+    group_by = [name.strip() for name in (params.get("group_by") or "").split(",") if name.strip()]
+    unknown = [name for name in group_by if name not in dimensions]
+    if unknown:
+        raise ValueError(f"group_by invalido: {', '.join(unknown)}. Opciones: {', '.join(dimensions)}")
+    return bucket, date_from, date_to, group_by
+
+
+def _money(value):
+    return str(Decimal(value or 0).quantize(Decimal("0.01")))
+
+
+def _series(request, queryset, dimensions, group_by, aggregates, serialize, filters=None):
+    organization_ids, error_response = _resolve_organization_ids(request)
+    if error_response:
+        return error_response
+    try:
+        bucket, date_from, date_to, extra_group_by = _parse_query(request, dimensions)
+        for param, field in (filters or {}).items():
+            value = request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{field: _parse_filter(param, value)})
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    queryset = queryset.filter(day__gte=date_from, day__lte=date_to)
+    if organization_ids is not None:
+        queryset = queryset.filter(organization_id__in=organization_ids)
+
+    group_fields = {name: F(dimensions[name]) for name in dict.fromkeys([*group_by, *extra_group_by])}
+    rows = (
+        queryset.annotate(period=BUCKETS[bucket](), **{f"group_{name}": value for name, value in group_fields.items()})
+        .order_by()
+        .values("period", *(f"group_{name}" for name in group_fields))
+        .annotate(**aggregates)
+        .order_by("period", *(f"group_{name}" for name in group_fields))
+    )
+
+    # Serve what the rollups hold now and let a worker catch them up if they fell behind.
+    enqueue_rollup_refresh_if_due()
+    watermark = get_watermark()
+    return Response(
+        {
+            "bucket": bucket,
+            "date_from": date_from.isoformat(),
+            "date_to": date_to.isoformat(),
+            "group_by": list(group_fields),
+            "refreshed_at": watermark.isoformat() if watermark else None,
+            "results": [
+                {
+                    "period": row["period"].isoformat()[:10],
+                    **{name: row[f"group_{name}"] for name in group_fields},
+                    **serialize(row),
+                }
+                for row in rows
+            ],
+        }
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def analytics_revenue(request):
+    return _series(
+        request,
+        PaymentDailyRollup.objects.all(),
+        REVENUE_DIMENSIONS,
+        # Amounts in different currencies never add up.
+        group_by=["currency"],
+        aggregates={"payments": Sum("payments_count"), "total": Sum("amount")},
+        serialize=lambda row: {"payments": row["payments"], "amount": _money(row["total"])},
+        filters=REVENUE_FILTERS,
+    )
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def analytics_occupancy(request):
+    return _series(
+        request,
+        ClassDailyRollup.objects.all(),
+        OCCUPANCY_DIMENSIONS,
+        group_by=[],
+        aggregates={"classes": Sum("classes_count"), "hours": Sum("booked_hours"), "seats": Sum("capacity")},
+        serialize=lambda row: {"classes": row["classes"], "booked_hours": _money(row["hours"]), "capacity": row["seats"]},
+        filters=OCCUPANCY_FILTERS,
+    )
@@ -0,0 +1,100 @@
+import hashlib
+import re
+import unicodedata
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.utils import timezone
+
+from .context import context_fingerprint
+from .models import AIAssistantInteraction
+
+SIMILARITY_CANDIDATES = 200
+_NON_WORD_RE = re.compile(r"[^a-z0-9]+")
+
+
+def normalize_question(question):
+    """Lowercase, accent-free, punctuation-free form ("¿Cuántas clases?" -> "cuantas clases")."""
+    text = unicodedata.normalize("NFKD", str(question or "").lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    return _NON_WORD_RE.sub(" ", text).strip()
+
+
+def question_shingles(normalized):
+    padded = f" {normalized} "
+    return {padded[index:index + 3] for index in range(max(1, len(padded) - 2))}
+
+
+def question_similarity(left, right):
+    left_shingles = question_shingles(left)
+    right_shingles = question_shingles(right)
+    return len(left_shingles & right_shingles) / len(left_shingles | right_shingles)
+
+
+def _get_answer_cache_timeout():
+    return int(getattr(settings, "STUDIO_AI_ANSWER_CACHE_TIMEOUT", 0) or 0)
+
+
+def prompt_fingerprint(config):
+    """Hash of the generation settings besides provider/model: a new prompt or temperature is a new answer."""
+    temperature = Decimal(str(config.temperature or 0)).quantize(Decimal("0.01"))
+    raw = f"{config.system_prompt or ''}\x00{temperature}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def build_answer_lookup(organization, config, question, context_payload):
+    """Cache fields stored on every interaction; the key is what exact hits match on."""
+    normalized = normalize_question(question)
+    fingerprint = context_fingerprint(context_payload)
+    prompt_digest = prompt_fingerprint(config)
+    raw_key = "|".join(
+        (str(organization.id), config.provider, config.model or "", prompt_digest, normalized, fingerprint)
+    )
+    return {
+        "question_normalized": normalized,
+        "context_fingerprint": fingerprint,
+        "prompt_fingerprint": prompt_digest,
+        "answer_cache_key": hashlib.sha256(raw_key.encode("utf-8")).hexdigest(),
+    }
+
+
+def find_cached_answer(organization, config, lookup):
+    """
+    Earlier answer for the same question over the same business context and prompt settings, or None.
+
+    Exact hits match the cache key. With STUDIO_AI_ANSWER_CACHE_SIMILARITY > 0, the most recent
+    answers over the same context fingerprint are also compared by character trigram overlap.
+    Only provider answers (not earlier hits) are candidates.
+    """
+    timeout = _get_answer_cache_timeout()
+    if not timeout or not lookup["question_normalized"]:
+        return None, AIAssistantInteraction.CACHE_MISS
+
+    candidates = AIAssistantInteraction.objects.filter(
+        organization=organization,
+        status=AIAssistantInteraction.STATUS_SUCCESS,
+        cached_from__isnull=True,
+        created_at__gte=timezone.now() - timedelta(seconds=timeout),
+    ).exclude(answer="")
+    exact = candidates.filter(answer_cache_key=lookup["answer_cache_key"]).order_by("-created_at", "-id").first()
+    if exact:
+        return exact, AIAssistantInteraction.CACHE_HIT
+
+    threshold = float(getattr(settings, "STUDIO_AI_ANSWER_CACHE_SIMILARITY", 0) or 0)
+    if threshold <= 0:
+        return None, AIAssistantInteraction.CACHE_MISS
+    similar_rows = candidates.filter(
+        context_fingerprint=lookup["context_fingerprint"],
+        prompt_fingerprint=lookup["prompt_fingerprint"],
+        provider=config.provider,
+        model=config.model,
+    ).order_by("-created_at", "-id").values_list("id", "question_normalized")[:SIMILARITY_CANDIDATES]
+    best_id, best_score = None, 0.0
+    for interaction_id, normalized in similar_rows:
+        score = question_similarity(lookup["question_normalized"], normalized) if normalized else 0.0
+        if score > best_score:
+            best_id, best_score = interaction_id, score
+    if best_id is None or best_score < threshold:
+        return None, AIAssistantInteraction.CACHE_MISS
+    return AIAssistantInteraction.objects.get(id=best_id), AIAssistantInteraction.CACHE_SIMILAR
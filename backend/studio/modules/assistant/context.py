@@ -0,0 +1,302 @@
+import hashlib
+import json
+import uuid
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from studio.models import (
+    AIContextSnapshot,
+    InstructorProfile,
+    InstructorSettlement,
+    MembershipPlan,
+    Payment,
+    SocialCampaign,
+    SocialPost,
+    Student,
+    StudioClass,
+)
+from studio.modules.core.cache import is_shared_cache
+
+CONTEXT_VERSION_KEY = "studio:ai-context-version:{organization_id}:{section}"
+CONTEXT_SECTION_KEY = "studio:ai-context:{organization_id}:{section}:{max_items}:v{version}"
+
+
+def _organization_section(organization):
+    return {
+        "id": organization.id,
+        "name": organization.name,
+        "subscription_plan": organization.subscription_plan or "",
+        "subscription_status": organization.subscription_status or "",
+        "currency": organization.currency or "ARS",
+        "brand_color": organization.brand_color or "",
+    }
+
+
+def _classes_section(organization, max_items):
+    classes_qs = StudioClass.objects.filter(organization=organization).select_related(
+        "establishment",
+        "room",
+        "instructor",
+    )
+    upcoming_qs = classes_qs.filter(start_at__gte=timezone.now()).order_by("start_at")[:max_items]
+    status_counts = {
+        item["status"]: item["count"]
+        for item in classes_qs.values("status").annotate(count=Count("id"))
+    }
+    return {
+        "total": sum(status_counts.values()),
+        "status_counts": status_counts,
+        "upcoming": [
+            {
+                "name": studio_class.name,
+                "start_at": studio_class.start_at.isoformat(),
+                "end_at": studio_class.end_at.isoformat(),
+                "establishment": studio_class.establishment.name if studio_class.establishment_id else "",
+                "room": studio_class.room.name if studio_class.room_id else "",
+                "instructor": studio_class.instructor.username if studio_class.instructor_id else "",
+                "capacity": studio_class.capacity,
+                "booked": studio_class.booked_count,
+                "waitlisted": studio_class.waitlist_count,
+                "status": studio_class.status,
+            }
+            for studio_class in upcoming_qs
+        ],
+    }
+
+
+def _students_section(organization, max_items):
+    students_qs = Student.objects.filter(organization=organization)
+    return {
+        "total": students_qs.count(),
+        "active": students_qs.filter(is_active=True).count(),
+        "by_level": list(
+            students_qs.exclude(current_level="").values("current_level").annotate(count=Count("id")).order_by("-count")[:max_items]
+        ),
+        "recent": [
+            {
+                "name": f"{student.first_name} {student.last_name}".strip(),
+                "email": student.email,
+                "level": student.current_level or "",
+                "created_at": student.created_at.isoformat(),
+            }
+            for student in students_qs.order_by("-created_at")[:max_items]
+        ],
+    }
+
+
+def _finance_section(organization, max_items):
+    payments_qs = Payment.objects.filter(organization=organization)
+    approved_total = (
+        payments_qs.filter(status=Payment.STATUS_APPROVED).aggregate(total=Sum("amount")).get("total") or Decimal("0")
+    )
+    pending_total = (
+        payments_qs.filter(status=Payment.STATUS_PENDING).aggregate(total=Sum("amount")).get("total") or Decimal("0")
+    )
+    settlements_qs = InstructorSettlement.objects.filter(organization=organization)
+    membership_qs = MembershipPlan.objects.filter(organization=organization, is_active=True)
+    return {
+        "payments_total": payments_qs.count(),
+        "approved_total": float(approved_total),
+        "pending_total": float(pending_total),
+        "by_type": list(
+            payments_qs.values("payment_type", "status").annotate(total=Count("id"), amount=Sum("amount")).order_by("-amount")[:max_items]
+        ),
+        "membership_plans": [
+            {
+                "name": plan.name,
+                "price": float(plan.price),
+                "currency": plan.currency,
+                "duration_days": plan.duration_days,
+                "classes_per_week": plan.classes_per_week,
+            }
+            for plan in membership_qs[:max_items]
+        ],
+        "instructor_costs_pending": float(
+            settlements_qs.filter(status=InstructorSettlement.STATUS_PENDING).aggregate(total=Sum("amount")).get("total")
+            or Decimal("0")
+        ),
+    }
+
+
+def _instructors_section(organization, max_items):
+    instructors_qs = InstructorProfile.objects.filter(organization=organization).select_related("user")
+    return {
+        "total": instructors_qs.count(),
+        "active": instructors_qs.filter(is_active=True).count(),
+        "profiles": [
+            {
+                "username": profile.user.username,
+                "scheme": profile.compensation_scheme,
+                "hourly_rate": float(profile.hourly_rate),
+                "monthly_salary": float(profile.monthly_salary),
+                "class_rate": float(profile.class_rate),
+                "currency": profile.currency,
+            }
+            for profile in instructors_qs[:max_items]
+        ],
+    }
+
+
+def _marketing_section(organization, max_items):
+    return {
+        "social_posts": SocialPost.objects.filter(organization=organization).count(),
+        "social_campaigns": SocialCampaign.objects.filter(organization=organization).count(),
+    }
+
+
+# (section, AIAssistantConfig flag that enables it, builder); order is the order sent to the model.
+CONTEXT_SECTIONS = (
+    ("classes", "include_classes_context", _classes_section),
+    ("students", "include_students_context", _students_section),
+    ("finance", "include_finance_context", _finance_section),
+    ("instructors", "include_instructors_context", _instructors_section),
+    ("marketing", None, _marketing_section),
+)
+
+
+def _get_context_cache_timeout():
+    # Section versions are bumped by whichever process handled the write; they must be shared.
+    if not is_shared_cache():
+        return 0
+    return int(getattr(settings, "STUDIO_AI_CONTEXT_CACHE_TIMEOUT", 0) or 0)
+
+
+def _get_section_versions(organization_id, sections):
+    version_keys = {
+        section: CONTEXT_VERSION_KEY.format(organization_id=organization_id, section=section) for section in sections
+    }
+    found = cache.get_many(list(version_keys.values()))
+    versions = {}
+    for section, version_key in version_keys.items():
+        version = found.get(version_key)
+        if version is None:
+            cache.add(version_key, uuid.uuid4().hex, None)
+            version = cache.get(version_key)
+        versions[section] = version
+    return versions
+
+
+def build_business_context(organization, config):
+    """
+    Business snapshot sent to the model, one cached entry per section.
+
+    Each section is keyed by a per-organization version that the assistant signals bump when
+    its source models change, so a write only recomputes the sections it affects.
+    """
+    max_items = max(3, min(int(config.max_context_items or 8), 20))
+    enabled = [(section, builder) for section, flag, builder in CONTEXT_SECTIONS if not flag or getattr(config, flag)]
+
+    timeout = _get_context_cache_timeout()
+    section_keys = {}
+    cached = {}
+    if timeout and enabled:
+        versions = _get_section_versions(organization.id, [section for section, _builder in enabled])
+        section_keys = {
+            section: CONTEXT_SECTION_KEY.format(
+                organization_id=organization.id, section=section, max_items=max_items, version=versions[section]
+            )
+            for section, _builder in enabled
+        }
+        found = cache.get_many(list(section_keys.values()))
+        cached = {section: found[key] for section, key in section_keys.items() if key in found}
+
+    context = {"organization": _organization_section(organization)}
+    fresh = {}
+    for section, builder in enabled:
+        if section not in cached:
+            cached[section] = fresh[section] = builder(organization, max_items)
+        context[section] = cached[section]
+    if timeout and fresh:
+        cache.set_many({section_keys[section]: value for section, value in fresh.items()}, timeout)
+    return context
+
+
+def invalidate_business_context(organization_id, *sections):
+    """Bump the version of the given sections (all when none given) once the transaction commits."""
+    if not organization_id:
+        return
+    sections = sections or tuple(section for section, _flag, _builder in CONTEXT_SECTIONS)
+    new_versions = {
+        CONTEXT_VERSION_KEY.format(organization_id=organization_id, section=section): uuid.uuid4().hex
+        for section in sections
+    }
+    # After commit, so a reader in another transaction cannot cache pre-commit data under the new version.
+    transaction.on_commit(lambda: cache.set_many(new_versions, None))
+
+
+# Sections dropped first when the context does not fit the provider budget.
+CONTEXT_DROP_ORDER = ("marketing", "instructors", "students", "finance", "classes")
+BYTES_PER_TOKEN = 4
+
+
+def serialize_context(context_payload):
+    return json.dumps(context_payload, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def estimate_tokens(text):
+    return -(-len(text.encode("utf-8")) // BYTES_PER_TOKEN)
+
+
+def compact_context(value):
+    """Lists of same-shaped dicts become {"columns": [...], "rows": [[...], ...]} so keys are sent once."""
+    if isinstance(value, dict):
+        return {key: compact_context(item) for key, item in value.items()}
+    if isinstance(value, list):
+        items = [compact_context(item) for item in value]
+        if len(items) > 1 and all(isinstance(item, dict) for item in items):
+            columns = list(items[0])
+            if all(list(item) == columns for item in items[1:]):
+                return {"columns": columns, "rows": [[item[column] for column in columns] for item in items]}
+        return items
+    return value
+
+
+def get_context_token_budget(provider):
+    budgets = getattr(settings, "STUDIO_AI_CONTEXT_TOKEN_BUDGETS", {}) or {}
+    return int(budgets.get(provider) or budgets.get("default") or 0)
+
+
+def fit_context_to_budget(context_payload, max_tokens):
+    """Drop whole sections, least useful first, until the serialized context fits max_tokens."""
+    if not max_tokens or estimate_tokens(serialize_context(context_payload)) <= max_tokens:
+        return context_payload
+    context_payload = dict(context_payload)
+    omitted = []
+    for section in CONTEXT_DROP_ORDER:
+        if section not in context_payload:
+            continue
+        context_payload.pop(section)
+        omitted.append(section)
+        context_payload["omitted_sections"] = omitted
+        if estimate_tokens(serialize_context(context_payload)) <= max_tokens:
+            break
+    return context_payload
+
+
+def context_fingerprint(context_payload):
+    encoded = json.dumps(context_payload, sort_keys=True, ensure_ascii=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def store_context_snapshot(organization_id, context_payload):
+    """Content-addressed copy of a prompt context: interactions over the same context share one row."""
+    snapshot, _created = AIContextSnapshot.objects.get_or_create(
+        digest=context_fingerprint(context_payload),
+        defaults={
+            "organization_id": organization_id,
+            "payload": context_payload,
+            "size_bytes": len(serialize_context(context_payload).encode("utf-8")),
+        },
+    )
+    return snapshot
+
+
+def build_prompt_context(organization, config):
+    """Business context as sent to the provider: compacted and trimmed to the provider budget."""
+    context_payload = compact_context(build_business_context(organization, config))
+    return fit_context_to_budget(context_payload, get_context_token_budget(config.provider))
@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+
+from studio.models import Organization
+from studio.modules.jobs.services import PermanentJobError, register_job
+
+from .views import (
+    ASSISTANT_ASK_JOB,
+    LLM_ERRORS,
+    build_prompt_context,
+    get_or_create_config_for_org,
+    lookup_cached_answer,
+    record_interaction,
+    run_llm_query,
+)
+
+User = get_user_model()
+
+
+@register_job(ASSISTANT_ASK_JOB, max_attempts=3)
+def assistant_ask_job(payload, job):
+    organization = Organization.objects.filter(id=payload.get("organization_id")).first()
+    if organization is None:
+        raise PermanentJobError("Organizacion no encontrada")
+    config = get_or_create_config_for_org(organization)
+    if not config.is_enabled:
+        raise PermanentJobError("El modulo IA no esta activo")
+
+    user = User.objects.filter(id=payload.get("user_id")).first()
+    question = str(payload.get("question") or "").strip()
+    context_payload = build_prompt_context(organization, config)
+    hit, cache_fields = lookup_cached_answer(
+        organization, user, config, question, context_payload, use_cache=payload.get("use_cache", True)
+    )
+    if hit:
+        return {"interaction_id": hit.id, "answer": hit.answer, "cached": True}
+
+    try:
+        answer = run_llm_query(config, question, context_payload)
+    except LLM_ERRORS as error:
+        if job.attempts < job.max_attempts:
+            raise
+        # Only the last attempt leaves an error interaction in the history.
+        record_interaction(organization, user, config, question, context_payload, error=error, cache_fields=cache_fields)
+        raise PermanentJobError(f"No se pudo consultar el proveedor IA: {error}")
+
+    interaction = record_interaction(
+        organization, user, config, question, context_payload, answer=answer, cache_fields=cache_fields
+    )
+    return {"interaction_id": interaction.id, "answer": answer, "cached": False}
@@ -39,6 +39,24 @@ class AIAssistantConfig(models.Model):
         return f"{self.organization.name} - {self.provider}"
 
 
+class AIContextSnapshot(models.Model):
+    organization = models.ForeignKey(
+        "studio.Organization",
+        on_delete=models.CASCADE,
+        related_name="ai_context_snapshots",
+    )
+    digest = models.CharField(max_length=64, unique=True)
+    payload = models.JSONField(default=dict, blank=True)
+    size_bytes = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ("-created_at", "-id")
+
+    def __str__(self):
+        return f"{self.organization_id} - {self.digest[:12]}"
+
+
 class AIAssistantInteraction(models.Model):
     STATUS_SUCCESS = "success"
     STATUS_ERROR = "error"
@@ -46,6 +64,16 @@ class AIAssistantInteraction(models.Model):
         (STATUS_SUCCESS, "Success"),
         (STATUS_ERROR, "Error"),
     )
+    CACHE_MISS = "miss"
+    CACHE_HIT = "hit"
+    CACHE_SIMILAR = "similar"
+    CACHE_BYPASS = "bypass"
+    CACHE_STATUS_CHOICES = (
+        (CACHE_MISS, "Miss"),
+        (CACHE_HIT, "Hit"),
+        (CACHE_SIMILAR, "Similar hit"),
+        (CACHE_BYPASS, "Bypass"),
+    )
 
     organization = models.ForeignKey(
         "studio.Organization",
@@ -65,11 +93,35 @@ class AIAssistantInteraction(models.Model):
     answer = models.TextField(blank=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_SUCCESS)
     error_message = models.TextField(blank=True)
+    # Legacy inline copy; new rows point at a shared AIContextSnapshot instead.
     context_snapshot = models.JSONField(default=dict, blank=True)
+    context_ref = models.ForeignKey(
+        AIContextSnapshot,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="interactions",
+    )
+    question_normalized = models.TextField(blank=True)
+    context_fingerprint = models.CharField(max_length=64, blank=True)
+    prompt_fingerprint = models.CharField(max_length=64, blank=True)
+    answer_cache_key = models.CharField(max_length=64, blank=True)
+    cache_status = models.CharField(max_length=20, choices=CACHE_STATUS_CHOICES, blank=True)
+    cached_from = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="cache_hits",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ("-created_at", "-id")
+        indexes = [
+            models.Index(fields=["organization", "answer_cache_key", "-created_at"], name="aiinteraction_cache_key_idx"),
+            models.Index(fields=["organization", "context_fingerprint", "-created_at"], name="aiinteraction_fprint_idx"),
+        ]
 
     def __str__(self):
         return f"{self.organization.name} - {self.provider} - {self.created_at:%Y-%m-%d %H:%M}"
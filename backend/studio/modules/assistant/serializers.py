@@ -33,6 +33,7 @@ class AIAssistantConfigSerializer(serializers.ModelSerializer):
 class AIAssistantInteractionSerializer(serializers.ModelSerializer):
     provider_label = serializers.CharField(source="get_provider_display", read_only=True)
     username = serializers.CharField(source="user.username", read_only=True)
+    context_snapshot = serializers.SerializerMethodField()
 
     class Meta:
         model = AIAssistantInteraction
@@ -49,6 +50,13 @@ class AIAssistantInteractionSerializer(serializers.ModelSerializer):
             "status",
             "error_message",
             "context_snapshot",
+            "cache_status",
+            "cached_from",
             "created_at",
         )
         read_only_fields = fields
+
+    def get_context_snapshot(self, obj):
+        if obj.context_ref_id:
+            return obj.context_ref.payload
+        return obj.context_snapshot
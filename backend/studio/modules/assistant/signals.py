@@ -0,0 +1,41 @@
+from django.db.models.signals import post_delete, post_save
+
+from studio.models import (
+    ClassBooking,
+    InstructorProfile,
+    InstructorSettlement,
+    MembershipPlan,
+    Payment,
+    SocialCampaign,
+    SocialPost,
+    Student,
+    StudioClass,
+)
+
+from .context import invalidate_business_context
+
+# Context sections fed by each model; bulk writers call invalidate_business_context themselves.
+CONTEXT_SOURCES = {
+    StudioClass: ("classes",),
+    ClassBooking: ("classes",),
+    Student: ("students",),
+    Payment: ("finance",),
+    InstructorSettlement: ("finance",),
+    MembershipPlan: ("finance",),
+    InstructorProfile: ("instructors",),
+    SocialPost: ("marketing",),
+    SocialCampaign: ("marketing",),
+}
+
+
+def _invalidate_context_sections(sender, instance, **kwargs):
+    invalidate_business_context(instance.organization_id, *CONTEXT_SOURCES[sender])
+
+
+for _model in CONTEXT_SOURCES:
+    post_save.connect(
+        _invalidate_context_sections, sender=_model, dispatch_uid=f"studio_ai_context_saved_{_model.__name__}"
+    )
+    post_delete.connect(
+        _invalidate_context_sections, sender=_model, dispatch_uid=f"studio_ai_context_deleted_{_model.__name__}"
+    )
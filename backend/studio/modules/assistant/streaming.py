@@ -0,0 +1,176 @@
+import json
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from studio.models import AIAssistantConfig
+from studio.modules.core.http_client import AsyncStream
+
+from .serializers import AIAssistantInteractionSerializer
+from .views import (
+    AskRequestError,
+    build_gemini_request,
+    build_prompt_context,
+    build_ollama_request,
+    build_openai_request,
+    gemini_text,
+    lookup_cached_answer,
+    record_interaction,
+    resolve_ask_request,
+    wants_answer_cache,
+)
+
+STREAM_ERRORS = (httpx.HTTPError, ValueError)
+
+
+async def _iter_sse_data(response):
+    async for line in response.aiter_lines():
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data and data != "[DONE]":
+            yield json.loads(data)
+
+
+async def stream_openai(config, question, context_payload):
+    url, payload, headers = build_openai_request(config, question, context_payload, stream=True)
+    stream = AsyncStream("POST", url, json=payload, headers=headers, timeout=settings.STUDIO_AI_HTTP_TIMEOUT)
+    async with stream as response:
+        response.raise_for_status()
+        async for event in _iter_sse_data(response):
+            if event.get("type") == "response.output_text.delta" and event.get("delta"):
+                yield event["delta"]
+            elif event.get("type") in ("error", "response.failed"):
+                raise ValueError(f"OpenAI devolvio un error: {event.get('message') or event.get('type')}")
+
+
+async def stream_gemini(config, question, context_payload):
+    url, payload, headers = build_gemini_request(config, question, context_payload, stream=True)
+    stream = AsyncStream("POST", url, json=payload, headers=headers, timeout=settings.STUDIO_AI_HTTP_TIMEOUT)
+    async with stream as response:
+        response.raise_for_status()
+        async for event in _iter_sse_data(response):
+            text = gemini_text(event)
+            if text:
+                yield text
+
+
+async def stream_ollama(config, question, context_payload):
+    url, payload, headers = build_ollama_request(config, question, context_payload, stream=True)
+    stream = AsyncStream("POST", url, json=payload, headers=headers, timeout=settings.STUDIO_AI_HTTP_TIMEOUT)
+    async with stream as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.strip():
+                continue
+            chunk = json.loads(line)
+            if chunk.get("error"):
+                raise ValueError(f"Ollama devolvio un error: {chunk['error']}")
+            if chunk.get("response"):
+                yield chunk["response"]
+            if chunk.get("done"):
+                break
+
+
+PROVIDER_STREAMS = {
+    AIAssistantConfig.PROVIDER_OPENAI: stream_openai,
+    AIAssistantConfig.PROVIDER_GEMINI: stream_gemini,
+    AIAssistantConfig.PROVIDER_OLLAMA: stream_ollama,
+}
+
+
+def sse_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@sync_to_async
+def _persist_interaction(organization, user, config, question, context_payload, answer, error=None, cache_fields=None):
+    interaction = record_interaction(
+        organization, user, config, question, context_payload, answer=answer, error=error, cache_fields=cache_fields
+    )
+    return AIAssistantInteractionSerializer(interaction).data
+
+
+async def stream_answer(organization, user, config, question, context_payload, hit=None, cache_fields=None):
+    provider_stream = PROVIDER_STREAMS.get(config.provider, stream_openai)
+    chunks = []
+    yield sse_event("start", {"organization_id": organization.id, "provider": config.provider, "cached": bool(hit)})
+    if hit:
+        interaction = await sync_to_async(lambda: AIAssistantInteractionSerializer(hit).data)()
+        yield sse_event("token", {"text": hit.answer})
+        yield sse_event("done", {"answer": hit.answer, "interaction": interaction, "cached": True})
+        return
+
+    try:
+        async for chunk in provider_stream(config, question, context_payload):
+            chunks.append(chunk)
+            yield sse_event("token", {"text": chunk})
+        answer = "".join(chunks).strip()
+        if not answer:
+            raise ValueError("El proveedor IA no devolvio texto util")
+    except STREAM_ERRORS as error:
+        interaction = await _persist_interaction(
+            organization,
+            user,
+            config,
+            question,
+            context_payload,
+            "".join(chunks).strip(),
+            error=error,
+            cache_fields=cache_fields,
+        )
+        yield sse_event(
+            "error",
+            {"detail": f"No se pudo consultar el proveedor IA: {error}", "interaction": interaction},
+        )
+        return
+
+    interaction = await _persist_interaction(
+        organization, user, config, question, context_payload, answer, cache_fields=cache_fields
+    )
+    yield sse_event("done", {"answer": answer, "interaction": interaction, "cached": False})
+
+
+@csrf_exempt
+@require_POST
+async def ai_assistant_ask_stream(request):
+    """Server-sent events version of ai_assistant_ask: start, token..., then done or error."""
+    try:
+        authenticated = await sync_to_async(JWTAuthentication().authenticate)(request)
+    except AuthenticationFailed as error:
+        detail = error.detail if isinstance(error.detail, dict) else {"detail": str(error.detail)}
+        return JsonResponse(detail, status=401)
+    if authenticated is None:
+        return JsonResponse({"detail": "No autenticado"}, status=401)
+    user = authenticated[0]
+
+    try:
+        data = json.loads(request.body or b"{}")
+    except ValueError:
+        return JsonResponse({"detail": "JSON invalido"}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({"detail": "JSON invalido"}, status=400)
+
+    try:
+        organization, config, question = await sync_to_async(resolve_ask_request)(user, data)
+    except AskRequestError as error:
+        return JsonResponse({"detail": error.detail}, status=error.status_code)
+    context_payload = await sync_to_async(build_prompt_context)(organization, config)
+    hit, cache_fields = await sync_to_async(lookup_cached_answer)(
+        organization, user, config, question, context_payload, use_cache=wants_answer_cache(data)
+    )
+
+    response = StreamingHttpResponse(
+        stream_answer(organization, user, config, question, context_payload, hit=hit, cache_fields=cache_fields),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    # Keep nginx (or any proxy honouring it) from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
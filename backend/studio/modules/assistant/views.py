@@ -1,33 +1,21 @@
-import json
-import urllib.error
 import urllib.parse
-import urllib.request
 from decimal import Decimal
 
-from django.db.models import Avg, Count, Sum
+import httpx
+from django.conf import settings
 from django.shortcuts import get_object_or_404
-from django.utils import timezone
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from studio.models import (
-    AIAssistantConfig,
-    AIAssistantInteraction,
-    InstructorProfile,
-    InstructorSettlement,
-    MembershipPlan,
-    Organization,
-    OrganizationMembership,
-    Payment,
-    SocialCampaign,
-    SocialPost,
-    Student,
-    StudioClass,
-)
-from studio.modules.users.services import is_owner, is_platform_admin
+from studio.models import AIAssistantConfig, AIAssistantInteraction, Organization
+from studio.modules.core.http_client import post_json
+from studio.modules.core.services import get_authorized_org_ids
+from studio.modules.jobs.services import enqueue_job
 
+from .answer_cache import build_answer_lookup, find_cached_answer
+from .context import build_prompt_context, serialize_context, store_context_snapshot
 from .serializers import AIAssistantConfigSerializer, AIAssistantInteractionSerializer
 
 
@@ -39,20 +27,6 @@ DEFAULT_SYSTEM_PROMPT = (
 )
 
 
-def get_owned_org_ids(user):
-    return list(
-        OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-    )
-
-
-def get_authorized_org_ids(user):
-    if is_platform_admin(user):
-        return list(Organization.objects.values_list("id", flat=True))
-    if is_owner(user):
-        return get_owned_org_ids(user)
-    return []
-
-
 def get_default_model(provider):
     if provider == AIAssistantConfig.PROVIDER_GEMINI:
         return "gemini-2.0-flash"
@@ -81,163 +55,47 @@ def get_or_create_config_for_org(organization):
     return config
 
 
-def build_business_context(organization, config):
-    now = timezone.now()
-    max_items = max(3, min(int(config.max_context_items or 8), 20))
-    context = {
-        "organization": {
-            "id": organization.id,
-            "name": organization.name,
-            "subscription_plan": organization.subscription_plan or "",
-            "subscription_status": organization.subscription_status or "",
-            "currency": organization.currency or "ARS",
-            "brand_color": organization.brand_color or "",
-        }
-    }
+OPENAI_BASE_URL = "https://api.openai.com"
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+OLLAMA_BASE_URL = "http://localhost:11434"
 
-    if config.include_classes_context:
-        classes_qs = StudioClass.objects.filter(organization=organization).select_related(
-            "establishment",
-            "room",
-            "instructor",
-        )
-        upcoming_qs = classes_qs.filter(start_at__gte=now).order_by("start_at")[:max_items]
-        status_counts = {
-            item["status"]: item["count"]
-            for item in classes_qs.values("status").annotate(count=Count("id"))
-        }
-        context["classes"] = {
-            "total": classes_qs.count(),
-            "status_counts": status_counts,
-            "upcoming": [
-                {
-                    "name": studio_class.name,
-                    "start_at": studio_class.start_at.isoformat(),
-                    "end_at": studio_class.end_at.isoformat(),
-                    "establishment": studio_class.establishment.name if studio_class.establishment_id else "",
-                    "room": studio_class.room.name if studio_class.room_id else "",
-                    "instructor": studio_class.instructor.username if studio_class.instructor_id else "",
-                    "capacity": studio_class.capacity,
-                    "status": studio_class.status,
-                }
-                for studio_class in upcoming_qs
-            ],
-        }
 
-    if config.include_students_context:
-        students_qs = Student.objects.filter(organization=organization)
-        context["students"] = {
-            "total": students_qs.count(),
-            "active": students_qs.filter(is_active=True).count(),
-            "by_level": list(
-                students_qs.exclude(current_level="").values("current_level").annotate(count=Count("id")).order_by("-count")[:max_items]
-            ),
-            "recent": [
-                {
-                    "name": f"{student.first_name} {student.last_name}".strip(),
-                    "email": student.email,
-                    "level": student.current_level or "",
-                    "created_at": student.created_at.isoformat(),
-                }
-                for student in students_qs.order_by("-created_at")[:max_items]
-            ],
-        }
-
-    if config.include_finance_context:
-        payments_qs = Payment.objects.filter(organization=organization)
-        approved_total = (
-            payments_qs.filter(status=Payment.STATUS_APPROVED).aggregate(total=Sum("amount")).get("total") or Decimal("0")
-        )
-        pending_total = (
-            payments_qs.filter(status=Payment.STATUS_PENDING).aggregate(total=Sum("amount")).get("total") or Decimal("0")
-        )
-        settlements_qs = InstructorSettlement.objects.filter(organization=organization)
-        membership_qs = MembershipPlan.objects.filter(organization=organization, is_active=True)
-        context["finance"] = {
-            "payments_total": payments_qs.count(),
-            "approved_total": float(approved_total),
-            "pending_total": float(pending_total),
-            "by_type": list(
-                payments_qs.values("payment_type", "status").annotate(total=Count("id"), amount=Sum("amount")).order_by("-amount")[:max_items]
-            ),
-            "membership_plans": [
-                {
-                    "name": plan.name,
-                    "price": float(plan.price),
-                    "currency": plan.currency,
-                    "duration_days": plan.duration_days,
-                    "classes_per_week": plan.classes_per_week,
-                }
-                for plan in membership_qs[:max_items]
-            ],
-            "instructor_costs_pending": float(
-                settlements_qs.filter(status=InstructorSettlement.STATUS_PENDING).aggregate(total=Sum("amount")).get("total")
-                or Decimal("0")
-            ),
-        }
+def provider_base_url(config, default):
+    # base_url also lets OpenAI/Gemini point at a compatible gateway (or the fake_llm_server command).
+    return (config.base_url or default).rstrip("/")
 
-    if config.include_instructors_context:
-        instructors_qs = InstructorProfile.objects.filter(organization=organization).select_related("user")
-        context["instructors"] = {
-            "total": instructors_qs.count(),
-            "active": instructors_qs.filter(is_active=True).count(),
-            "profiles": [
-                {
-                    "username": profile.user.username,
-                    "scheme": profile.compensation_scheme,
-                    "hourly_rate": float(profile.hourly_rate),
-                    "monthly_salary": float(profile.monthly_salary),
-                    "class_rate": float(profile.class_rate),
-                    "currency": profile.currency,
-                }
-                for profile in instructors_qs[:max_items]
-            ],
-        }
 
-    social_posts = SocialPost.objects.filter(organization=organization).count()
-    social_campaigns = SocialCampaign.objects.filter(organization=organization).count()
-    context["marketing"] = {
-        "social_posts": social_posts,
-        "social_campaigns": social_campaigns,
-    }
-    return context
+def build_user_prompt(question, context_payload):
+    return (
+        "Contexto del negocio:\n"
+        f"{serialize_context(context_payload)}\n\n"
+        f"Pregunta del owner:\n{question}"
+    )
 
 
-def call_openai(config, question, context_payload):
-    url = "https://api.openai.com/v1/responses"
+def build_openai_request(config, question, context_payload, stream=False):
+    url = f"{provider_base_url(config, OPENAI_BASE_URL)}/v1/responses"
     payload = {
         "model": config.model or get_default_model(config.provider),
         "instructions": config.system_prompt or DEFAULT_SYSTEM_PROMPT,
-        "input": (
-            "Contexto del negocio:\n"
-            f"{json.dumps(context_payload, ensure_ascii=True)}\n\n"
-            f"Pregunta del owner:\n{question}"
-        ),
+        "input": build_user_prompt(question, context_payload),
     }
-    data = json.dumps(payload).encode("utf-8")
-    request = urllib.request.Request(
-        url,
-        data=data,
-        headers={
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {config.api_key}",
-        },
-        method="POST",
-    )
-    with urllib.request.urlopen(request, timeout=60) as response:
-        payload = json.loads(response.read().decode("utf-8"))
-    if isinstance(payload.get("output_text"), str) and payload["output_text"].strip():
-        return payload["output_text"].strip()
-    for item in payload.get("output", []):
-        for content in item.get("content", []):
-            if content.get("type") == "output_text" and content.get("text"):
-                return content["text"].strip()
-    raise ValueError("OpenAI no devolvio texto util")
+    if stream:
+        payload["stream"] = True
+    headers = {
+        "Content-Type": "application/json",
+        "Authorization": f"Bearer {config.api_key}",
+    }
+    return url, payload, headers
 
 
-def call_gemini(config, question, context_payload):
+def build_gemini_request(config, question, context_payload, stream=False):
     model = config.model or get_default_model(config.provider)
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={urllib.parse.quote(config.api_key)}"
+    method = "streamGenerateContent?alt=sse&" if stream else "generateContent?"
+    url = (
+        f"{provider_base_url(config, GEMINI_BASE_URL)}/v1beta/models/{model}:{method}"
+        f"key={urllib.parse.quote(config.api_key)}"
+    )
     payload = {
         "system_instruction": {
             "parts": {"text": config.system_prompt or DEFAULT_SYSTEM_PROMPT},
@@ -245,66 +103,67 @@ def call_gemini(config, question, context_payload):
         "contents": [
             {
                 "role": "user",
-                "parts": [
-                    {
-                        "text": (
-                            "Contexto del negocio:\n"
-                            f"{json.dumps(context_payload, ensure_ascii=True)}\n\n"
-                            f"Pregunta del owner:\n{question}"
-                        )
-                    }
-                ],
+                "parts": [{"text": build_user_prompt(question, context_payload)}],
             }
         ],
         "generationConfig": {
             "temperature": float(config.temperature or 0.2),
         },
     }
-    request = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(request, timeout=60) as response:
-        payload = json.loads(response.read().decode("utf-8"))
+    return url, payload, {"Content-Type": "application/json"}
+
+
+def build_ollama_request(config, question, context_payload, stream=False):
+    url = f"{provider_base_url(config, OLLAMA_BASE_URL)}/api/generate"
+    payload = {
+        "model": config.model or get_default_model(config.provider),
+        "prompt": f"{config.system_prompt or DEFAULT_SYSTEM_PROMPT}\n\n{build_user_prompt(question, context_payload)}",
+        "stream": stream,
+        "options": {"temperature": float(config.temperature or 0.2)},
+    }
+    return url, payload, {"Content-Type": "application/json"}
+
+
+def gemini_text(payload):
     candidates = payload.get("candidates") or []
     parts = (((candidates[0] or {}).get("content") or {}).get("parts") or []) if candidates else []
-    text = "\n".join(part.get("text", "").strip() for part in parts if part.get("text")).strip()
+    return "\n".join(part.get("text", "").strip() for part in parts if part.get("text")).strip()
+
+
+def call_openai(config, question, context_payload):
+    url, payload, headers = build_openai_request(config, question, context_payload)
+    payload = post_json(url, payload, headers, timeout=settings.STUDIO_AI_HTTP_TIMEOUT)
+    if isinstance(payload.get("output_text"), str) and payload["output_text"].strip():
+        return payload["output_text"].strip()
+    for item in payload.get("output", []):
+        for content in item.get("content", []):
+            if content.get("type") == "output_text" and content.get("text"):
+                return content["text"].strip()
+    raise ValueError("OpenAI no devolvio texto util")
+
+
+def call_gemini(config, question, context_payload):
+    url, payload, headers = build_gemini_request(config, question, context_payload)
+    payload = post_json(url, payload, headers, timeout=settings.STUDIO_AI_HTTP_TIMEOUT)
+    text = gemini_text(payload)
     if not text:
         raise ValueError("Gemini no devolvio texto util")
     return text
 
 
 def call_ollama(config, question, context_payload):
-    base_url = (config.base_url or "http://localhost:11434").rstrip("/")
-    url = f"{base_url}/api/generate"
-    prompt = (
-        f"{config.system_prompt or DEFAULT_SYSTEM_PROMPT}\n\n"
-        "Contexto del negocio:\n"
-        f"{json.dumps(context_payload, ensure_ascii=True)}\n\n"
-        f"Pregunta del owner:\n{question}"
-    )
-    payload = {
-        "model": config.model or get_default_model(config.provider),
-        "prompt": prompt,
-        "stream": False,
-        "options": {"temperature": float(config.temperature or 0.2)},
-    }
-    request = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode("utf-8"),
-        headers={"Content-Type": "application/json"},
-        method="POST",
-    )
-    with urllib.request.urlopen(request, timeout=60) as response:
-        payload = json.loads(response.read().decode("utf-8"))
+    url, payload, headers = build_ollama_request(config, question, context_payload)
+    payload = post_json(url, payload, headers, timeout=settings.STUDIO_AI_HTTP_TIMEOUT)
     text = str(payload.get("response") or "").strip()
     if not text:
         raise ValueError("Ollama no devolvio texto util")
     return text
 
 
+LLM_ERRORS = (httpx.HTTPError, ValueError)
+ASSISTANT_ASK_JOB = "assistant.ask"
+
+
 def run_llm_query(config, question, context_payload):
     if config.provider == AIAssistantConfig.PROVIDER_GEMINI:
         return call_gemini(config, question, context_payload)
@@ -313,6 +172,86 @@ def run_llm_query(config, question, context_payload):
     return call_openai(config, question, context_payload)
 
 
+def record_interaction(organization, user, config, question, context_payload, answer="", error=None, cache_fields=None):
+    return AIAssistantInteraction.objects.create(
+        **(cache_fields or {}),
+        organization=organization,
+        user=user,
+        provider=config.provider,
+        model=config.model,
+        question=question,
+        answer=answer,
+        status=AIAssistantInteraction.STATUS_ERROR if error else AIAssistantInteraction.STATUS_SUCCESS,
+        error_message=str(error) if error else "",
+        context_ref=store_context_snapshot(organization.id, context_payload),
+    )
+
+
+def wants_answer_cache(data):
+    return str(data.get("cache", "1")).strip().lower() not in ("0", "false", "no")
+
+
+def lookup_cached_answer(organization, user, config, question, context_payload, use_cache=True):
+    """
+    Check the answer cache before calling the provider.
+
+    Returns (hit, cache_fields): on a hit the new interaction is already recorded and returned;
+    otherwise cache_fields must be passed to record_interaction with the provider answer.
+    """
+    lookup = build_answer_lookup(organization, config, question, context_payload)
+    if not use_cache:
+        return None, {**lookup, "cache_status": AIAssistantInteraction.CACHE_BYPASS}
+    source, cache_status = find_cached_answer(organization, config, lookup)
+    if source is None:
+        return None, {**lookup, "cache_status": cache_status}
+    hit = record_interaction(
+        organization,
+        user,
+        config,
+        question,
+        context_payload,
+        answer=source.answer,
+        cache_fields={**lookup, "cache_status": cache_status, "cached_from": source},
+    )
+    return hit, None
+
+
+class AskRequestError(Exception):
+    def __init__(self, detail, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def resolve_ask_request(user, data):
+    """Validate an ask payload (sync, streaming or async job) into (organization, config, question)."""
+    org_ids = get_authorized_org_ids(user)
+    if not org_ids:
+        raise AskRequestError("Sin permisos", status.HTTP_403_FORBIDDEN)
+
+    question = str(data.get("question") or "").strip()
+    if not question:
+        raise AskRequestError("question es requerido")
+
+    organization_id = data.get("organization_id")
+    try:
+        organization_id = int(organization_id) if organization_id else int(org_ids[0])
+    except (TypeError, ValueError):
+        raise AskRequestError("organization_id invalido")
+    if organization_id not in org_ids:
+        raise AskRequestError("Sin permisos", status.HTTP_403_FORBIDDEN)
+
+    organization = Organization.objects.filter(id=organization_id).first()
+    if organization is None:
+        raise AskRequestError("Organizacion no encontrada", status.HTTP_404_NOT_FOUND)
+    config = get_or_create_config_for_org(organization)
+    if not config.is_enabled:
+        raise AskRequestError("Activa el modulo IA y configura un proveedor antes de consultar.")
+    if config.provider in (AIAssistantConfig.PROVIDER_OPENAI, AIAssistantConfig.PROVIDER_GEMINI) and not config.api_key:
+        raise AskRequestError("Falta API key para el proveedor configurado.")
+    return organization, config, question
+
+
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated])
 def ai_assistant_config(request):
@@ -357,67 +296,53 @@ def ai_assistant_history(request):
     if organization_id not in org_ids:
         return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
 
-    interactions = AIAssistantInteraction.objects.filter(organization_id=organization_id)[:30]
+    interactions = AIAssistantInteraction.objects.filter(organization_id=organization_id).select_related(
+        "user", "context_ref"
+    )[:30]
     return Response(AIAssistantInteractionSerializer(interactions, many=True).data)
 
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def ai_assistant_ask(request):
-    org_ids = get_authorized_org_ids(request.user)
-    if not org_ids:
-        return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
-
-    question = str(request.data.get("question") or "").strip()
-    if not question:
-        return Response({"detail": "question es requerido"}, status=status.HTTP_400_BAD_REQUEST)
-
-    organization_id = request.data.get("organization_id")
     try:
-        organization_id = int(organization_id) if organization_id else int(org_ids[0])
-    except (TypeError, ValueError):
-        return Response({"detail": "organization_id invalido"}, status=status.HTTP_400_BAD_REQUEST)
-    if organization_id not in org_ids:
-        return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
-
-    organization = get_object_or_404(Organization, id=organization_id)
-    config = get_or_create_config_for_org(organization)
-    if not config.is_enabled:
-        return Response({"detail": "Activa el modulo IA y configura un proveedor antes de consultar."}, status=status.HTTP_400_BAD_REQUEST)
-    if config.provider in (AIAssistantConfig.PROVIDER_OPENAI, AIAssistantConfig.PROVIDER_GEMINI) and not config.api_key:
-        return Response({"detail": "Falta API key para el proveedor configurado."}, status=status.HTTP_400_BAD_REQUEST)
+        organization, config, question = resolve_ask_request(request.user, request.data)
+    except AskRequestError as error:
+        return Response({"detail": error.detail}, status=error.status_code)
 
-    context_payload = build_business_context(organization, config)
-    try:
-        answer = run_llm_query(config, question, context_payload)
-        interaction = AIAssistantInteraction.objects.create(
-            organization=organization,
-            user=request.user,
-            provider=config.provider,
-            model=config.model,
-            question=question,
-            answer=answer,
-            status=AIAssistantInteraction.STATUS_SUCCESS,
-            context_snapshot=context_payload,
+    if str(request.data.get("async") or "").lower() in ("1", "true"):
+        job = enqueue_job(
+            ASSISTANT_ASK_JOB,
+            {
+                "organization_id": organization.id,
+                "user_id": request.user.id,
+                "question": question,
+                "use_cache": wants_answer_cache(request.data),
+            },
+            organization_id=organization.id,
+            created_by=request.user,
         )
+        return Response({"job_id": job.id, "status": job.status}, status=status.HTTP_202_ACCEPTED)
+
+    context_payload = build_prompt_context(organization, config)
+    hit, cache_fields = lookup_cached_answer(
+        organization, request.user, config, question, context_payload, use_cache=wants_answer_cache(request.data)
+    )
+    if hit:
         return Response(
             {
-                "answer": answer,
-                "interaction": AIAssistantInteractionSerializer(interaction).data,
+                "answer": hit.answer,
+                "interaction": AIAssistantInteractionSerializer(hit).data,
                 "context": context_payload,
+                "cached": True,
             }
         )
-    except (urllib.error.HTTPError, urllib.error.URLError, TimeoutError, ValueError) as error:
-        interaction = AIAssistantInteraction.objects.create(
-            organization=organization,
-            user=request.user,
-            provider=config.provider,
-            model=config.model,
-            question=question,
-            answer="",
-            status=AIAssistantInteraction.STATUS_ERROR,
-            error_message=str(error),
-            context_snapshot=context_payload,
+
+    try:
+        answer = run_llm_query(config, question, context_payload)
+    except LLM_ERRORS as error:
+        interaction = record_interaction(
+            organization, request.user, config, question, context_payload, error=error, cache_fields=cache_fields
         )
         return Response(
             {
@@ -426,3 +351,15 @@ def ai_assistant_ask(request):
             },
             status=status.HTTP_502_BAD_GATEWAY,
         )
+
+    interaction = record_interaction(
+        organization, request.user, config, question, context_payload, answer=answer, cache_fields=cache_fields
+    )
+    return Response(
+        {
+            "answer": answer,
+            "interaction": AIAssistantInteractionSerializer(interaction).data,
+            "context": context_payload,
+            "cached": False,
+        }
+    )
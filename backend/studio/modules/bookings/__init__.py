@@ -0,0 +1 @@
+"""Bookings module: student reservations of classes, waitlist and attendance."""
@@ -0,0 +1,59 @@
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+
+from studio.modules.classes.models import StudioClass
+from studio.modules.core.models import Organization
+from studio.modules.students.models import Student
+
+
+class ClassBooking(models.Model):
+    STATUS_BOOKED = "booked"
+    STATUS_WAITLISTED = "waitlisted"
+    STATUS_CANCELED = "canceled"
+    STATUS_ATTENDED = "attended"
+    STATUS_NO_SHOW = "no_show"
+    STATUS_CHOICES = (
+        (STATUS_BOOKED, "Reservada"),
+        (STATUS_WAITLISTED, "En lista de espera"),
+        (STATUS_CANCELED, "Cancelada"),
+        (STATUS_ATTENDED, "Asistio"),
+        (STATUS_NO_SHOW, "No asistio"),
+    )
+    # Statuses that hold a seat of the class capacity.
+    SEAT_STATUSES = (STATUS_BOOKED, STATUS_ATTENDED, STATUS_NO_SHOW)
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="class_bookings")
+    studio_class = models.ForeignKey(StudioClass, on_delete=models.CASCADE, related_name="bookings")
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="class_bookings")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_BOOKED)
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="created_class_bookings",
+    )
+    promoted_at = models.DateTimeField(null=True, blank=True)
+    canceled_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("studio_class_id", "created_at", "id")
+        constraints = [
+            # One live booking per student and class; canceled rows are kept as history.
+            models.UniqueConstraint(
+                fields=["studio_class", "student"],
+                condition=~Q(status="canceled"),
+                name="booking_class_student_active_uniq",
+            ),
+        ]
+        indexes = [
+            # Seat counts and waitlist order (first come, first promoted).
+            models.Index(fields=["studio_class", "status", "created_at", "id"], name="booking_class_status_idx"),
+            models.Index(fields=["student", "created_at"], name="booking_student_created_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.studio_class_id} - {self.student_id} ({self.status})"
@@ -0,0 +1,51 @@
+from rest_framework import serializers
+
+from studio.models import Student, StudioClass
+
+from .models import ClassBooking
+from .services import get_waitlist_positions
+
+
+class ClassBookingSerializer(serializers.ModelSerializer):
+    class_name = serializers.CharField(source="studio_class.name", read_only=True)
+    class_start_at = serializers.DateTimeField(source="studio_class.start_at", read_only=True)
+    student_name = serializers.CharField(source="student.__str__", read_only=True)
+    waitlist_position = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ClassBooking
+        fields = (
+            "id",
+            "organization",
+            "studio_class",
+            "class_name",
+            "class_start_at",
+            "student",
+            "student_name",
+            "status",
+            "waitlist_position",
+            "promoted_at",
+            "canceled_at",
+            "created_at",
+            "updated_at",
+        )
+        read_only_fields = fields
+
+    def get_waitlist_position(self, obj):
+        if obj.status != ClassBooking.STATUS_WAITLISTED:
+            return None
+        # Lists pass the positions of the whole page in the context (one query).
+        positions = self.context.get("waitlist_positions")
+        if positions is None or obj.id not in positions:
+            positions = get_waitlist_positions([obj.studio_class_id])
+        return positions.get(obj.id)
+
+
+class ClassBookingCreateSerializer(serializers.Serializer):
+    studio_class = serializers.PrimaryKeyRelatedField(queryset=StudioClass.objects.all())
+    student = serializers.PrimaryKeyRelatedField(queryset=Student.objects.all(), required=False)
+    allow_waitlist = serializers.BooleanField(required=False, default=True)
+
+
+class ClassBookingAttendanceSerializer(serializers.Serializer):
+    attended = serializers.BooleanField()
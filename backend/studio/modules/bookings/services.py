@@ -0,0 +1,189 @@
+"""
+Class bookings.
+
+Every change that can move a seat (book, cancel, attendance, waitlist promotion) runs in one
+transaction that first locks the StudioClass row with select_for_update. Concurrent requests
+for the same class therefore queue on that lock, and the booked_count each one reads cannot
+change before its own insert/update commits, so a class is never booked past its capacity.
+The class counters move with F() updates inside that same transaction, so list endpoints
+read occupancy straight from StudioClass.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from studio.models import StudioClass
+from studio.modules.core.conditional import bump_data_versions
+
+from .models import ClassBooking
+
+
+def _lock_class(studio_class_id):
+    return StudioClass.objects.select_for_update().get(id=studio_class_id)
+
+
+def _adjust_counts(studio_class_id, booked=0, waitlisted=0):
+    StudioClass.objects.filter(id=studio_class_id).update(
+        booked_count=Greatest(F("booked_count") + booked, 0),
+        waitlist_count=Greatest(F("waitlist_count") + waitlisted, 0),
+    )
+
+
+def _promote(studio_class, booked_count):
+    """Fill free seats from the waitlist, oldest first; the caller holds the class lock."""
+    free_seats = studio_class.capacity - booked_count
+    if free_seats <= 0 or studio_class.status != StudioClass.STATUS_SCHEDULED:
+        return []
+    promoted_ids = list(
+        ClassBooking.objects.filter(studio_class_id=studio_class.id, status=ClassBooking.STATUS_WAITLISTED)
+        .order_by("created_at", "id")
+        .values_list("id", flat=True)[:free_seats]
+    )
+    if promoted_ids:
+        now = timezone.now()
+        ClassBooking.objects.filter(id__in=promoted_ids).update(
+            status=ClassBooking.STATUS_BOOKED,
+            promoted_at=now,
+            updated_at=now,
+        )
+        _adjust_counts(studio_class.id, booked=len(promoted_ids), waitlisted=-len(promoted_ids))
+        # update() sends no signals.
+        bump_data_versions(studio_class.organization_id, "bookings", "classes")
+    return promoted_ids
+
+
+def book_class(studio_class, student, created_by=None, allow_waitlist=True):
+    """
+    Reserve a seat for the student, or put them on the waitlist when the class is full.
+
+    Returns (booking, created); asking again for a class the student already holds (or waits
+    for) returns the existing booking. Raises ValueError when the booking is not allowed.
+    """
+    if student.organization_id != studio_class.organization_id:
+        raise ValueError("El alumno no pertenece a la organizacion de la clase")
+    if not student.is_active:
+        raise ValueError("El alumno esta inactivo")
+
+    with transaction.atomic():
+        locked_class = _lock_class(studio_class.id)
+        if locked_class.status != StudioClass.STATUS_SCHEDULED:
+            raise ValueError("Solo se pueden reservar clases programadas")
+        if locked_class.start_at <= timezone.now():
+            raise ValueError("La clase ya comenzo")
+
+        existing = (
+            ClassBooking.objects.filter(studio_class_id=locked_class.id, student_id=student.id)
+            .exclude(status=ClassBooking.STATUS_CANCELED)
+            .first()
+        )
+        if existing:
+            return existing, False
+
+        if locked_class.booked_count < locked_class.capacity:
+            booking_status = ClassBooking.STATUS_BOOKED
+        elif allow_waitlist:
+            booking_status = ClassBooking.STATUS_WAITLISTED
+        else:
+            raise ValueError("La clase no tiene cupos disponibles")
+
+        booking = ClassBooking.objects.create(
+            organization_id=locked_class.organization_id,
+            studio_class=locked_class,
+            student=student,
+            status=booking_status,
+            created_by=created_by,
+        )
+        if booking_status == ClassBooking.STATUS_BOOKED:
+            _adjust_counts(locked_class.id, booked=1)
+        else:
+            _adjust_counts(locked_class.id, waitlisted=1)
+    return booking, True
+
+
+def cancel_booking(booking):
+    """Cancel a booking and hand its seat to the waitlist; returns (booking, promoted ids)."""
+    with transaction.atomic():
+        locked_class = _lock_class(booking.studio_class_id)
+        booking = ClassBooking.objects.get(id=booking.id)
+        if booking.status == ClassBooking.STATUS_CANCELED:
+            return booking, []
+        if booking.status in (ClassBooking.STATUS_ATTENDED, ClassBooking.STATUS_NO_SHOW):
+            raise ValueError("No se puede cancelar una reserva con asistencia registrada")
+
+        held_seat = booking.status == ClassBooking.STATUS_BOOKED
+        booking.status = ClassBooking.STATUS_CANCELED
+        booking.canceled_at = timezone.now()
+        booking.save(update_fields=["status", "canceled_at", "updated_at"])
+        if held_seat:
+            _adjust_counts(locked_class.id, booked=-1)
+            promoted_ids = _promote(locked_class, locked_class.booked_count - 1)
+        else:
+            _adjust_counts(locked_class.id, waitlisted=-1)
+            promoted_ids = []
+    return booking, promoted_ids
+
+
+def mark_attendance(booking, attended):
+    """Record whether a seated student came to the class."""
+    with transaction.atomic():
+        _lock_class(booking.studio_class_id)
+        booking = ClassBooking.objects.get(id=booking.id)
+        if booking.status not in ClassBooking.SEAT_STATUSES:
+            raise ValueError("Solo se registra asistencia de reservas confirmadas")
+        booking.status = ClassBooking.STATUS_ATTENDED if attended else ClassBooking.STATUS_NO_SHOW
+        booking.save(update_fields=["status", "updated_at"])
+    return booking
+
+
+def promote_waitlist(studio_class_id):
+    """Promote waitlisted students into free seats (e.g. after a capacity increase)."""
+    with transaction.atomic():
+        locked_class = StudioClass.objects.select_for_update().filter(id=studio_class_id).first()
+        if not locked_class:
+            return []
+        return _promote(locked_class, locked_class.booked_count)
+
+
+def release_deleted_booking(booking):
+    """Counters (and a waitlist promotion) for a booking row deleted outside this module."""
+    if booking.status == ClassBooking.STATUS_CANCELED:
+        return
+    if booking.status == ClassBooking.STATUS_WAITLISTED:
+        _adjust_counts(booking.studio_class_id, waitlisted=-1)
+        return
+    _adjust_counts(booking.studio_class_id, booked=-1)
+    studio_class_id = booking.studio_class_id
+    transaction.on_commit(lambda: promote_waitlist(studio_class_id))
+
+
+def count_bookings(studio_class_ids=None):
+    """{class id: (booked, waitlisted)} recomputed from ClassBooking, for reconciling the counters."""
+    rows = ClassBooking.objects.exclude(status=ClassBooking.STATUS_CANCELED)
+    if studio_class_ids is not None:
+        rows = rows.filter(studio_class_id__in=studio_class_ids)
+    counts = {}
+    for row in rows.values("studio_class_id", "status").annotate(count=Count("id")).order_by():
+        booked, waitlisted = counts.get(row["studio_class_id"], (0, 0))
+        if row["status"] == ClassBooking.STATUS_WAITLISTED:
+            waitlisted += row["count"]
+        else:
+            booked += row["count"]
+        counts[row["studio_class_id"]] = (booked, waitlisted)
+    return counts
+
+
+def get_waitlist_positions(studio_class_ids):
+    """{booking id: 1-based waitlist position} for the given classes."""
+    positions = {}
+    last_class_id, position = None, 0
+    for booking_id, studio_class_id in (
+        ClassBooking.objects.filter(studio_class_id__in=studio_class_ids, status=ClassBooking.STATUS_WAITLISTED)
+        .order_by("studio_class_id", "created_at", "id")
+        .values_list("id", "studio_class_id")
+    ):
+        position = position + 1 if studio_class_id == last_class_id else 1
+        last_class_id = studio_class_id
+        positions[booking_id] = position
+    return positions
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .models import ClassBooking
+from .services import release_deleted_booking
+
+
+@receiver(post_delete, sender=ClassBooking, dispatch_uid="studio_class_booking_deleted")
+def release_counts_on_booking_delete(sender, instance, **kwargs):
+    # Student deletes cascade here; when the class itself is deleted the counter update is a no-op.
+    release_deleted_booking(instance)
@@ -0,0 +1,136 @@
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from studio.models import Student
+from studio.modules.core.conditional import ConditionalGetMixin
+from studio.modules.core.pagination import KeysetPagination
+from studio.modules.core.services import get_owned_org_ids
+from studio.modules.users.services import is_instructor, is_owner, is_platform_admin, is_student
+
+from .models import ClassBooking
+from .serializers import ClassBookingAttendanceSerializer, ClassBookingCreateSerializer, ClassBookingSerializer
+from .services import book_class, cancel_booking, get_waitlist_positions, mark_attendance
+
+BOOKING_FILTERS = {
+    "organization_id": "organization_id",
+    "studio_class_id": "studio_class_id",
+    "student_id": "student_id",
+}
+
+
+class ClassBookingViewSet(ConditionalGetMixin, viewsets.ReadOnlyModelViewSet):
+    queryset = ClassBooking.objects.select_related("studio_class", "student").all()
+    serializer_class = ClassBookingSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("id",)
+    conditional_scopes = ("bookings", "classes", "users")
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = super().get_queryset().order_by("id")
+        for param, field in BOOKING_FILTERS.items():
+            value = self.request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{field: value})
+        booking_status = self.request.query_params.get("status")
+        if booking_status:
+            queryset = queryset.filter(status=booking_status)
+
+        if is_platform_admin(user):
+            return queryset
+        if is_owner(user):
+            return queryset.filter(organization_id__in=get_owned_org_ids(user))
+        if is_instructor(user):
+            return queryset.filter(studio_class__instructor_id=user.id)
+        if is_student(user):
+            return queryset.filter(student__user_id=user.id)
+        return queryset.none()
+
+    def get_serializer(self, *args, **kwargs):
+        if kwargs.get("many") and args:
+            # Waitlist positions for the whole page in one query.
+            bookings = list(args[0])
+            args = (bookings, *args[1:])
+            kwargs["context"] = {
+                **self.get_serializer_context(),
+                "waitlist_positions": get_waitlist_positions({booking.studio_class_id for booking in bookings}),
+            }
+        return super().get_serializer(*args, **kwargs)
+
+    def _can_manage_class(self, user, studio_class):
+        if is_platform_admin(user):
+            return True
+        if is_owner(user) and studio_class.organization_id in get_owned_org_ids(user):
+            return True
+        return is_instructor(user) and studio_class.instructor_id == user.id
+
+    def create(self, request, *args, **kwargs):
+        user = request.user
+        serializer = ClassBookingCreateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        studio_class = serializer.validated_data["studio_class"]
+        student = serializer.validated_data.get("student")
+
+        if is_student(user) and not self._can_manage_class(user, studio_class):
+            # Students book for themselves, through their profile in the class organization.
+            student = Student.objects.filter(
+                organization_id=studio_class.organization_id,
+                user_id=user.id,
+            ).first()
+            if not student:
+                return Response(
+                    {"detail": "No tienes perfil de alumno en esta organizacion"},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
+        elif not self._can_manage_class(user, studio_class):
+            return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
+        elif not student:
+            return Response({"student": ["Este campo es requerido."]}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            booking, created = book_class(
+                studio_class,
+                student,
+                created_by=user,
+                allow_waitlist=serializer.validated_data["allow_waitlist"],
+            )
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            self.get_serializer(booking).data,
+            status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=["post"], url_path="cancel")
+    def cancel(self, request, pk=None):
+        user = request.user
+        booking = self.get_object()
+        is_own_booking = is_student(user) and booking.student.user_id == user.id
+        if not (is_own_booking or self._can_manage_class(user, booking.studio_class)):
+            return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
+
+        try:
+            booking, promoted_ids = cancel_booking(booking)
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        data = self.get_serializer(booking).data
+        data["promoted_booking_ids"] = promoted_ids
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=["post"], url_path="attendance")
+    def attendance(self, request, pk=None):
+        user = request.user
+        booking = self.get_object()
+        if not self._can_manage_class(user, booking.studio_class):
+            return Response({"detail": "Solo owner/admin o el instructor de la clase"}, status=status.HTTP_403_FORBIDDEN)
+
+        serializer = ClassBookingAttendanceSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            booking = mark_attendance(booking, serializer.validated_data["attended"])
+        except ValueError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(booking).data, status=status.HTTP_200_OK)
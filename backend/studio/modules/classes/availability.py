@@ -0,0 +1,150 @@
+"""
+Free-slot search for one establishment.
+
+The scheduled classes of every candidate room (and of the instructor, when given) for the
+whole range come from a single query. Each room's busy intervals are then sorted, merged and
+swept against the sorted opening windows in one pass, which yields the free gaps; candidate
+start times are stepped through those gaps. The rooms' slot streams are merged in time order,
+so a search with a limit stops generating as soon as enough slots were found.
+"""
+
+import heapq
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.db.models import Q
+from django.utils import timezone
+
+from studio.models import Room
+from studio.modules.core.schedule import WEEKDAY_KEYS, get_establishment_windows
+
+from .models import StudioClass
+
+
+def _aware(day, moment):
+    return timezone.make_aware(datetime.combine(day, moment), timezone.get_current_timezone())
+
+
+def opening_intervals(establishment, date_from, date_to):
+    """Sorted (start, end) opening windows; a whole day per day when no schedule is configured."""
+    windows = get_establishment_windows(establishment)
+    intervals = []
+    day = date_from
+    while day <= date_to:
+        if windows is None:
+            intervals.append((_aware(day, time.min), _aware(day + timedelta(days=1), time.min)))
+        else:
+            for opens, closes in windows.get(WEEKDAY_KEYS[day.weekday()]) or []:
+                intervals.append((_aware(day, opens), _aware(day, closes)))
+        day += timedelta(days=1)
+    return merge_intervals(intervals)
+
+
+def merge_intervals(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def free_gaps(openings, busy):
+    """Sweep sorted, merged openings against sorted, merged busy intervals; returns the free gaps."""
+    gaps = []
+    first_busy = 0
+    for open_start, open_end in openings:
+        while first_busy < len(busy) and busy[first_busy][1] <= open_start:
+            first_busy += 1
+        cursor = open_start
+        index = first_busy
+        while index < len(busy) and busy[index][0] < open_end:
+            if busy[index][0] > cursor:
+                gaps.append((cursor, busy[index][0]))
+            cursor = max(cursor, busy[index][1])
+            index += 1
+        if cursor < open_end:
+            gaps.append((cursor, open_end))
+    return gaps
+
+
+def _room_block(room, range_start, range_end):
+    """The room's block as a busy interval, "all" when blocked without dates, or None."""
+    if not room.is_blocked:
+        return None
+    if not room.blocked_from and not room.blocked_to:
+        return "all"
+    return (room.blocked_from or range_start, room.blocked_to or range_end)
+
+
+def _first_start(gap_start, not_before):
+    if gap_start >= not_before:
+        return gap_start
+    # A gap already under way offers its first slot at the next 5-minute mark (or right away on one).
+    if not (not_before.minute % 5 or not_before.second or not_before.microsecond):
+        return not_before
+    start = not_before.replace(second=0, microsecond=0)
+    return start + timedelta(minutes=5 - start.minute % 5)
+
+
+def _room_slots(room, gaps, duration, step, not_before):
+    for gap_start, gap_end in gaps:
+        start = _first_start(gap_start, not_before)
+        while start + duration <= gap_end:
+            yield {
+                "room_id": room.id,
+                "room_name": room.name,
+                "room_capacity": room.capacity,
+                "start_at": start,
+                "end_at": start + duration,
+            }
+            start += step
+
+
+def find_free_slots(
+    establishment, date_from, date_to, duration, step, instructor=None, min_capacity=None, limit=None
+):
+    """
+    Available (room, start) pairs in the establishment between date_from and date_to (dates).
+
+    Honors opening hours, room activity/blocks, the minimum room capacity, scheduled classes in
+    each room and, when an instructor is given, that instructor's scheduled classes anywhere.
+    Returns at most `limit` slots (earliest first) when given.
+    """
+    openings = opening_intervals(establishment, date_from, date_to)
+    rooms = Room.objects.filter(establishment_id=establishment.id, is_active=True).order_by("name", "id")
+    if min_capacity:
+        rooms = rooms.filter(capacity__gte=min_capacity)
+    rooms = list(rooms)
+    if not openings or not rooms:
+        return []
+
+    range_start, range_end = openings[0][0], openings[-1][1]
+    resource_filter = Q(room_id__in=[room.id for room in rooms])
+    if instructor:
+        resource_filter |= Q(instructor_id=instructor.id)
+    busy_by_room = {room.id: [] for room in rooms}
+    instructor_busy = []
+    for room_id, instructor_id, start_at, end_at in StudioClass.objects.filter(
+        resource_filter,
+        status=StudioClass.STATUS_SCHEDULED,
+        start_at__lt=range_end,
+        end_at__gt=range_start,
+    ).values_list("room_id", "instructor_id", "start_at", "end_at"):
+        if room_id in busy_by_room:
+            busy_by_room[room_id].append((start_at, end_at))
+        if instructor and instructor_id == instructor.id:
+            instructor_busy.append((start_at, end_at))
+
+    not_before = timezone.now()
+    streams = []
+    for room in rooms:
+        block = _room_block(room, range_start, range_end)
+        if block == "all":
+            continue
+        busy = busy_by_room[room.id] + instructor_busy + ([block] if block else [])
+        streams.append(_room_slots(room, free_gaps(openings, merge_intervals(busy)), duration, step, not_before))
+    slots = heapq.merge(*streams, key=lambda slot: (slot["start_at"], slot["room_name"], slot["room_id"]))
+    return list(islice(slots, limit))
@@ -0,0 +1,15 @@
+from studio.modules.jobs.services import register_job
+
+from .services import generate_instructor_settlements_batch
+
+SETTLEMENT_BATCH_JOB = "classes.generate_settlements_batch"
+
+
+@register_job(SETTLEMENT_BATCH_JOB, max_attempts=3)
+def settlement_batch_job(payload, job):
+    # Upserts are idempotent, so a retried batch simply recomputes the pending settlements.
+    periods = [(int(year), int(month)) for year, month in payload.get("periods") or []]
+    results = generate_instructor_settlements_batch(payload.get("organization_ids") or [], periods)
+    for result in results:
+        result.pop("settlement_ids", None)
+    return {"results": results}
@@ -0,0 +1,217 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from .models import InstructorMonthlyMetrics, StudioClass
+
+COUNTER_FIELDS = ("total_classes", "scheduled_classes", "completed_classes", "canceled_classes")
+HOUR_FIELDS = ("assigned_hours", "completed_hours")
+METRIC_FIELDS = COUNTER_FIELDS + HOUR_FIELDS
+STATE_FIELDS = ("organization_id", "instructor_id", "status", "start_at", "end_at")
+
+
+def class_duration_hours(start_at, end_at):
+    if start_at and end_at and end_at > start_at:
+        return duration_to_hours(end_at - start_at)
+    return Decimal("0")
+
+
+def duration_to_hours(duration):
+    if not duration:
+        return Decimal("0")
+    return Decimal(str(duration.total_seconds() / 3600)).quantize(Decimal("0.01"))
+
+
+def snapshot_class_state(studio_class):
+    return {field: getattr(studio_class, field) for field in STATE_FIELDS}
+
+
+def class_contribution(state):
+    """Bucket key and metric values one class adds to its instructor/month row (None if untracked)."""
+    if not state or not state.get("instructor_id") or not state.get("start_at"):
+        return None, None
+    local_start = timezone.localtime(state["start_at"])
+    key = (state["organization_id"], state["instructor_id"], local_start.year, local_start.month)
+    status = state.get("status")
+    hours = class_duration_hours(state["start_at"], state.get("end_at"))
+    values = {
+        "total_classes": 1,
+        "scheduled_classes": int(status == StudioClass.STATUS_SCHEDULED),
+        "completed_classes": int(status == StudioClass.STATUS_COMPLETED),
+        "canceled_classes": int(status == StudioClass.STATUS_CANCELED),
+        "assigned_hours": hours if status != StudioClass.STATUS_CANCELED else Decimal("0"),
+        "completed_hours": hours if status == StudioClass.STATUS_COMPLETED else Decimal("0"),
+    }
+    return key, values
+
+
+def accumulate_contribution(buckets, state, sign=1):
+    key, values = class_contribution(state)
+    if key is None:
+        return
+    bucket = buckets.setdefault(key, {field: 0 for field in METRIC_FIELDS})
+    for field, value in values.items():
+        bucket[field] += sign * value
+
+
+def apply_metric_deltas(deltas):
+    # Sorted keys keep row-lock order stable between concurrent writers.
+    for key in sorted(deltas):
+        values = {field: value for field, value in deltas[key].items() if value}
+        if not values:
+            continue
+        organization_id, instructor_id, year, month = key
+        lookup = {
+            "organization_id": organization_id,
+            "instructor_id": instructor_id,
+            "period_year": year,
+            "period_month": month,
+        }
+        increments = {field: F(field) + value for field, value in values.items()}
+        if InstructorMonthlyMetrics.objects.filter(**lookup).update(**increments):
+            continue
+        if not any(value > 0 for value in values.values()):
+            # Nothing to subtract from (e.g. the row went away in the same cascade delete).
+            continue
+        try:
+            with transaction.atomic():
+                InstructorMonthlyMetrics.objects.create(**lookup, **values)
+        except IntegrityError:
+            InstructorMonthlyMetrics.objects.filter(**lookup).update(**increments)
+
+
+def record_class_change(old_state=None, new_state=None):
+    deltas = {}
+    accumulate_contribution(deltas, old_state, sign=-1)
+    accumulate_contribution(deltas, new_state, sign=1)
+    apply_metric_deltas(deltas)
+
+
+def record_classes_created(classes):
+    """Bulk counterpart of the post_save receiver, for bulk_create callers (signals are not sent)."""
+    deltas = {}
+    for studio_class in classes:
+        accumulate_contribution(deltas, snapshot_class_state(studio_class))
+    apply_metric_deltas(deltas)
+
+
+def compute_expected_metrics(organization_id=None):
+    queryset = StudioClass.objects.filter(instructor_id__isnull=False)
+    if organization_id:
+        queryset = queryset.filter(organization_id=organization_id)
+    buckets = {}
+    for row in queryset.values(*STATE_FIELDS).iterator(chunk_size=2000):
+        accumulate_contribution(buckets, row)
+    return buckets
+
+
+def load_instructor_metric_totals(pairs, reference=None, month_only=False):
+    """
+    Totals per (organization_id, instructor_id) read from the materialized monthly rows.
+
+    month_* keys cover the month of `reference`; with month_only=True every total is limited
+    to that month (what settlement generation needs).
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+    reference = timezone.localtime(reference or timezone.now())
+    month_filter = Q(period_year=reference.year, period_month=reference.month)
+
+    queryset = InstructorMonthlyMetrics.objects.filter(
+        organization_id__in={organization_id for organization_id, _instructor_id in pairs},
+        instructor_id__in={instructor_id for _organization_id, instructor_id in pairs},
+    )
+    if month_only:
+        queryset = queryset.filter(month_filter)
+    aggregates = {f"sum_{field}": Sum(field) for field in METRIC_FIELDS}
+    aggregates["sum_month_classes"] = Sum(F("scheduled_classes") + F("completed_classes"), filter=month_filter)
+    aggregates["sum_month_hours"] = Sum("assigned_hours", filter=month_filter)
+
+    totals = {}
+    for row in queryset.values("organization_id", "instructor_id").order_by().annotate(**aggregates):
+        key = (row["organization_id"], row["instructor_id"])
+        if key not in pairs:
+            continue
+        totals[key] = {
+            "total_classes": row["sum_total_classes"] or 0,
+            "scheduled_classes": row["sum_scheduled_classes"] or 0,
+            "completed_classes": row["sum_completed_classes"] or 0,
+            "canceled_classes": row["sum_canceled_classes"] or 0,
+            "assigned_hours": Decimal(row["sum_assigned_hours"] or 0),
+            "completed_hours": Decimal(row["sum_completed_hours"] or 0),
+            "month_classes": row["sum_month_classes"] or 0,
+            "month_hours": Decimal(row["sum_month_hours"] or 0),
+        }
+    return totals
+
+
+def _month_window(reference):
+    month_start = reference.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    if month_start.month == 12:
+        return month_start, month_start.replace(year=month_start.year + 1, month=1)
+    return month_start, month_start.replace(month=month_start.month + 1)
+
+
+def aggregate_instructor_metric_totals(pairs, reference=None, month_only=False):
+    """
+    Same totals as load_instructor_metric_totals, aggregated straight from StudioClass.
+
+    One grouped query with conditional counts and duration sums; nothing is transferred
+    per class. Hours are rounded once per total instead of once per class, so they can
+    differ by a few cents from the materialized table.
+    """
+    pairs = set(pairs)
+    if not pairs:
+        return {}
+    month_start, month_end = _month_window(timezone.localtime(reference or timezone.now()))
+
+    duration = ExpressionWrapper(F("end_at") - F("start_at"), output_field=DurationField())
+    positive = Q(end_at__gt=F("start_at"))
+    active = ~Q(status=StudioClass.STATUS_CANCELED)
+    completed = Q(status=StudioClass.STATUS_COMPLETED)
+    in_month = Q(start_at__gte=month_start, start_at__lt=month_end)
+
+    queryset = StudioClass.objects.filter(
+        organization_id__in={organization_id for organization_id, _instructor_id in pairs},
+        instructor_id__in={instructor_id for _organization_id, instructor_id in pairs},
+    )
+    if month_only:
+        queryset = queryset.filter(in_month)
+    rows = queryset.values("organization_id", "instructor_id").order_by().annotate(
+        sum_total_classes=Count("id"),
+        sum_scheduled_classes=Count("id", filter=Q(status=StudioClass.STATUS_SCHEDULED)),
+        sum_completed_classes=Count("id", filter=completed),
+        sum_canceled_classes=Count("id", filter=Q(status=StudioClass.STATUS_CANCELED)),
+        sum_assigned=Sum(duration, filter=active & positive),
+        sum_completed=Sum(duration, filter=completed & positive),
+        sum_month_classes=Count("id", filter=active & in_month),
+        sum_month=Sum(duration, filter=active & in_month & positive),
+    )
+
+    totals = {}
+    for row in rows:
+        key = (row["organization_id"], row["instructor_id"])
+        if key not in pairs:
+            continue
+        totals[key] = {
+            "total_classes": row["sum_total_classes"],
+            "scheduled_classes": row["sum_scheduled_classes"],
+            "completed_classes": row["sum_completed_classes"],
+            "canceled_classes": row["sum_canceled_classes"],
+            "assigned_hours": duration_to_hours(row["sum_assigned"]),
+            "completed_hours": duration_to_hours(row["sum_completed"]),
+            "month_classes": row["sum_month_classes"],
+            "month_hours": duration_to_hours(row["sum_month"]),
+        }
+    return totals
+
+
+def get_instructor_metric_totals(pairs, reference=None, month_only=False):
+    """Totals from the source picked by STUDIO_INSTRUCTOR_METRICS_SOURCE ("table" or "aggregate")."""
+    if getattr(settings, "STUDIO_INSTRUCTOR_METRICS_SOURCE", "table") == "aggregate":
+        return aggregate_instructor_metric_totals(pairs, reference=reference, month_only=month_only)
+    return load_instructor_metric_totals(pairs, reference=reference, month_only=month_only)
@@ -89,6 +89,9 @@ class StudioClass(models.Model):
         (STATUS_CANCELED, "Canceled"),
         (STATUS_COMPLETED, "Completed"),
     )
+    # PostgreSQL-only exclusion constraints (see migration 0028) that reject double-booking at insert time.
+    ROOM_OVERLAP_CONSTRAINT = "class_room_no_overlap"
+    INSTRUCTOR_OVERLAP_CONSTRAINT = "class_instructor_no_overlap"
 
     organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="classes")
     establishment = models.ForeignKey(Establishment, on_delete=models.CASCADE, related_name="classes")
@@ -104,6 +107,10 @@ class StudioClass(models.Model):
     start_at = models.DateTimeField()
     end_at = models.DateTimeField()
     capacity = models.PositiveIntegerField(default=1)
+    # Maintained by bookings/services.py with F() updates in the booking's transaction;
+    # reconcile_class_booking_counts recomputes them from ClassBooking.
+    booked_count = models.PositiveIntegerField(default=0)
+    waitlist_count = models.PositiveIntegerField(default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_SCHEDULED)
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -111,6 +118,44 @@ class StudioClass(models.Model):
 
     class Meta:
         ordering = ("start_at", "id")
+        indexes = [
+            models.Index(fields=["start_at", "id"], name="class_start_id_idx"),
+            models.Index(fields=["organization", "start_at", "id"], name="class_org_start_id_idx"),
+            models.Index(fields=["instructor", "status", "start_at", "end_at"], name="class_instr_status_start_idx"),
+            # Room lookups are overlap checks against scheduled classes only; a partial index stays small.
+            models.Index(
+                fields=["room", "start_at", "end_at"],
+                condition=models.Q(status="scheduled"),
+                name="class_room_sched_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.start_at})"
+
+
+class InstructorMonthlyMetrics(models.Model):
+    """Per instructor/month class aggregates, kept in sync by classes/metrics.py on every class write."""
+
+    organization = models.ForeignKey(Organization, on_delete=models.CASCADE, related_name="instructor_monthly_metrics")
+    instructor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="instructor_monthly_metrics",
+    )
+    period_year = models.PositiveIntegerField()
+    period_month = models.PositiveSmallIntegerField()
+    total_classes = models.IntegerField(default=0)
+    scheduled_classes = models.IntegerField(default=0)
+    completed_classes = models.IntegerField(default=0)
+    canceled_classes = models.IntegerField(default=0)
+    assigned_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    completed_hours = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("organization_id", "instructor_id", "period_year", "period_month")
+        unique_together = ("organization", "instructor", "period_year", "period_month")
+
+    def __str__(self):
+        return f"{self.organization_id} - {self.instructor_id} - {self.period_year:04d}-{self.period_month:02d}"
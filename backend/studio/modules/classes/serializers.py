@@ -1,12 +1,16 @@
+from contextlib import contextmanager
 from datetime import datetime
 from decimal import Decimal
 
 from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection, models, transaction
 from django.utils import timezone
 from rest_framework import serializers
 
-from studio.models import Establishment, Room
+from studio.models import Establishment, Organization, Room
+from studio.modules.core.schedule import WEEKDAY_KEYS
 
+from .metrics import class_duration_hours, get_instructor_metric_totals
 from .models import InstructorProfile, InstructorSettlement, StudioClass
 
 User = get_user_model()
@@ -25,10 +29,42 @@ def room_blocking_conflicts(room, class_start=None, class_end=None):
     return class_start < block_end and class_end > block_start
 
 
+ROOM_OVERLAP_MESSAGE = "Ya existe una clase en ese salon para ese horario"
+INSTRUCTOR_OVERLAP_MESSAGE = "El instructor ya tiene una clase en ese horario"
+
+
 def has_time_overlap(queryset, start_at, end_at):
+    if connection.vendor == "postgresql":
+        # Same tstzrange expression as the exclusion constraints, so the GiST index is used.
+        from django.contrib.postgres.fields import DateTimeRangeField
+        from django.db.backends.postgresql.psycopg_any import DateTimeTZRange
+
+        slot = models.Func(
+            "start_at",
+            "end_at",
+            models.Value("[)"),
+            function="TSTZRANGE",
+            output_field=DateTimeRangeField(),
+        )
+        return queryset.alias(slot=slot).filter(slot__overlap=DateTimeTZRange(start_at, end_at, "[)")).exists()
     return queryset.filter(start_at__lt=end_at, end_at__gt=start_at).exists()
 
 
+@contextmanager
+def guard_class_overlaps():
+    """Translate exclusion-constraint violations raised by concurrent bookings into validation errors."""
+    try:
+        with transaction.atomic():
+            yield
+    except IntegrityError as exc:
+        message = str(exc)
+        if StudioClass.ROOM_OVERLAP_CONSTRAINT in message:
+            raise serializers.ValidationError({"room": ROOM_OVERLAP_MESSAGE}) from exc
+        if StudioClass.INSTRUCTOR_OVERLAP_CONSTRAINT in message:
+            raise serializers.ValidationError({"instructor": INSTRUCTOR_OVERLAP_MESSAGE}) from exc
+        raise
+
+
 class InstructorLiteSerializer(serializers.ModelSerializer):
     display_name = serializers.SerializerMethodField()
 
@@ -171,7 +207,7 @@ class InstructorProfileUpdateSerializer(serializers.Serializer):
 
 
 class InstructorSettlementSerializer(serializers.ModelSerializer):
-    instructor_profile_id = serializers.IntegerField(source="instructor_profile_id", read_only=True)
+    instructor_profile_id = serializers.IntegerField(read_only=True)
     instructor_id = serializers.IntegerField(source="instructor_profile.user_id", read_only=True)
     organization_name = serializers.CharField(source="organization.name", read_only=True)
     username = serializers.CharField(source="instructor_profile.user.username", read_only=True)
@@ -228,6 +264,13 @@ class InstructorSettlementGenerateSerializer(serializers.Serializer):
     month = serializers.IntegerField(required=False, min_value=1, max_value=12)
 
 
+class InstructorSettlementBatchSerializer(serializers.Serializer):
+    organizations = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False, allow_empty=True)
+    year = serializers.IntegerField(required=False, min_value=2000, max_value=2100)
+    month = serializers.IntegerField(required=False, min_value=1, max_value=12)
+    months = serializers.IntegerField(required=False, default=1, min_value=1, max_value=12)
+
+
 class InstructorSettlementMarkPaidSerializer(serializers.Serializer):
     notes = serializers.CharField(required=False, allow_blank=True)
 
@@ -235,6 +278,7 @@ class InstructorSettlementMarkPaidSerializer(serializers.Serializer):
 class StudioClassSerializer(serializers.ModelSerializer):
     instructor_username = serializers.CharField(source="instructor.username", read_only=True)
     room_name = serializers.CharField(source="room.name", read_only=True)
+    remaining_seats = serializers.SerializerMethodField()
 
     class Meta:
         model = StudioClass
@@ -250,12 +294,18 @@ class StudioClassSerializer(serializers.ModelSerializer):
             "start_at",
             "end_at",
             "capacity",
+            "booked_count",
+            "waitlist_count",
+            "remaining_seats",
             "status",
             "notes",
             "created_at",
             "updated_at",
         )
-        read_only_fields = ("id", "created_at", "updated_at")
+        read_only_fields = ("id", "booked_count", "waitlist_count", "created_at", "updated_at")
+
+    def get_remaining_seats(self, obj):
+        return max(obj.capacity - obj.booked_count, 0)
 
     def validate(self, attrs):
         instance = getattr(self, "instance", None)
@@ -300,11 +350,80 @@ class StudioClassSerializer(serializers.ModelSerializer):
                 overlap_qs = overlap_qs.exclude(id=instance.id)
 
             if room and has_time_overlap(overlap_qs.filter(room=room), start_at, end_at):
-                raise serializers.ValidationError({"room": "Ya existe una clase en ese salon para ese horario"})
+                raise serializers.ValidationError({"room": ROOM_OVERLAP_MESSAGE})
 
             if instructor and has_time_overlap(overlap_qs.filter(instructor=instructor), start_at, end_at):
-                raise serializers.ValidationError({"instructor": "El instructor ya tiene una clase en ese horario"})
+                raise serializers.ValidationError({"instructor": INSTRUCTOR_OVERLAP_MESSAGE})
+
+        return attrs
+
+    def create(self, validated_data):
+        with guard_class_overlaps():
+            return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        with guard_class_overlaps():
+            # Only the edited columns: a full save would write back stale booking counters.
+            instance.save(update_fields=[*validated_data, "updated_at"])
+        return instance
+
+
+class StudioClassBulkCreateSerializer(serializers.Serializer):
+    MAX_OCCURRENCES = 500
+
+    organization = serializers.PrimaryKeyRelatedField(queryset=Organization.objects.all())
+    establishment = serializers.PrimaryKeyRelatedField(queryset=Establishment.objects.all())
+    room = serializers.PrimaryKeyRelatedField(queryset=Room.objects.all(), required=False, allow_null=True)
+    instructor = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    name = serializers.CharField(max_length=120)
+    capacity = serializers.IntegerField(required=False, min_value=1)
+    notes = serializers.CharField(required=False, allow_blank=True, default="")
+    start_date = serializers.DateField()
+    end_date = serializers.DateField()
+    weekdays = serializers.ListField(child=serializers.ChoiceField(choices=WEEKDAY_KEYS), allow_empty=False)
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    interval_weeks = serializers.IntegerField(required=False, default=1, min_value=1, max_value=4)
+    skip_conflicts = serializers.BooleanField(required=False, default=False)
+    dry_run = serializers.BooleanField(required=False, default=False)
+
+    def validate(self, attrs):
+        organization = attrs["organization"]
+        establishment = attrs["establishment"]
+        room = attrs.get("room")
+        instructor = attrs.get("instructor")
+
+        if establishment.organization_id != organization.id:
+            raise serializers.ValidationError({"establishment": "La sede no pertenece a la organizacion"})
+        if room and room.establishment_id != establishment.id:
+            raise serializers.ValidationError({"room": "El salon no pertenece a la sede indicada"})
+        if room and not room.is_active:
+            raise serializers.ValidationError({"room": "El salon esta inactivo"})
+        if instructor and not InstructorProfile.objects.filter(
+            organization_id=organization.id,
+            user_id=instructor.id,
+            is_active=True,
+        ).exists():
+            raise serializers.ValidationError({"instructor": "El instructor no esta habilitado para esta organizacion"})
+
+        if attrs["start_time"] >= attrs["end_time"]:
+            raise serializers.ValidationError({"end_time": "La hora de fin debe ser mayor al inicio"})
+        if attrs["start_date"] > attrs["end_date"]:
+            raise serializers.ValidationError({"end_date": "La fecha de fin debe ser posterior al inicio"})
+        if (attrs["end_date"] - attrs["start_date"]).days > 366:
+            raise serializers.ValidationError({"end_date": "El rango maximo es de un anio"})
 
+        capacity = attrs.get("capacity") or (room.capacity if room else None)
+        if not capacity:
+            raise serializers.ValidationError({"capacity": "capacity es requerido si no se indica salon"})
+        if room and capacity > room.capacity:
+            raise serializers.ValidationError(
+                {"capacity": f"La capacidad no puede superar la del salon seleccionado ({room.capacity})"}
+            )
+        attrs["capacity"] = capacity
+        attrs["weekdays"] = sorted(set(attrs["weekdays"]), key=WEEKDAY_KEYS.index)
         return attrs
 
 
@@ -358,24 +477,13 @@ def resolve_metrics_reference(year=None, month=None):
     return timezone.make_aware(reference, timezone.get_current_timezone())
 
 
-def build_instructor_metrics_payload(profile, reference=None, class_rows=None):
-    reference = reference or timezone.now()
+def _aggregate_class_rows(rows, reference):
     month_start = reference.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
     if month_start.month == 12:
         month_end = month_start.replace(year=month_start.year + 1, month=1)
     else:
         month_end = month_start.replace(month=month_start.month + 1)
 
-    rows = class_rows
-    if rows is None:
-        rows = list(
-            StudioClass.objects.filter(organization_id=profile.organization_id, instructor_id=profile.user_id).values(
-                "status",
-                "start_at",
-                "end_at",
-            )
-        )
-
     totals = {
         "total_classes": 0,
         "scheduled_classes": 0,
@@ -399,9 +507,7 @@ def build_instructor_metrics_payload(profile, reference=None, class_rows=None):
         elif status == StudioClass.STATUS_CANCELED:
             totals["canceled_classes"] += 1
 
-        duration_hours = Decimal("0")
-        if start_at and end_at and end_at > start_at:
-            duration_hours = Decimal(str((end_at - start_at).total_seconds() / 3600)).quantize(Decimal("0.01"))
+        duration_hours = class_duration_hours(start_at, end_at)
 
         if status != StudioClass.STATUS_CANCELED:
             totals["assigned_hours"] += duration_hours
@@ -410,6 +516,22 @@ def build_instructor_metrics_payload(profile, reference=None, class_rows=None):
                 totals["month_hours"] += duration_hours
         if status == StudioClass.STATUS_COMPLETED:
             totals["completed_hours"] += duration_hours
+    return totals
+
+
+def build_instructor_metrics_payload(profile, reference=None, class_rows=None, totals=None):
+    """
+    Metrics for one instructor profile.
+
+    `totals` comes from classes/metrics.py (materialized table or ORM aggregate); `class_rows`
+    is the legacy path that aggregates raw class rows in Python.
+    """
+    reference = reference or timezone.now()
+    if totals is None and class_rows is None:
+        key = (profile.organization_id, profile.user_id)
+        totals = get_instructor_metric_totals([key], reference=reference).get(key)
+    if totals is None:
+        totals = _aggregate_class_rows(class_rows or [], reference)
 
     projected_cost = Decimal("0")
     scheme = profile.compensation_scheme
@@ -437,3 +559,37 @@ def build_instructor_metrics_payload(profile, reference=None, class_rows=None):
         "month_hours": str(totals["month_hours"].quantize(Decimal("0.01"))),
         "projected_cost": str(projected_cost.quantize(Decimal("0.01"))),
     }
+
+
+class FreeSlotSearchSerializer(serializers.Serializer):
+    MAX_DAYS = 31
+    MAX_LIMIT = 1000
+    DEFAULT_STEP_MINUTES = 30
+
+    establishment = serializers.PrimaryKeyRelatedField(queryset=Establishment.objects.all())
+    date_from = serializers.DateField()
+    date_to = serializers.DateField(required=False)
+    duration_minutes = serializers.IntegerField(min_value=5, max_value=24 * 60)
+    instructor = serializers.PrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    min_capacity = serializers.IntegerField(required=False, min_value=1)
+    step_minutes = serializers.IntegerField(required=False, min_value=5, max_value=24 * 60)
+    limit = serializers.IntegerField(required=False, default=200, min_value=1, max_value=MAX_LIMIT)
+
+    def validate(self, attrs):
+        establishment = attrs["establishment"]
+        instructor = attrs.get("instructor")
+        attrs["date_to"] = attrs.get("date_to") or attrs["date_from"]
+
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError({"date_to": "La fecha de fin debe ser posterior al inicio"})
+        if (attrs["date_to"] - attrs["date_from"]).days >= self.MAX_DAYS:
+            raise serializers.ValidationError({"date_to": f"El rango maximo es de {self.MAX_DAYS} dias"})
+        if not establishment.is_active:
+            raise serializers.ValidationError({"establishment": "La sede esta inactiva"})
+        if instructor and not InstructorProfile.objects.filter(
+            organization_id=establishment.organization_id,
+            user_id=instructor.id,
+            is_active=True,
+        ).exists():
+            raise serializers.ValidationError({"instructor": "El instructor no esta habilitado para esta organizacion"})
+        return attrs
@@ -0,0 +1,258 @@
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from studio.modules.assistant.context import invalidate_business_context
+from studio.modules.core.schedule import WEEKDAY_KEYS, get_establishment_windows
+from studio.modules.dashboard.jobs import schedule_snapshot_refresh
+
+from .metrics import get_instructor_metric_totals
+from .models import InstructorProfile, InstructorSettlement, StudioClass
+from .serializers import (
+    INSTRUCTOR_OVERLAP_MESSAGE,
+    ROOM_OVERLAP_MESSAGE,
+    build_instructor_metrics_payload,
+    resolve_metrics_reference,
+    room_blocking_conflicts,
+)
+
+SETTLEMENT_UPSERT_FIELDS = (
+    "compensation_scheme",
+    "status",
+    "amount",
+    "currency",
+    "month_classes",
+    "month_hours",
+    "completed_hours",
+    "updated_at",
+)
+
+
+def expand_weekly_occurrences(start_date, end_date, weekdays, start_time, end_time, interval_weeks=1):
+    """RRULE-like FREQ=WEEKLY;INTERVAL=n;BYDAY=... expansion into aware (start_at, end_at) pairs."""
+    current_tz = timezone.get_current_timezone()
+    selected = {WEEKDAY_KEYS.index(day) for day in weekdays}
+    week_origin = start_date - timedelta(days=start_date.weekday())
+    occurrences = []
+    day = start_date
+    while day <= end_date:
+        week_index = (day - week_origin).days // 7
+        if day.weekday() in selected and week_index % interval_weeks == 0:
+            occurrences.append(
+                (
+                    timezone.make_aware(datetime.combine(day, start_time), current_tz),
+                    timezone.make_aware(datetime.combine(day, end_time), current_tz),
+                )
+            )
+        day += timedelta(days=1)
+    return occurrences
+
+
+def fits_establishment_hours(windows, start_at, end_at):
+    if windows is None:
+        return True
+    local_start = timezone.localtime(start_at)
+    local_end = timezone.localtime(end_at)
+    if local_start.date() != local_end.date():
+        return False
+    day_windows = windows.get(WEEKDAY_KEYS[local_start.weekday()]) or []
+    return any(opens <= local_start.time() and local_end.time() <= closes for opens, closes in day_windows)
+
+
+def _index_busy_slots(rows, key):
+    busy = {}
+    for row in rows:
+        if row[key] is not None:
+            busy.setdefault(row[key], []).append((row["start_at"], row["end_at"]))
+    indexed = {}
+    for resource_id, slots in busy.items():
+        slots.sort(key=lambda slot: slot[1])
+        indexed[resource_id] = ([slot[0] for slot in slots], [slot[1] for slot in slots])
+    return indexed
+
+
+def _overlaps_busy(busy_slots, start_at, end_at):
+    if not busy_slots:
+        return False
+    starts, ends = busy_slots
+    # Slots are sorted by end; only those ending after start_at can overlap.
+    for index in range(bisect_right(ends, start_at), len(ends)):
+        if starts[index] < end_at:
+            return True
+    return False
+
+
+def find_occurrence_conflicts(occurrences, establishment, room=None, instructor=None):
+    """
+    Check every occurrence against opening hours, room blocks and scheduled classes.
+
+    Existing classes for the room/instructor inside the whole window are loaded with one
+    query and matched in memory, instead of one overlap query per occurrence.
+    """
+    if not occurrences:
+        return {}
+
+    windows = get_establishment_windows(establishment)
+    busy_by_room = {}
+    busy_by_instructor = {}
+    resource_filter = Q()
+    if room:
+        resource_filter |= Q(room_id=room.id)
+    if instructor:
+        resource_filter |= Q(instructor_id=instructor.id)
+    if resource_filter:
+        rows = list(
+            StudioClass.objects.filter(
+                resource_filter,
+                status=StudioClass.STATUS_SCHEDULED,
+                start_at__lt=max(end_at for _start_at, end_at in occurrences),
+                end_at__gt=min(start_at for start_at, _end_at in occurrences),
+            ).values("room_id", "instructor_id", "start_at", "end_at")
+        )
+        busy_by_room = _index_busy_slots(rows, "room_id")
+        busy_by_instructor = _index_busy_slots(rows, "instructor_id")
+
+    conflicts = {}
+    for position, (start_at, end_at) in enumerate(occurrences):
+        reasons = []
+        if not fits_establishment_hours(windows, start_at, end_at):
+            reasons.append({"field": "establishment", "detail": "Fuera del horario de atencion de la sede"})
+        if room and room_blocking_conflicts(room, start_at, end_at):
+            reasons.append({"field": "room", "detail": "El salon esta bloqueado por mantenimiento/evento"})
+        if room and _overlaps_busy(busy_by_room.get(room.id), start_at, end_at):
+            reasons.append({"field": "room", "detail": ROOM_OVERLAP_MESSAGE})
+        if instructor and _overlaps_busy(busy_by_instructor.get(instructor.id), start_at, end_at):
+            reasons.append({"field": "instructor", "detail": INSTRUCTOR_OVERLAP_MESSAGE})
+        if reasons:
+            conflicts[position] = reasons
+    return conflicts
+
+
+def generate_instructor_settlements(organization_id, year, month):
+    """
+    Create or refresh the pending settlements of one organization for a period.
+
+    Existing rows are read once (locked), amounts are computed in memory and everything is
+    written with a single upsert; paid settlements are kept untouched.
+    """
+    profiles = list(
+        InstructorProfile.objects.select_related("user")
+        .filter(organization_id=organization_id, is_active=True)
+        .order_by("user__username", "id")
+    )
+    if not profiles:
+        raise ValueError("No hay instructores activos para liquidar")
+
+    period_start = resolve_metrics_reference(year, month)
+    period_totals = get_instructor_metric_totals(
+        {(profile.organization_id, profile.user_id) for profile in profiles},
+        reference=period_start,
+        month_only=True,
+    )
+
+    with transaction.atomic():
+        existing = {
+            settlement.instructor_profile_id: settlement
+            for settlement in InstructorSettlement.objects.select_for_update().filter(
+                organization_id=organization_id,
+                period_year=year,
+                period_month=month,
+                instructor_profile__in=profiles,
+            )
+        }
+
+        kept_paid_ids = []
+        upserts = []
+        for profile in profiles:
+            metrics = build_instructor_metrics_payload(
+                profile,
+                reference=period_start,
+                class_rows=[],
+                totals=period_totals.get((profile.organization_id, profile.user_id)),
+            )
+            amount = Decimal(metrics["projected_cost"])
+            month_classes = int(metrics["month_classes"])
+            month_hours = Decimal(metrics["month_hours"])
+            current = existing.get(profile.id)
+            should_include = bool(
+                current
+                or amount > 0
+                or month_classes > 0
+                or month_hours > 0
+                or Decimal(profile.monthly_salary or 0) > 0
+            )
+            if not should_include:
+                continue
+            if current and current.status == InstructorSettlement.STATUS_PAID:
+                kept_paid_ids.append(current.id)
+                continue
+
+            upserts.append(
+                InstructorSettlement(
+                    organization_id=organization_id,
+                    instructor_profile=profile,
+                    period_year=year,
+                    period_month=month,
+                    compensation_scheme=profile.compensation_scheme,
+                    status=InstructorSettlement.STATUS_PENDING,
+                    amount=amount,
+                    currency=(profile.currency or "ARS").strip().upper(),
+                    month_classes=month_classes,
+                    month_hours=month_hours,
+                    completed_hours=Decimal(metrics["completed_hours"]),
+                )
+            )
+
+        if upserts:
+            InstructorSettlement.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=("organization", "instructor_profile", "period_year", "period_month"),
+                update_fields=SETTLEMENT_UPSERT_FIELDS,
+            )
+            invalidate_business_context(organization_id, "finance")
+            schedule_snapshot_refresh(organization_id)
+
+    upserted_profile_ids = [settlement.instructor_profile_id for settlement in upserts]
+    settlement_ids = list(
+        InstructorSettlement.objects.filter(
+            organization_id=organization_id,
+            period_year=year,
+            period_month=month,
+            instructor_profile_id__in=upserted_profile_ids,
+        ).values_list("id", flat=True)
+    )
+    updated_count = sum(1 for profile_id in upserted_profile_ids if profile_id in existing)
+    return {
+        "organization_id": organization_id,
+        "year": year,
+        "month": month,
+        "created_count": len(upserts) - updated_count,
+        "updated_count": updated_count,
+        "kept_paid_count": len(kept_paid_ids),
+        "settlement_ids": settlement_ids + kept_paid_ids,
+    }
+
+
+def iter_previous_periods(year, month, months=1):
+    """(year, month) pairs from the given period going back `months` months, oldest first."""
+    periods = []
+    for _ in range(max(1, months)):
+        periods.append((year, month))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return list(reversed(periods))
+
+
+def generate_instructor_settlements_batch(organization_ids, periods):
+    results = []
+    for organization_id in organization_ids:
+        for year, month in periods:
+            try:
+                results.append(generate_instructor_settlements(organization_id, year, month))
+            except ValueError as exc:
+                results.append({"organization_id": organization_id, "year": year, "month": month, "skipped": str(exc)})
+    return results
@@ -0,0 +1,32 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .metrics import STATE_FIELDS, record_class_change, snapshot_class_state
+from .models import StudioClass
+
+# Read by analytics/signals.py too, to notice classes moved to another day.
+PREVIOUS_STATE_ATTR = "_studio_metrics_previous_state"
+_STATE_COLUMNS = {"organization", "instructor", "status", "start_at", "end_at"}
+
+
+@receiver(pre_save, sender=StudioClass, dispatch_uid="studio_class_metrics_pre_save")
+def remember_class_state(sender, instance, update_fields=None, **kwargs):
+    # Saves that touch none of the metric inputs (e.g. assign-room) skip the lookup.
+    if not instance.pk or (update_fields is not None and not _STATE_COLUMNS.intersection(update_fields)):
+        setattr(instance, PREVIOUS_STATE_ATTR, None)
+        return
+    previous = StudioClass.objects.filter(pk=instance.pk).values(*STATE_FIELDS).first()
+    setattr(instance, PREVIOUS_STATE_ATTR, previous or False)
+
+
+@receiver(post_save, sender=StudioClass, dispatch_uid="studio_class_metrics_post_save")
+def update_metrics_on_class_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, PREVIOUS_STATE_ATTR, None)
+    if previous is None and not created:
+        return
+    record_class_change(old_state=previous or None, new_state=snapshot_class_state(instance))
+
+
+@receiver(post_delete, sender=StudioClass, dispatch_uid="studio_class_metrics_post_delete")
+def update_metrics_on_class_delete(sender, instance, **kwargs):
+    record_class_change(old_state=snapshot_class_state(instance))
@@ -1,4 +1,4 @@
-from decimal import Decimal
+from datetime import timedelta
 
 from django.contrib.auth import get_user_model
 from django.contrib.auth.models import Group
@@ -6,36 +6,50 @@ from django.db import transaction
 from django.utils import timezone
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from studio.models import InstructorProfile, InstructorSettlement, OrganizationMembership
+from studio.models import InstructorProfile, InstructorSettlement, Organization
+from studio.modules.assistant.context import invalidate_business_context
+from studio.modules.bookings.services import promote_waitlist
+from studio.modules.core.conditional import ConditionalGetMixin, bump_data_versions, conditional_get
+from studio.modules.core.pagination import KeysetPagination
+from studio.modules.core.services import get_owned_org_ids
+from studio.modules.dashboard.jobs import schedule_snapshot_refresh
+from studio.modules.jobs.services import enqueue_job
 from studio.modules.users.services import ensure_roles_exist, is_instructor, is_owner, is_platform_admin, is_student
 
+from .availability import find_free_slots
+from .jobs import SETTLEMENT_BATCH_JOB
+from .metrics import get_instructor_metric_totals, record_classes_created
 from .models import StudioClass
 from .serializers import (
+    FreeSlotSearchSerializer,
     InstructorCreateSerializer,
     InstructorProfileSerializer,
     InstructorProfileUpdateSerializer,
+    InstructorSettlementBatchSerializer,
     InstructorSettlementGenerateSerializer,
     InstructorSettlementMarkPaidSerializer,
     InstructorSettlementSerializer,
+    StudioClassBulkCreateSerializer,
     StudioClassSerializer,
     build_instructor_metrics_payload,
-    resolve_metrics_reference,
+    guard_class_overlaps,
     validate_instructor,
     validate_room_for_establishment,
 )
+from .services import (
+    expand_weekly_occurrences,
+    find_occurrence_conflicts,
+    generate_instructor_settlements,
+    iter_previous_periods,
+)
 
 User = get_user_model()
 
 
-def get_owned_org_ids(user):
-    return list(
-        OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-    )
-
-
 def _get_instructor_profiles_queryset(request):
     user = request.user
     queryset = InstructorProfile.objects.select_related("user", "organization").order_by("user__username", "id")
@@ -54,26 +68,13 @@ def _get_instructor_profiles_queryset(request):
 
 def _build_metrics_map(profiles):
     profiles = list(profiles)
-    profile_keys = {(profile.organization_id, profile.user_id) for profile in profiles}
-    if not profile_keys:
-        return {}
-
-    organization_ids = {organization_id for organization_id, _user_id in profile_keys}
-    instructor_ids = {user_id for _organization_id, user_id in profile_keys}
-    class_rows = StudioClass.objects.filter(
-        organization_id__in=organization_ids,
-        instructor_id__in=instructor_ids,
-    ).values("organization_id", "instructor_id", "status", "start_at", "end_at")
-
-    grouped = {}
-    for row in class_rows:
-        key = (row["organization_id"], row["instructor_id"])
-        grouped.setdefault(key, []).append(row)
-
+    totals = get_instructor_metric_totals({(profile.organization_id, profile.user_id) for profile in profiles})
+    # Instructors without rows yet get the zeroed payload (empty class_rows), not a per-profile query.
     return {
         (profile.organization_id, profile.user_id): build_instructor_metrics_payload(
             profile,
-            class_rows=grouped.get((profile.organization_id, profile.user_id), []),
+            class_rows=[],
+            totals=totals.get((profile.organization_id, profile.user_id)),
         )
         for profile in profiles
     }
@@ -103,15 +104,6 @@ def _parse_period_values(year_value=None, month_value=None):
     return year, month
 
 
-def _get_period_window(year, month):
-    period_start = resolve_metrics_reference(year, month)
-    if month == 12:
-        period_end = resolve_metrics_reference(year + 1, 1)
-    else:
-        period_end = resolve_metrics_reference(year, month + 1)
-    return period_start, period_end
-
-
 def _resolve_instructor_profile_access(request, profile_id):
     try:
         profile = InstructorProfile.objects.select_related("user", "organization").get(id=profile_id)
@@ -183,10 +175,13 @@ def _serialize_instructor_settlements(settlements):
     return InstructorSettlementSerializer(settlements, many=True).data
 
 
-class StudioClassViewSet(viewsets.ModelViewSet):
+class StudioClassViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = StudioClass.objects.select_related("organization", "establishment", "room", "instructor").all()
     serializer_class = StudioClassSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("start_at", "id")
+    conditional_scopes = ("classes", "organizations", "users")
 
     def get_queryset(self):
         user = self.request.user
@@ -256,9 +251,12 @@ class StudioClassViewSet(viewsets.ModelViewSet):
             payload["instructor"] = user.id
 
         partial = kwargs.pop("partial", False)
+        previous_capacity = studio_class.capacity
         serializer = self.get_serializer(studio_class, data=payload, partial=partial)
         serializer.is_valid(raise_exception=True)
         updated = serializer.save()
+        if updated.capacity > previous_capacity and promote_waitlist(updated.id):
+            updated.refresh_from_db(fields=["booked_count", "waitlist_count"])
         return Response(self.get_serializer(updated).data, status=status.HTTP_200_OK)
 
     def partial_update(self, request, *args, **kwargs):
@@ -274,6 +272,137 @@ class StudioClassViewSet(viewsets.ModelViewSet):
             return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
         return super().destroy(request, *args, **kwargs)
 
+    @action(detail=False, methods=["get"], url_path="free-slots")
+    def free_slots(self, request):
+        user = request.user
+        if not (is_platform_admin(user) or is_owner(user) or is_instructor(user)):
+            return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
+
+        params = request.query_params.dict()
+        if "establishment_id" in params:
+            params["establishment"] = params.pop("establishment_id")
+        if "instructor_id" in params:
+            params["instructor"] = params.pop("instructor_id")
+        if is_instructor(user):
+            params["instructor"] = user.id
+
+        serializer = FreeSlotSearchSerializer(data=params)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        establishment = data["establishment"]
+        if is_owner(user) and establishment.organization_id not in get_owned_org_ids(user):
+            return Response({"detail": "No puedes consultar sedes fuera de tus organizaciones"}, status=status.HTTP_403_FORBIDDEN)
+
+        slots = find_free_slots(
+            establishment,
+            data["date_from"],
+            data["date_to"],
+            duration=timedelta(minutes=data["duration_minutes"]),
+            step=timedelta(minutes=data.get("step_minutes") or FreeSlotSearchSerializer.DEFAULT_STEP_MINUTES),
+            instructor=data.get("instructor"),
+            min_capacity=data.get("min_capacity"),
+            # One extra slot tells whether the search was cut short.
+            limit=data["limit"] + 1,
+        )
+        results = slots[: data["limit"]]
+        return Response(
+            {
+                "establishment_id": establishment.id,
+                "duration_minutes": data["duration_minutes"],
+                "count": len(results),
+                "truncated": len(slots) > data["limit"],
+                "results": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="bulk-create")
+    def bulk_create(self, request):
+        user = request.user
+        if not (is_platform_admin(user) or is_owner(user) or is_instructor(user)):
+            return Response({"detail": "Sin permisos"}, status=status.HTTP_403_FORBIDDEN)
+
+        payload = request.data.copy()
+        if is_instructor(user):
+            payload["instructor"] = user.id
+
+        serializer = StudioClassBulkCreateSerializer(data=payload)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        organization = data["organization"]
+        if is_owner(user) and organization.id not in get_owned_org_ids(user):
+            return Response({"detail": "No puedes crear clases fuera de tus organizaciones"}, status=status.HTTP_403_FORBIDDEN)
+
+        occurrences = expand_weekly_occurrences(
+            data["start_date"],
+            data["end_date"],
+            data["weekdays"],
+            data["start_time"],
+            data["end_time"],
+            interval_weeks=data["interval_weeks"],
+        )
+        if not occurrences:
+            return Response({"detail": "El patron no genera ninguna clase"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(occurrences) > StudioClassBulkCreateSerializer.MAX_OCCURRENCES:
+            return Response(
+                {"detail": f"El patron genera mas de {StudioClassBulkCreateSerializer.MAX_OCCURRENCES} clases"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        room = data.get("room")
+        instructor = data.get("instructor")
+        conflicts_by_position = find_occurrence_conflicts(occurrences, data["establishment"], room=room, instructor=instructor)
+        conflicts = [
+            {"start_at": occurrences[position][0], "end_at": occurrences[position][1], "reasons": reasons}
+            for position, reasons in sorted(conflicts_by_position.items())
+        ]
+        free_slots = [slot for position, slot in enumerate(occurrences) if position not in conflicts_by_position]
+
+        if data["dry_run"]:
+            return Response(
+                {"occurrences": len(occurrences), "available": len(free_slots), "conflicts": conflicts},
+                status=status.HTTP_200_OK,
+            )
+        if conflicts and not data["skip_conflicts"]:
+            return Response(
+                {"detail": f"Hay conflictos en {len(conflicts)} de {len(occurrences)} clases", "conflicts": conflicts},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        new_classes = [
+            StudioClass(
+                organization=organization,
+                establishment=data["establishment"],
+                room=room,
+                instructor=instructor,
+                name=data["name"].strip(),
+                start_at=start_at,
+                end_at=end_at,
+                capacity=data["capacity"],
+                status=StudioClass.STATUS_SCHEDULED,
+                notes=data.get("notes", ""),
+            )
+            for start_at, end_at in free_slots
+        ]
+        try:
+            with guard_class_overlaps():
+                created = StudioClass.objects.bulk_create(new_classes)
+                record_classes_created(created)
+                invalidate_business_context(organization.id, "classes")
+                bump_data_versions(organization.id, "classes")
+                schedule_snapshot_refresh(organization.id)
+        except ValidationError as exc:
+            return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(
+            {
+                "created": len(created),
+                "classes": self.get_serializer(created, many=True).data,
+                "conflicts": conflicts,
+            },
+            status=status.HTTP_201_CREATED,
+        )
+
     @action(detail=False, methods=["get", "post"], url_path="instructors")
     def instructors(self, request):
         if request.method.lower() == "post":
@@ -358,7 +487,11 @@ class StudioClassViewSet(viewsets.ModelViewSet):
             return Response(detail, status=status.HTTP_400_BAD_REQUEST)
 
         studio_class.instructor = instructor
-        studio_class.save(update_fields=["instructor", "updated_at"])
+        try:
+            with guard_class_overlaps():
+                studio_class.save(update_fields=["instructor", "updated_at"])
+        except ValidationError as exc:
+            return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
         return Response(self.get_serializer(studio_class).data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="assign-room")
@@ -390,9 +523,16 @@ class StudioClassViewSet(viewsets.ModelViewSet):
             detail = getattr(exc, "detail", {"detail": "Error validando salon"})
             return Response(detail, status=status.HTTP_400_BAD_REQUEST)
 
+        previous_capacity = studio_class.capacity
         studio_class.room = room
         studio_class.capacity = room.capacity
-        studio_class.save(update_fields=["room", "capacity", "updated_at"])
+        try:
+            with guard_class_overlaps():
+                studio_class.save(update_fields=["room", "capacity", "updated_at"])
+        except ValidationError as exc:
+            return Response(exc.detail, status=status.HTTP_400_BAD_REQUEST)
+        if studio_class.capacity > previous_capacity and promote_waitlist(studio_class.id):
+            studio_class.refresh_from_db(fields=["booked_count", "waitlist_count"])
         return Response(self.get_serializer(studio_class).data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="cancel")
@@ -415,6 +555,7 @@ class StudioClassViewSet(viewsets.ModelViewSet):
 
 @api_view(["GET", "POST"])
 @permission_classes([IsAuthenticated])
+@conditional_get("instructors", "classes", "organizations", "users")
 def instructor_collection(request):
     if request.method == "GET":
         if not (is_platform_admin(request.user) or is_owner(request.user) or is_instructor(request.user)):
@@ -530,104 +671,68 @@ def instructor_settlement_generate(request):
     except ValueError as exc:
         return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
-    period_start, period_end = _get_period_window(year, month)
-    profiles = list(
-        InstructorProfile.objects.select_related("user", "organization")
-        .filter(organization_id=organization_id, is_active=True)
-        .order_by("user__username", "id")
-    )
-    if not profiles:
-        return Response({"detail": "No hay instructores activos para liquidar"}, status=status.HTTP_400_BAD_REQUEST)
-
-    class_rows = StudioClass.objects.filter(
-        organization_id=organization_id,
-        instructor_id__in=[profile.user_id for profile in profiles],
-        start_at__gte=period_start,
-        start_at__lt=period_end,
-    ).values("organization_id", "instructor_id", "status", "start_at", "end_at")
-
-    grouped_rows = {}
-    for row in class_rows:
-        key = (row["organization_id"], row["instructor_id"])
-        grouped_rows.setdefault(key, []).append(row)
-
-    generated_ids = []
-    created_count = 0
-    updated_count = 0
-    kept_paid_count = 0
-
-    with transaction.atomic():
-        for profile in profiles:
-            metrics = build_instructor_metrics_payload(
-                profile,
-                reference=period_start,
-                class_rows=grouped_rows.get((profile.organization_id, profile.user_id), []),
-            )
-            amount = Decimal(metrics["projected_cost"])
-            month_classes = int(metrics["month_classes"])
-            month_hours = Decimal(metrics["month_hours"])
-            completed_hours = Decimal(metrics["completed_hours"])
-
-            existing = InstructorSettlement.objects.filter(
-                organization_id=organization_id,
-                instructor_profile=profile,
-                period_year=year,
-                period_month=month,
-            ).first()
-            should_include = bool(
-                existing
-                or amount > 0
-                or month_classes > 0
-                or month_hours > 0
-                or Decimal(profile.monthly_salary or 0) > 0
-            )
-            if not should_include:
-                continue
-
-            if existing and existing.status == InstructorSettlement.STATUS_PAID:
-                generated_ids.append(existing.id)
-                kept_paid_count += 1
-                continue
-
-            settlement, created = InstructorSettlement.objects.update_or_create(
-                organization_id=organization_id,
-                instructor_profile=profile,
-                period_year=year,
-                period_month=month,
-                defaults={
-                    "compensation_scheme": profile.compensation_scheme,
-                    "status": InstructorSettlement.STATUS_PENDING,
-                    "amount": amount,
-                    "currency": (profile.currency or "ARS").strip().upper(),
-                    "month_classes": month_classes,
-                    "month_hours": month_hours,
-                    "completed_hours": completed_hours,
-                },
-            )
-            generated_ids.append(settlement.id)
-            if created:
-                created_count += 1
-            else:
-                updated_count += 1
+    try:
+        result = generate_instructor_settlements(organization_id, year, month)
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
     settlements = InstructorSettlement.objects.select_related(
         "organization",
         "instructor_profile",
         "instructor_profile__user",
-    ).filter(id__in=generated_ids).order_by("instructor_profile__user__username", "id")
+    ).filter(id__in=result["settlement_ids"]).order_by("instructor_profile__user__username", "id")
 
     return Response(
         {
             "detail": f"Liquidacion generada para {month:02d}/{year}",
-            "created_count": created_count,
-            "updated_count": updated_count,
-            "kept_paid_count": kept_paid_count,
+            "created_count": result["created_count"],
+            "updated_count": result["updated_count"],
+            "kept_paid_count": result["kept_paid_count"],
             "settlements": _serialize_instructor_settlements(settlements),
         },
         status=status.HTTP_200_OK,
     )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def instructor_settlement_generate_batch(request):
+    if not is_platform_admin(request.user):
+        return Response({"detail": "Solo admin de plataforma puede generar lotes"}, status=status.HTTP_403_FORBIDDEN)
+
+    serializer = InstructorSettlementBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    try:
+        year, month = _parse_period_values(
+            serializer.validated_data.get("year"),
+            serializer.validated_data.get("month"),
+        )
+    except ValueError as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+    organizations = Organization.objects.filter(is_active=True)
+    if serializer.validated_data.get("organizations"):
+        organizations = organizations.filter(id__in=serializer.validated_data["organizations"])
+    organization_ids = list(organizations.order_by("id").values_list("id", flat=True))
+    if not organization_ids:
+        return Response({"detail": "No hay organizaciones para liquidar"}, status=status.HTTP_400_BAD_REQUEST)
+    periods = iter_previous_periods(year, month, serializer.validated_data["months"])
+
+    job = enqueue_job(
+        SETTLEMENT_BATCH_JOB,
+        {"organization_ids": organization_ids, "periods": periods},
+        created_by=request.user,
+    )
+    return Response(
+        {
+            "job_id": job.id,
+            "status": job.status,
+            "periods": [f"{period_month:02d}/{period_year}" for period_year, period_month in periods],
+        },
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def instructor_settlement_mark_paid(request, settlement_id):
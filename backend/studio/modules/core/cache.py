@@ -0,0 +1,19 @@
+"""
+Whether the default cache backend is shared by every process.
+
+Version stamps (ETags, catalogs, AI context) and the authorization caches are only correct
+when the gunicorn workers and the run_jobs worker read and write the same backend. With a
+process-local backend a bump is invisible to the other processes, so callers skip their
+cross-request layer instead.
+"""
+
+from django.conf import settings
+
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def is_shared_cache():
+    return settings.CACHES["default"]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
@@ -0,0 +1,160 @@
+"""
+Conditional GET for authenticated read endpoints.
+
+Writes bump a version token per (scope, organization) and per (scope, "all"); see
+core/signals.py for which models feed which scope. A response's ETag hashes the versions
+of the scopes it reads, for the organizations it can see, together with the caller's
+identity and the full URL, so a matching If-None-Match is answered with 304 before any
+queryset or serializer runs. Without a shared cache backend the versions would only move in
+the process that handled the write, so responses are then sent without validators.
+"""
+
+import hashlib
+import uuid
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from studio.modules.users.services import get_user_roles, is_owner, is_platform_admin
+
+from .cache import is_shared_cache
+from .services import get_owned_org_ids
+
+DATA_VERSION_KEY = "studio:data-version:{scope}:{organization_id}"
+ALL_ORGANIZATIONS = "all"
+# Scopes that are not split by organization (e.g. user counts, usernames).
+GLOBAL_SCOPES = ("users",)
+
+
+def bump_data_versions(organization_id, *scopes):
+    """New version for the scopes of one organization (and their "all" tokens) after commit."""
+    keys = []
+    for scope in scopes:
+        keys.append(DATA_VERSION_KEY.format(scope=scope, organization_id=ALL_ORGANIZATIONS))
+        if organization_id and scope not in GLOBAL_SCOPES:
+            keys.append(DATA_VERSION_KEY.format(scope=scope, organization_id=organization_id))
+    if keys:
+        transaction.on_commit(lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, None))
+
+
+def _get_versions(keys):
+    found = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        version = found.get(key)
+        if version is None:
+            cache.add(key, uuid.uuid4().hex, None)
+            version = cache.get(key)
+        versions.append(version)
+    return versions
+
+
+def _visible_organization_ids(request):
+    """Organizations whose versions cover the response; None means every organization."""
+    user = request.user
+    requested = request.query_params.get("organization_id")
+    if requested:
+        try:
+            return [int(requested)]
+        except (TypeError, ValueError):
+            return None
+    if is_platform_admin(user):
+        return None
+    if is_owner(user):
+        return sorted(get_owned_org_ids(user))
+    return None
+
+
+def compute_etag(request, scopes=(), validators=()):
+    """ETag over the caller's identity, the URL and the scopes' versions (plus any extra validators)."""
+    organization_ids = _visible_organization_ids(request)
+    keys = []
+    for scope in scopes:
+        if organization_ids is None or scope in GLOBAL_SCOPES:
+            keys.append(DATA_VERSION_KEY.format(scope=scope, organization_id=ALL_ORGANIZATIONS))
+        else:
+            keys.extend(
+                DATA_VERSION_KEY.format(scope=scope, organization_id=organization_id)
+                for organization_id in organization_ids
+            )
+    user = request.user
+    parts = [
+        request.get_full_path(),
+        str(user.pk),
+        user.email or "",
+        ",".join(sorted(get_user_roles(user))),
+        ",".join(str(organization_id) for organization_id in sorted(get_owned_org_ids(user))),
+        # Some payloads depend on the current period; never reuse a validator across days.
+        timezone.localdate().isoformat(),
+        *_get_versions(keys),
+        *validators,
+    ]
+    return '"%s"' % hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()[:32]
+
+
+def conditional_response(request, scopes, render):
+    """Return 304 when If-None-Match matches, otherwise render() with an ETag attached."""
+    if not is_shared_cache():
+        return render()
+    return etag_response(request, compute_etag(request, scopes), render)
+
+
+def etag_response(request, etag, render):
+    """304 when If-None-Match matches `etag`, otherwise render() with it attached."""
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match:
+        candidates = [candidate.removeprefix("W/") for candidate in parse_etags(if_none_match)]
+        if etag in candidates or "*" in candidates:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            response["ETag"] = etag
+            patch_cache_control(response, private=True, no_cache=True)
+            return response
+
+    response = render()
+    if status.is_success(response.status_code):
+        response["ETag"] = etag
+        # Per-user data: browsers may keep it but must revalidate on every use.
+        patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def conditional_get(*scopes):
+    """Decorator for @api_view functions (place it below @api_view/@permission_classes)."""
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ("GET", "HEAD"):
+                return view(request, *args, **kwargs)
+            return conditional_response(request, scopes, lambda: view(request, *args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+class ConditionalGetMixin:
+    """ETag/304 for list and retrieve on viewsets; set conditional_scopes on the viewset."""
+
+    conditional_scopes = ()
+
+    def get_conditional_scopes(self):
+        return self.conditional_scopes
+
+    def list(self, request, *args, **kwargs):
+        return conditional_response(
+            request, self.get_conditional_scopes(), lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            request,
+            self.get_conditional_scopes(),
+            lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs),
+        )
@@ -0,0 +1,285 @@
+"""
+Shared outbound HTTP client (SSO providers, AI providers).
+
+One pooled httpx client per process keeps TLS connections alive per host. Each host also
+gets a circuit breaker, a retry budget, and reuse/latency counters.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import httpx
+from django.conf import settings
+
+RETRYABLE_STATUS_CODES = (502, 503, 504)
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without touching the network while a host's breaker is open."""
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+class HostState:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.half_open_probe = False
+        self.retry_tokens = float(_setting("STUDIO_HTTP_RETRY_BUDGET_MAX", 10))
+        self.metrics = {
+            "requests": 0,
+            "errors": 0,
+            "retries": 0,
+            "short_circuited": 0,
+            "new_connections": 0,
+            "latency_ms_total": 0.0,
+            "latency_ms_max": 0.0,
+        }
+
+    def allow_request(self):
+        cooldown = float(_setting("STUDIO_HTTP_BREAKER_COOLDOWN", 30))
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < cooldown or self.half_open_probe:
+                self.metrics["short_circuited"] += 1
+                return False
+            # Half-open: let a single probe through; its outcome closes or re-opens the breaker.
+            self.half_open_probe = True
+            return True
+
+    def record(self, ok, elapsed_ms, new_connections=0):
+        threshold = int(_setting("STUDIO_HTTP_BREAKER_THRESHOLD", 5))
+        with self.lock:
+            metrics = self.metrics
+            metrics["requests"] += 1
+            metrics["new_connections"] += new_connections
+            metrics["latency_ms_total"] += elapsed_ms
+            metrics["latency_ms_max"] = max(metrics["latency_ms_max"], elapsed_ms)
+            # Every request deposits a fraction of a retry, capping retries at a share of the traffic.
+            self.retry_tokens = min(
+                self.retry_tokens + float(_setting("STUDIO_HTTP_RETRY_BUDGET_RATIO", 0.2)),
+                float(_setting("STUDIO_HTTP_RETRY_BUDGET_MAX", 10)),
+            )
+            self.half_open_probe = False
+            if ok:
+                self.consecutive_failures = 0
+                self.opened_at = None
+                return
+            metrics["errors"] += 1
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= threshold:
+                self.opened_at = time.monotonic()
+
+    def release_probe(self):
+        # An attempt that ended before reaching a verdict on the host (bad URL, cancelled task).
+        with self.lock:
+            self.half_open_probe = False
+
+    def take_retry(self):
+        with self.lock:
+            if self.retry_tokens < 1:
+                return False
+            self.retry_tokens -= 1
+            self.metrics["retries"] += 1
+            return True
+
+    def snapshot(self):
+        with self.lock:
+            metrics = dict(self.metrics)
+            state = "closed" if self.opened_at is None else "open"
+        requests = metrics["requests"]
+        metrics["circuit"] = state
+        metrics["latency_ms_avg"] = round(metrics["latency_ms_total"] / requests, 2) if requests else 0.0
+        metrics["connection_reuse_ratio"] = (
+            round(max(0, requests - metrics["new_connections"]) / requests, 3) if requests else 0.0
+        )
+        metrics["latency_ms_total"] = round(metrics["latency_ms_total"], 2)
+        metrics["latency_ms_max"] = round(metrics["latency_ms_max"], 2)
+        return metrics
+
+
+_hosts = {}
+_hosts_lock = threading.Lock()
+_client = None
+_client_lock = threading.Lock()
+_async_client = None
+_async_client_loop = None
+
+
+def host_state(url):
+    host = urlsplit(url).netloc
+    with _hosts_lock:
+        if host not in _hosts:
+            _hosts[host] = HostState()
+        return _hosts[host]
+
+
+def _limits():
+    max_connections = int(_setting("STUDIO_HTTP_MAX_CONNECTIONS", 50))
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_connections,
+        keepalive_expiry=float(_setting("STUDIO_HTTP_KEEPALIVE_SECONDS", 60)),
+    )
+
+
+def _timeout(timeout):
+    return httpx.Timeout(
+        timeout or float(_setting("STUDIO_HTTP_TIMEOUT", 10)),
+        connect=float(_setting("STUDIO_HTTP_CONNECT_TIMEOUT", 5)),
+    )
+
+
+def get_client():
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = httpx.Client(limits=_limits(), timeout=_timeout(None))
+    return _client
+
+
+def get_async_client():
+    """
+    Async counterpart for the running event loop.
+
+    Under uvicorn there is one loop per worker, so every stream reuses the same keep-alive
+    pool; runserver runs each async request in its own loop and gets a fresh client.
+    """
+    global _async_client, _async_client_loop
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(limits=_limits(), timeout=_timeout(None))
+        _async_client_loop = loop
+    return _async_client
+
+
+class ConnectionTracer:
+    """httpcore trace hook counting TCP connects (requests minus connects = reused connections)."""
+
+    def __init__(self):
+        self.new_connections = 0
+
+    def __call__(self, event_name, info):
+        if event_name == "connection.connect_tcp.started":
+            self.new_connections += 1
+
+    async def async_call(self, event_name, info):
+        self(event_name, info)
+
+
+def _is_failure(response=None, error=None):
+    return error is not None or (response is not None and response.status_code >= 500)
+
+
+def request(method, url, retries=0, timeout=None, **kwargs):
+    """
+    Send a request through the shared pool and return the httpx.Response.
+
+    Transport errors and 502/503/504 are retried up to `retries` times while the host's
+    retry budget allows it; only use retries for idempotent calls. Raises CircuitOpenError
+    while the host is failing.
+    """
+    state = host_state(url)
+    attempt = 0
+    while True:
+        if not state.allow_request():
+            raise CircuitOpenError(f"Circuito abierto para {urlsplit(url).netloc}")
+        tracer = ConnectionTracer()
+        started = time.perf_counter()
+        response = error = None
+        try:
+            response = get_client().request(
+                method, url, timeout=_timeout(timeout), extensions={"trace": tracer}, **kwargs
+            )
+        except httpx.TransportError as exc:
+            error = exc
+        except BaseException:
+            state.release_probe()
+            raise
+        state.record(not _is_failure(response, error), (time.perf_counter() - started) * 1000, tracer.new_connections)
+
+        retryable = error is not None or response.status_code in RETRYABLE_STATUS_CODES
+        if retryable and attempt < retries and state.take_retry():
+            attempt += 1
+            time.sleep(min(0.1 * (2 ** attempt), 1.0) * random.uniform(0.5, 1.0))
+            continue
+        if error is not None:
+            raise error
+        return response
+
+
+def get_json(url, headers=None, timeout=None, retries=1):
+    response = request("GET", url, headers=headers or {}, timeout=timeout, retries=retries)
+    response.raise_for_status()
+    return response.json()
+
+
+def post_json(url, payload, headers=None, timeout=None):
+    response = request("POST", url, json=payload, headers=headers or {}, timeout=timeout)
+    response.raise_for_status()
+    return response.json()
+
+
+class AsyncStream:
+    """`async with AsyncStream("POST", url, json=...) as response:` with breaker and metrics."""
+
+    def __init__(self, method, url, timeout=None, **kwargs):
+        self.method = method
+        self.url = url
+        self.timeout = timeout
+        self.kwargs = kwargs
+        self.state = host_state(url)
+        self.tracer = ConnectionTracer()
+        self._context = None
+        self._response = None
+        self._started = None
+
+    async def __aenter__(self):
+        if not self.state.allow_request():
+            raise CircuitOpenError(f"Circuito abierto para {urlsplit(self.url).netloc}")
+        self._started = time.perf_counter()
+        try:
+            self._context = get_async_client().stream(
+                self.method,
+                self.url,
+                timeout=_timeout(self.timeout),
+                extensions={"trace": self.tracer.async_call},
+                **self.kwargs,
+            )
+            response = await self._context.__aenter__()
+        except httpx.TransportError:
+            self._record(False)
+            raise
+        except BaseException:
+            # e.g. asyncio.CancelledError when the SSE client disconnects while connecting.
+            self.state.release_probe()
+            raise
+        self._response = response
+        return response
+
+    async def __aexit__(self, exc_type, exc, tb):
+        # Provider-level errors (bad payload, error events) do not count against the host.
+        failed = isinstance(exc, httpx.TransportError) or self._response.status_code >= 500
+        self._record(not failed)
+        return await self._context.__aexit__(exc_type, exc, tb)
+
+    def _record(self, ok):
+        self.state.record(ok, (time.perf_counter() - self._started) * 1000, self.tracer.new_connections)
+
+
+def get_http_metrics():
+    with _hosts_lock:
+        hosts = dict(_hosts)
+    return {
+        "pid": os.getpid(),
+        "hosts": {host: state.snapshot() for host, state in sorted(hosts.items())},
+    }
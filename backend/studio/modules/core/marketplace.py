@@ -0,0 +1,113 @@
+"""
+Public marketplace listing.
+
+Each listed organization (active with subscription enabled) has one MarketplaceListing row
+holding everything the anonymous marketplace endpoint shows, so a page is one indexed query
+on a narrow table instead of full organization rows plus their establishments. Writes to
+organizations and establishments refresh the affected row and bump a version stamp that
+drives the endpoint's ETag and response cache.
+"""
+
+import time
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .media import media_url
+from .models import Establishment, MarketplaceListing, Organization
+
+MARKETPLACE_VERSION_KEY = "studio:marketplace-version"
+
+
+def _time_value(value):
+    return value.isoformat() if value else None
+
+
+def listing_values(organization, establishments, logo=""):
+    """Listing fields for an organization and its active establishments."""
+    cities = {(organization.fiscal_city or "").strip().lower()}
+    cities.update((establishment.city or "").strip().lower() for establishment in establishments)
+    cities.discard("")
+    return {
+        "name": organization.name,
+        "city": organization.fiscal_city or "",
+        "address": organization.address or "",
+        "subscription_plan": organization.subscription_plan or "",
+        "logo": logo,
+        "establishments": [
+            {
+                "id": establishment.id,
+                "name": establishment.name,
+                "address": establishment.address or "",
+                "city": establishment.city or "",
+                "open_time": _time_value(establishment.open_time),
+                "close_time": _time_value(establishment.close_time),
+                "weekly_hours": establishment.weekly_hours,
+            }
+            for establishment in establishments
+        ],
+        "search_cities": f"|{'|'.join(sorted(cities))}|" if cities else "",
+    }
+
+
+def refresh_marketplace_listing(organization_id):
+    organization = Organization.objects.filter(id=organization_id, is_active=True, subscription_enabled=True).first()
+    if organization is None:
+        MarketplaceListing.objects.filter(organization_id=organization_id).delete()
+        return None
+    establishments = list(
+        Establishment.objects.filter(organization_id=organization_id, is_active=True).order_by("name")
+    )
+    listing, _created = MarketplaceListing.objects.update_or_create(
+        organization_id=organization_id,
+        defaults=listing_values(organization, establishments, logo=organization.logo_thumbnail.name or ""),
+    )
+    return listing
+
+
+def rebuild_marketplace_listings():
+    """Rebuild every listing from scratch; returns the number of listed organizations."""
+    with transaction.atomic():
+        listed_ids = list(
+            Organization.objects.filter(is_active=True, subscription_enabled=True).values_list("id", flat=True)
+        )
+        MarketplaceListing.objects.exclude(organization_id__in=listed_ids).delete()
+        for organization_id in listed_ids:
+            refresh_marketplace_listing(organization_id)
+        bump_marketplace_version()
+    return len(listed_ids)
+
+
+def get_marketplace_version():
+    """(token, unix timestamp of the last change) identifying the current marketplace content."""
+    version = cache.get(MARKETPLACE_VERSION_KEY)
+    if version is None:
+        cache.add(MARKETPLACE_VERSION_KEY, (uuid.uuid4().hex, int(time.time())), None)
+        version = cache.get(MARKETPLACE_VERSION_KEY)
+    return version
+
+
+def bump_marketplace_version():
+    transaction.on_commit(
+        lambda: cache.set(MARKETPLACE_VERSION_KEY, (uuid.uuid4().hex, int(time.time())), None)
+    )
+
+
+def invalidate_marketplace(organization_id=None):
+    """Refresh the organization's listing (if given) after commit and publish a new version."""
+    if organization_id:
+        transaction.on_commit(lambda: refresh_marketplace_listing(organization_id))
+    bump_marketplace_version()
+
+
+def serialize_listing(listing, request=None):
+    return {
+        "id": listing.organization_id,
+        "name": listing.name,
+        "logo": media_url(listing.logo, request),
+        "subscription_plan": listing.subscription_plan,
+        "city": listing.city,
+        "address": listing.address,
+        "establishments": listing.establishments,
+    }
@@ -0,0 +1,170 @@
+"""
+Organization logos as files in the default storage.
+
+Names carry a hash of the content (logos/<org>/<digest>.<ext> plus a PNG thumbnail), so a
+URL never changes meaning and can be cached by browsers indefinitely; a new logo gets a
+new URL. SVG is not accepted: it can carry scripts that run on the API origin.
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.http import FileResponse, Http404
+from django.views.static import serve
+from PIL import Image, UnidentifiedImageError
+
+LOGO_DATA_URL_RE = re.compile(r"^data:(?P<mime>[\w/+.-]+);base64,(?P<data>.*)$", re.IGNORECASE | re.DOTALL)
+LOGO_EXTENSIONS = {
+    "image/png": "png",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+    "image/webp": "webp",
+    "image/gif": "gif",
+}
+PIL_EXTENSIONS = {"PNG": "png", "JPEG": "jpg", "WEBP": "webp", "GIF": "gif"}
+CONTENT_TYPES = {"png": "image/png", "jpg": "image/jpeg", "webp": "image/webp", "gif": "image/gif"}
+# Names written by store_logo_files; the only media path Django serves in production.
+LOGO_PATH_PATTERN = r"logos/\d+/[0-9a-f]{20}(?:-thumb)?\.(?:png|jpg|webp|gif)"
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LOGO_FORMAT_ERROR = "El logo debe ser una imagen PNG, JPG, WEBP o GIF"
+
+
+def decode_logo(value):
+    """(content, extension) from a base64 data URL (or bare base64); raises ValueError."""
+    value = (value or "").strip()
+    match = LOGO_DATA_URL_RE.match(value)
+    mime = match.group("mime").lower() if match else None
+    if mime and mime not in LOGO_EXTENSIONS:
+        raise ValueError(LOGO_FORMAT_ERROR)
+    try:
+        content = base64.b64decode(match.group("data") if match else value, validate=False)
+    except (binascii.Error, ValueError):
+        raise ValueError("El logo no es una imagen base64 valida")
+    if not content:
+        raise ValueError("El logo no es una imagen base64 valida")
+    if len(content) > int(getattr(settings, "STUDIO_LOGO_MAX_BYTES", 2_000_000)):
+        raise ValueError("El logo es muy grande. Usa una imagen mas liviana.")
+
+    try:
+        with Image.open(io.BytesIO(content)) as image:
+            image_format = image.format
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError):
+        raise ValueError("El logo debe ser una imagen valida")
+    if image_format not in PIL_EXTENSIONS:
+        raise ValueError(LOGO_FORMAT_ERROR)
+    return content, PIL_EXTENSIONS[image_format]
+
+
+def build_thumbnail(content, extension):
+    """PNG bytes fitting STUDIO_LOGO_THUMBNAIL_SIZE."""
+    size = int(getattr(settings, "STUDIO_LOGO_THUMBNAIL_SIZE", 256))
+    with Image.open(io.BytesIO(content)) as image:
+        image = image.convert("RGBA")
+        image.thumbnail((size, size))
+        output = io.BytesIO()
+        image.save(output, format="PNG", optimize=True)
+    return output.getvalue()
+
+
+def _save_once(name, content):
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+
+
+def _thumbnail_name(logo_name):
+    return f"{logo_name.rsplit('.', 1)[0]}-thumb.png"
+
+
+def store_logo_files(organization_id, content, extension):
+    """Write the logo and its thumbnail under content-hashed names; returns (logo, thumbnail) names."""
+    digest = hashlib.sha256(content).hexdigest()[:20]
+    logo_name = f"logos/{organization_id}/{digest}.{extension}"
+    _save_once(logo_name, content)
+    thumbnail_name = _thumbnail_name(logo_name)
+    _save_once(thumbnail_name, build_thumbnail(content, extension))
+    return logo_name, thumbnail_name
+
+
+def backfill_logo_thumbnail(organization):
+    """
+    Generate the missing thumbnail of a stored logo (logos moved by migration 0034 have none).
+
+    Saves the organization, which refreshes its marketplace listing; raises ValueError when the
+    stored file is not a readable image.
+    """
+    name = organization.logo.name
+    with default_storage.open(name, "rb") as logo_file:
+        content = logo_file.read()
+    try:
+        thumbnail = build_thumbnail(content, name.rsplit(".", 1)[-1])
+    except (UnidentifiedImageError, OSError) as exc:
+        raise ValueError(f"No se pudo leer {name}: {exc}")
+    thumbnail_name = _thumbnail_name(name)
+    _save_once(thumbnail_name, thumbnail)
+    organization.logo_thumbnail = thumbnail_name
+    organization.save(update_fields=["logo_thumbnail"])
+    return thumbnail_name
+
+
+def set_organization_logo(organization, decoded):
+    """
+    Replace (decoded is (content, extension)) or clear (decoded is None) an organization's logo.
+
+    Saves the organization; the previous files are removed once the transaction commits.
+    """
+    previous = {organization.logo.name, organization.logo_thumbnail.name} - {""}
+    if decoded is None:
+        logo_name = thumbnail_name = ""
+    else:
+        logo_name, thumbnail_name = store_logo_files(organization.id, *decoded)
+    organization.logo = logo_name
+    organization.logo_thumbnail = thumbnail_name
+    organization.save(update_fields=["logo", "logo_thumbnail"])
+
+    stale = previous - {logo_name, thumbnail_name}
+    if stale:
+        transaction.on_commit(lambda: [default_storage.delete(name) for name in stale])
+
+
+def media_url(name, request=None):
+    if not name:
+        return ""
+    url = default_storage.url(name)
+    # The SPA lives on another origin, so relative media URLs must point at the API host.
+    if request is not None and url.startswith("/"):
+        return request.build_absolute_uri(url)
+    return url
+
+
+def serve_logo(request, path):
+    """Content-hashed logo files from the default storage, in any environment."""
+    if not default_storage.exists(path):
+        raise Http404("Logo no encontrado")
+    response = FileResponse(
+        default_storage.open(path, "rb"),
+        content_type=CONTENT_TYPES[path.rsplit(".", 1)[-1]],
+    )
+    response["X-Content-Type-Options"] = "nosniff"
+    response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
+
+
+def serve_media(request, path):
+    """Serves MEDIA_ROOT in development (DEBUG only); content-hashed logos are cached for a year."""
+    response = serve(request, path, document_root=settings.MEDIA_ROOT)
+    response["X-Content-Type-Options"] = "nosniff"
+    if path.lower().endswith(".svg"):
+        # SVG logos stored before uploads were restricted: never render them as a document.
+        response["Content-Disposition"] = "attachment"
+        response["Content-Security-Policy"] = "sandbox"
+    if path.startswith("logos/"):
+        response["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    return response
@@ -63,7 +63,9 @@ class Organization(models.Model):
     )
 
     name = models.CharField(max_length=150, unique=True)
-    logo = models.TextField(blank=True)
+    # Storage names (see core/media.py); the API exposes them as URLs.
+    logo = models.FileField(max_length=255, blank=True)
+    logo_thumbnail = models.FileField(max_length=255, blank=True)
     legal_name = models.CharField(max_length=200, blank=True)
     tax_id = models.CharField(max_length=30, blank=True)
     address = models.CharField(max_length=250, blank=True)
@@ -154,6 +156,29 @@ class Room(models.Model):
         return f"{self.establishment.name} - {self.name}"
 
 
+class MarketplaceListing(models.Model):
+    """Public marketplace row per listed organization, rebuilt by core/marketplace.py on every source write."""
+
+    organization = models.OneToOneField(Organization, on_delete=models.CASCADE, related_name="marketplace_listing")
+    name = models.CharField(max_length=150)
+    city = models.CharField(max_length=120, blank=True)
+    address = models.CharField(max_length=250, blank=True)
+    subscription_plan = models.CharField(max_length=80, blank=True)
+    # Storage name of the organization's logo thumbnail.
+    logo = models.CharField(max_length=255, blank=True)
+    establishments = models.JSONField(default=list, blank=True)
+    # Lowercased organization and establishment cities, "|"-separated, for the city filter.
+    search_cities = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ("name", "id")
+        indexes = [models.Index(fields=["name", "id"], name="marketplace_name_idx")]
+
+    def __str__(self):
+        return self.name
+
+
 class OrganizationMembership(models.Model):
     ROLE_OWNER = "owner"
     ROLE_MANAGER = "manager"
@@ -0,0 +1,135 @@
+import base64
+import json
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def parse_page_size(value):
+    """Requested page size clamped to 1..STUDIO_MAX_PAGE_SIZE (STUDIO_PAGE_SIZE when missing or invalid)."""
+    default_size = int(getattr(settings, "STUDIO_PAGE_SIZE", 100))
+    max_size = int(getattr(settings, "STUDIO_MAX_PAGE_SIZE", 500))
+    try:
+        page_size = int(value or default_size)
+    except (TypeError, ValueError):
+        page_size = default_size
+    return max(1, min(page_size, max_size))
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset pagination over the view's `keyset_ordering` (e.g. ("start_at", "id")).
+
+    Lists stay unpaginated unless the client sends `cursor` or `page_size`, so existing
+    callers keep receiving plain arrays. Each page is fetched with a composite
+    "after (value, id)" filter instead of OFFSET, keeping latency flat on large tables.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    invalid_cursor_message = "Cursor invalido"
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        return parse_page_size(request.query_params.get(self.page_size_query_param))
+
+    def get_ordering(self, queryset, view):
+        ordering = getattr(view, "keyset_ordering", None) or queryset.model._meta.ordering or ("pk",)
+        ordering = tuple(ordering)
+        if ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering = ordering + ("id",)
+        return ordering
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset, view)
+        self.base_url = request.build_absolute_uri()
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._build_after_filter(position))
+
+        rows = list(queryset[: self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_position = [self._get_value(rows[-1], field) for field in self.ordering] if self.has_next else None
+        return rows
+
+    def _build_after_filter(self, position):
+        # (a, b, c) > (x, y, z)  ==  a > x OR (a = x AND b > y) OR (a = x AND b = y AND c > z)
+        condition = Q()
+        equal_prefix = {}
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= Q(**equal_prefix, **{f"{name}__{lookup}": value})
+            equal_prefix[name] = value
+        return condition
+
+    def _get_value(self, instance, field):
+        name = field.lstrip("-")
+        value = getattr(instance, "pk" if name == "pk" else name)
+        return value.isoformat() if hasattr(value, "isoformat") else value
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw_values = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")).decode("utf-8"))
+            if not isinstance(raw_values, list) or len(raw_values) != len(self.ordering):
+                raise ValueError
+            position = []
+            for field, raw_value in zip(self.ordering, raw_values):
+                name = field.lstrip("-")
+                model_field = model._meta.pk if name == "pk" else model._meta.get_field(name)
+                position.append(model_field.to_python(raw_value))
+            return position
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, position):
+        encoded = base64.urlsafe_b64encode(json.dumps(position).encode("utf-8")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict(
+                [
+                    ("next", self.get_next_link()),
+                    ("first", remove_query_param(self.base_url, self.cursor_query_param)),
+                    ("page_size", self.page_size),
+                    ("results", data),
+                ]
+            )
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "first": {"type": "string", "format": "uri"},
+                "page_size": {"type": "integer"},
+                "results": schema,
+            },
+        }
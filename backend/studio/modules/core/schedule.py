@@ -0,0 +1,33 @@
+"""Opening hours of an establishment, as configured in Establishment.weekly_hours."""
+
+from datetime import time
+
+WEEKDAY_KEYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _parse_time(value):
+    try:
+        return time.fromisoformat(str(value or "").strip()[:5])
+    except ValueError:
+        return None
+
+
+def get_establishment_windows(establishment):
+    """Opening windows per weekday key; None when the establishment has no schedule configured."""
+    windows = {}
+    for key, row in (establishment.weekly_hours or {}).items():
+        if not isinstance(row, dict) or not row.get("enabled"):
+            continue
+        day_windows = []
+        for prefix in ("morning", "afternoon"):
+            opens = _parse_time(row.get(f"{prefix}_start"))
+            closes = _parse_time(row.get(f"{prefix}_end"))
+            if opens and closes and opens < closes:
+                day_windows.append((opens, closes))
+        windows[key] = day_windows
+    if windows:
+        return windows
+    # Same fallback as the frontend: legacy open/close time applies to every day.
+    if establishment.open_time and establishment.close_time:
+        return {key: [(establishment.open_time, establishment.close_time)] for key in WEEKDAY_KEYS}
+    return None
@@ -3,8 +3,42 @@ from rest_framework import serializers
 
 from studio.models import Establishment, Organization, Room
 
+from .media import decode_logo, media_url, set_organization_logo
+
+LOGO_UNCHANGED = object()
+
+
+class LogoField(serializers.Field):
+    """
+    Reads as the file URL. Accepts a base64 data URL (new logo), "" (remove it) or the
+    URL it returned (left unchanged, so edit forms can send the logo back as they got it).
+    """
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("required", False)
+        kwargs.setdefault("allow_null", True)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return media_url(value.name if value else "", self.context.get("request"))
+
+    def to_internal_value(self, data):
+        if data in (None, ""):
+            return None
+        if not isinstance(data, str):
+            raise serializers.ValidationError("El logo debe ser una imagen en base64")
+        if data.startswith(("http://", "https://", "/")):
+            return LOGO_UNCHANGED
+        try:
+            return decode_logo(data)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc))
+
 
 class OrganizationSerializer(serializers.ModelSerializer):
+    logo = LogoField()
+    logo_thumbnail = LogoField(read_only=True)
+
     def validate(self, attrs):
         errors = {}
         creating = self.instance is None
@@ -83,12 +117,27 @@ class OrganizationSerializer(serializers.ModelSerializer):
 
         return attrs
 
+    def create(self, validated_data):
+        logo = validated_data.pop("logo", LOGO_UNCHANGED)
+        organization = super().create(validated_data)
+        if logo is not LOGO_UNCHANGED and logo is not None:
+            set_organization_logo(organization, logo)
+        return organization
+
+    def update(self, instance, validated_data):
+        logo = validated_data.pop("logo", LOGO_UNCHANGED)
+        organization = super().update(instance, validated_data)
+        if logo is not LOGO_UNCHANGED:
+            set_organization_logo(organization, logo)
+        return organization
+
     class Meta:
         model = Organization
         fields = (
             "id",
             "name",
             "logo",
+            "logo_thumbnail",
             "legal_name",
             "tax_id",
             "address",
@@ -138,11 +187,16 @@ class OrganizationSerializer(serializers.ModelSerializer):
 
 
 class OrganizationListSerializer(serializers.ModelSerializer):
+    logo = LogoField(read_only=True)
+    logo_thumbnail = LogoField(read_only=True)
+
     class Meta:
         model = Organization
         fields = (
             "id",
             "name",
+            "logo",
+            "logo_thumbnail",
             "legal_name",
             "tax_id",
             "address",
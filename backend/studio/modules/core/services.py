@@ -0,0 +1,77 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from studio.modules.users.services import is_owner, is_platform_admin
+
+from .cache import is_shared_cache
+from .models import Organization, OrganizationMembership
+
+OWNED_ORG_IDS_VERSION_KEY = "studio:owned-org-ids-version:{user_id}"
+OWNED_ORG_IDS_KEY = "studio:owned-org-ids:{user_id}:v{version}"
+_OWNED_ORG_IDS_ATTR = "_studio_owned_org_ids"
+_AUTHORIZED_ORG_IDS_ATTR = "_studio_authorized_org_ids"
+
+
+def _get_tenancy_cache_timeout():
+    # A removed owner must lose access in every worker; a process-local cache keeps only the per-request copy.
+    if not is_shared_cache():
+        return 0
+    return int(getattr(settings, "STUDIO_TENANCY_CACHE_TIMEOUT", 0) or 0)
+
+
+def _get_owned_org_ids_version(user_id):
+    version_key = OWNED_ORG_IDS_VERSION_KEY.format(user_id=user_id)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    return version
+
+
+def get_owned_org_ids(user):
+    if not user or not getattr(user, "is_authenticated", False) or not user.pk:
+        return []
+
+    org_ids = getattr(user, _OWNED_ORG_IDS_ATTR, None)
+    if org_ids is None:
+        timeout = _get_tenancy_cache_timeout()
+        cache_key = None
+        if timeout:
+            cache_key = OWNED_ORG_IDS_KEY.format(user_id=user.pk, version=_get_owned_org_ids_version(user.pk))
+            org_ids = cache.get(cache_key)
+        if org_ids is None:
+            org_ids = tuple(
+                OrganizationMembership.objects.filter(user_id=user.pk, is_active=True)
+                .order_by("id")
+                .values_list("organization_id", flat=True)
+            )
+            if cache_key:
+                cache.set(cache_key, org_ids, timeout)
+        setattr(user, _OWNED_ORG_IDS_ATTR, tuple(org_ids))
+        org_ids = getattr(user, _OWNED_ORG_IDS_ATTR)
+    return list(org_ids)
+
+
+def get_authorized_org_ids(user):
+    if is_platform_admin(user):
+        org_ids = getattr(user, _AUTHORIZED_ORG_IDS_ATTR, None)
+        if org_ids is None:
+            org_ids = tuple(Organization.objects.values_list("id", flat=True))
+            setattr(user, _AUTHORIZED_ORG_IDS_ATTR, org_ids)
+        return list(org_ids)
+    if is_owner(user):
+        return get_owned_org_ids(user)
+    return []
+
+
+def invalidate_owned_org_ids(user_id, user=None):
+    # Bumping the version orphans every cached set for the user; entries then expire on their own.
+    if user is not None and hasattr(user, _OWNED_ORG_IDS_ATTR):
+        delattr(user, _OWNED_ORG_IDS_ATTR)
+    if user_id:
+        version_key = OWNED_ORG_IDS_VERSION_KEY.format(user_id=user_id)
+        # After commit, so no reader can cache the pre-commit memberships under the new stamp.
+        transaction.on_commit(lambda: cache.set(version_key, uuid.uuid4().hex, None))
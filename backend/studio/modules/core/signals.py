@@ -0,0 +1,89 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from studio.models import (
+    ClassBooking,
+    Invoice,
+    InstructorProfile,
+    MembershipPlan,
+    Payment,
+    SocialAccount,
+    SocialCampaign,
+    SocialPost,
+    Student,
+    StudentHistory,
+    StudioClass,
+)
+
+from .conditional import bump_data_versions
+from .marketplace import invalidate_marketplace
+from .models import Establishment, Organization, OrganizationMembership, Room
+from .services import invalidate_owned_org_ids
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=OrganizationMembership, dispatch_uid="studio_membership_saved")
+@receiver(post_delete, sender=OrganizationMembership, dispatch_uid="studio_membership_deleted")
+def invalidate_owned_orgs_on_membership_change(sender, instance, **kwargs):
+    cached_user = instance._state.fields_cache.get("user")
+    invalidate_owned_org_ids(instance.user_id, user=cached_user)
+
+
+@receiver(post_save, sender=Organization, dispatch_uid="studio_marketplace_organization_saved")
+@receiver(post_delete, sender=Organization, dispatch_uid="studio_marketplace_organization_deleted")
+def refresh_marketplace_on_organization_change(sender, instance, **kwargs):
+    invalidate_marketplace(instance.id)
+
+
+@receiver(post_save, sender=Establishment, dispatch_uid="studio_marketplace_establishment_saved")
+@receiver(post_delete, sender=Establishment, dispatch_uid="studio_marketplace_establishment_deleted")
+def refresh_marketplace_on_establishment_change(sender, instance, **kwargs):
+    invalidate_marketplace(instance.organization_id)
+
+
+# Conditional GET scopes fed by each model, with how to reach the organization id.
+# Bulk writers call bump_data_versions themselves (bulk_create sends no signals).
+DATA_VERSION_SOURCES = {
+    Organization: (("organizations",), lambda instance: instance.id),
+    Establishment: (("organizations",), lambda instance: instance.organization_id),
+    Room: (("organizations",), lambda instance: instance.establishment.organization_id),
+    StudioClass: (("classes",), lambda instance: instance.organization_id),
+    ClassBooking: (("bookings", "classes"), lambda instance: instance.organization_id),
+    InstructorProfile: (("instructors",), lambda instance: instance.organization_id),
+    Student: (("students",), lambda instance: instance.organization_id),
+    StudentHistory: (("students",), lambda instance: instance.student.organization_id),
+    Payment: (("payments",), lambda instance: instance.organization_id),
+    Invoice: (("payments",), lambda instance: instance.organization_id),
+    MembershipPlan: (("payments",), lambda instance: instance.organization_id),
+    SocialAccount: (("social",), lambda instance: instance.organization_id),
+    SocialPost: (("social",), lambda instance: instance.organization_id),
+    SocialCampaign: (("social",), lambda instance: instance.organization_id),
+    User: (("users",), lambda instance: None),
+}
+
+
+def _bump_data_versions(sender, instance, **kwargs):
+    scopes, get_organization_id = DATA_VERSION_SOURCES[sender]
+    try:
+        organization_id = get_organization_id(instance)
+    except ObjectDoesNotExist:
+        # Parent already gone (cascade delete): the parent's own signal bumps its organization.
+        organization_id = None
+    bump_data_versions(organization_id, *scopes)
+
+
+for _model in DATA_VERSION_SOURCES:
+    post_save.connect(_bump_data_versions, sender=_model, dispatch_uid=f"studio_data_version_saved_{_model.__name__}")
+    post_delete.connect(
+        _bump_data_versions, sender=_model, dispatch_uid=f"studio_data_version_deleted_{_model.__name__}"
+    )
+
+
+@receiver(m2m_changed, sender=Student.establishments.through, dispatch_uid="studio_data_version_student_establishments")
+def bump_students_on_establishments_change(sender, instance, action, **kwargs):
+    # instance is the student, or the establishment on the reverse side; both carry organization_id.
+    if action.startswith("post_"):
+        bump_data_versions(instance.organization_id, "students")
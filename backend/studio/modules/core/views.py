@@ -8,12 +8,7 @@ from studio.models import Establishment, Organization, OrganizationMembership, R
 from studio.modules.users.services import is_owner, is_platform_admin
 
 from .serializers import EstablishmentSerializer, OrganizationListSerializer, OrganizationSerializer, RoomSerializer
-
-
-def get_owned_org_ids(user):
-    return list(
-        OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-    )
+from .services import get_owned_org_ids
 
 
 class OrganizationViewSet(viewsets.ModelViewSet):
@@ -32,8 +27,6 @@ class OrganizationViewSet(viewsets.ModelViewSet):
         queryset = super().get_queryset()
 
         if is_platform_admin(user):
-            if self.action == "list":
-                return queryset.defer("logo")
             return queryset
 
         if is_owner(user):
@@ -0,0 +1,46 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from studio.modules.jobs.services import enqueue_job, register_job
+
+from .snapshots import refresh_snapshot, snapshot_scope
+
+REFRESH_SNAPSHOT_JOB = "dashboard.refresh_snapshot"
+REFRESH_PENDING_KEY = "studio:dashboard-refresh-pending:{scope}"
+
+
+@register_job(REFRESH_SNAPSHOT_JOB, max_attempts=3)
+def refresh_snapshot_job(payload, job):
+    snapshot = refresh_snapshot(payload.get("organization_id"))
+    return {"snapshot_id": snapshot.id if snapshot else None}
+
+
+def _enqueue_refresh(organization_id):
+    delay = max(1, int(getattr(settings, "STUDIO_DASHBOARD_REFRESH_DELAY", 30)))
+    scope = snapshot_scope(organization_id)
+    # One pending refresh per scope and window: a burst of writes costs a single recompute.
+    # The job is not linked to the organization row, which may be the one being deleted.
+    if not cache.add(REFRESH_PENDING_KEY.format(scope=scope), True, delay):
+        return None
+    return enqueue_job(
+        REFRESH_SNAPSHOT_JOB,
+        {"organization_id": organization_id},
+        idempotency_key=f"{REFRESH_SNAPSHOT_JOB}:{scope}:{int(time.time() // delay)}",
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def schedule_snapshot_refresh(organization_id=None):
+    """After commit, queue a delayed refresh of the organization's snapshot and the platform one."""
+
+    def enqueue():
+        if organization_id:
+            _enqueue_refresh(organization_id)
+        _enqueue_refresh(None)
+
+    transaction.on_commit(enqueue)
@@ -1,12 +1,25 @@
 ﻿from django.db import models
+from django.utils import timezone
+
+from studio.modules.core.models import Organization
 
 
 class DashboardSnapshot(models.Model):
-    generated_at = models.DateTimeField(auto_now_add=True)
+    """Latest dashboard KPIs per organization (organization null: platform-wide), see dashboard/snapshots.py."""
+
+    scope = models.CharField(max_length=40, unique=True)
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name="dashboard_snapshots",
+    )
+    generated_at = models.DateTimeField(default=timezone.now)
     payload = models.JSONField(default=dict, blank=True)
 
     class Meta:
         ordering = ("-generated_at",)
 
     def __str__(self):
-        return f"DashboardSnapshot<{self.generated_at.isoformat()}>"
+        return f"DashboardSnapshot<{self.scope} {self.generated_at.isoformat()}>"
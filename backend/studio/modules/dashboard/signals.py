@@ -0,0 +1,49 @@
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import post_delete, post_save
+
+from studio.models import (
+    Establishment,
+    InstructorProfile,
+    InstructorSettlement,
+    Organization,
+    Payment,
+    Room,
+    Student,
+    StudioClass,
+)
+
+from .jobs import schedule_snapshot_refresh
+
+User = get_user_model()
+
+# Models feeding the dashboard KPIs, with how to reach the organization id (None: platform only).
+# Bulk writers call schedule_snapshot_refresh themselves (bulk_create sends no signals).
+SNAPSHOT_SOURCES = {
+    Organization: lambda instance: instance.id,
+    Establishment: lambda instance: instance.organization_id,
+    Room: lambda instance: instance.establishment.organization_id,
+    Student: lambda instance: instance.organization_id,
+    InstructorProfile: lambda instance: instance.organization_id,
+    StudioClass: lambda instance: instance.organization_id,
+    Payment: lambda instance: instance.organization_id,
+    InstructorSettlement: lambda instance: instance.organization_id,
+    User: lambda instance: None,
+}
+
+
+def _schedule_snapshot_refresh(sender, instance, **kwargs):
+    try:
+        organization_id = SNAPSHOT_SOURCES[sender](instance)
+    except ObjectDoesNotExist:
+        organization_id = None
+    schedule_snapshot_refresh(organization_id)
+
+
+for _model in SNAPSHOT_SOURCES:
+    post_save.connect(
+        _schedule_snapshot_refresh, sender=_model, dispatch_uid=f"studio_dashboard_snapshot_saved_{_model.__name__}"
+    )
+    post_delete.connect(
+        _schedule_snapshot_refresh, sender=_model, dispatch_uid=f"studio_dashboard_snapshot_deleted_{_model.__name__}"
+    )
@@ -0,0 +1,231 @@
+"""
+Precomputed dashboard KPIs.
+
+Each organization has one DashboardSnapshot row and the platform has another (organization
+null) with counts, this week's occupancy, this month's revenue by status and pending
+instructor costs. Writes to the source models schedule a debounced refresh (dashboard/jobs.py)
+and the refresh_dashboard_snapshots command rebuilds every row periodically, so
+dashboard_summary reads one row per visible scope instead of counting live tables.
+"""
+
+from datetime import datetime, time, timedelta
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from studio.models import (
+    Establishment,
+    InstructorProfile,
+    InstructorSettlement,
+    Organization,
+    Payment,
+    Room,
+    Student,
+    StudioClass,
+)
+from studio.modules.core.schedule import get_establishment_windows
+
+from .models import DashboardSnapshot
+
+User = get_user_model()
+
+PLATFORM_SCOPE = "platform"
+
+
+def snapshot_scope(organization_id=None):
+    return f"organization:{organization_id}" if organization_id else PLATFORM_SCOPE
+
+
+def _hours(duration):
+    return round(duration.total_seconds() / 3600, 2) if duration else 0.0
+
+
+def _period_bounds(today):
+    current_tz = timezone.get_current_timezone()
+    week_start = today - timedelta(days=today.weekday())
+    month_start = today.replace(day=1)
+    next_month = (month_start + timedelta(days=32)).replace(day=1)
+    return {
+        "week_start": week_start,
+        "week_from": timezone.make_aware(datetime.combine(week_start, time.min), current_tz),
+        "week_to": timezone.make_aware(datetime.combine(week_start + timedelta(days=7), time.min), current_tz),
+        "month_from": timezone.make_aware(datetime.combine(month_start, time.min), current_tz),
+        "month_to": timezone.make_aware(datetime.combine(next_month, time.min), current_tz),
+    }
+
+
+def _weekly_room_hours(establishments):
+    """Open room-hours per week; establishments without a schedule are left out of the ratio."""
+    total = 0.0
+    for establishment in establishments:
+        windows = get_establishment_windows(establishment)
+        if not windows or not establishment.open_rooms:
+            continue
+        week_hours = sum(
+            (datetime.combine(datetime.min, closes) - datetime.combine(datetime.min, opens)).total_seconds() / 3600
+            for day_windows in windows.values()
+            for opens, closes in day_windows
+        )
+        total += week_hours * establishment.open_rooms
+    return round(total, 2)
+
+
+def _weekly_occupancy(organization_filter, bounds):
+    classes = StudioClass.objects.filter(
+        **organization_filter,
+        start_at__gte=bounds["week_from"],
+        start_at__lt=bounds["week_to"],
+    ).exclude(status=StudioClass.STATUS_CANCELED)
+    duration = ExpressionWrapper(F("end_at") - F("start_at"), output_field=DurationField())
+    totals = classes.aggregate(classes=Count("id"), seats=Sum("capacity"), class_time=Sum(duration))
+    room_time = classes.filter(room__isnull=False).aggregate(room_time=Sum(duration))["room_time"]
+
+    establishments = (
+        Establishment.objects.filter(**organization_filter, is_active=True)
+        .only("id", "weekly_hours", "open_time", "close_time")
+        .annotate(open_rooms=Count("rooms", filter=Q(rooms__is_active=True, rooms__is_blocked=False)))
+    )
+    return {
+        "week_start": bounds["week_start"].isoformat(),
+        "classes": totals["classes"],
+        "seats": totals["seats"] or 0,
+        "class_hours": _hours(totals["class_time"]),
+        "room_hours_booked": _hours(room_time),
+        "room_hours_available": _weekly_room_hours(establishments),
+    }
+
+
+def _money(value):
+    return str(Decimal(value or 0).quantize(Decimal("0.01")))
+
+
+def _amounts_by_currency(rows):
+    return {row["currency"]: _money(row["amount"]) for row in rows}
+
+
+def _revenue_by_status(organization_filter, bounds):
+    rows = (
+        Payment.objects.filter(
+            **organization_filter,
+            created_at__gte=bounds["month_from"],
+            created_at__lt=bounds["month_to"],
+        )
+        .values("status", "currency")
+        .annotate(count=Count("id"), amount=Sum("amount"))
+        .order_by("status", "currency")
+    )
+    revenue = {}
+    for row in rows:
+        entry = revenue.setdefault(row["status"], {"count": 0, "amounts": {}})
+        entry["count"] += row["count"]
+        entry["amounts"][row["currency"]] = _money(row["amount"])
+    return revenue
+
+
+def _pending_instructor_costs(organization_filter):
+    rows = list(
+        InstructorSettlement.objects.filter(**organization_filter, status=InstructorSettlement.STATUS_PENDING)
+        .values("currency")
+        .annotate(count=Count("id"), amount=Sum("amount"))
+        .order_by("currency")
+    )
+    return {"count": sum(row["count"] for row in rows), "amounts": _amounts_by_currency(rows)}
+
+
+def build_snapshot_payload(organization_id=None):
+    """KPIs for one organization, or platform-wide when organization_id is None."""
+    organization_filter = {"organization_id": organization_id} if organization_id else {}
+    bounds = _period_bounds(timezone.localdate())
+    rooms = Room.objects.all()
+    if organization_id:
+        rooms = rooms.filter(establishment__organization_id=organization_id)
+
+    payload = {
+        "organizations": 1 if organization_id else Organization.objects.count(),
+        "establishments": Establishment.objects.filter(**organization_filter).count(),
+        "rooms": rooms.count(),
+        "students": Student.objects.filter(**organization_filter).count(),
+        "instructors": InstructorProfile.objects.filter(**organization_filter, is_active=True).count(),
+        "weekly_occupancy": _weekly_occupancy(organization_filter, bounds),
+        "revenue_month": bounds["month_from"].date().isoformat()[:7],
+        "revenue_by_status": _revenue_by_status(organization_filter, bounds),
+        "pending_instructor_costs": _pending_instructor_costs(organization_filter),
+    }
+    if not organization_id:
+        payload["users"] = User.objects.count()
+    return payload
+
+
+def refresh_snapshot(organization_id=None):
+    """Recompute and store one scope's snapshot; returns it (None if the organization is gone)."""
+    scope = snapshot_scope(organization_id)
+    if organization_id and not Organization.objects.filter(id=organization_id).exists():
+        DashboardSnapshot.objects.filter(scope=scope).delete()
+        return None
+    snapshot, _created = DashboardSnapshot.objects.update_or_create(
+        scope=scope,
+        defaults={
+            "organization_id": organization_id,
+            "payload": build_snapshot_payload(organization_id),
+            "generated_at": timezone.now(),
+        },
+    )
+    return snapshot
+
+
+def rebuild_snapshots(organization_ids=None):
+    """Refresh the given organizations (default: all) and the platform row; returns how many rows."""
+    if organization_ids is None:
+        organization_ids = list(Organization.objects.order_by("id").values_list("id", flat=True))
+    for organization_id in organization_ids:
+        refresh_snapshot(organization_id)
+    refresh_snapshot(None)
+    return len(organization_ids) + 1
+
+
+def is_stale(snapshot):
+    max_age = int(getattr(settings, "STUDIO_DASHBOARD_SNAPSHOT_MAX_AGE", 900))
+    week_start = _period_bounds(timezone.localdate())["week_start"].isoformat()
+    return (
+        timezone.now() - snapshot.generated_at > timedelta(seconds=max_age)
+        or snapshot.payload.get("weekly_occupancy", {}).get("week_start") != week_start
+    )
+
+
+def _merge(total, payload):
+    for key, value in payload.items():
+        if isinstance(value, dict):
+            _merge(total.setdefault(key, {}), value)
+        elif isinstance(value, bool) or key not in total:
+            total[key] = value
+        elif isinstance(value, (int, float)):
+            total[key] = round(total[key] + value, 2)
+        elif key in ("week_start", "revenue_month"):
+            continue
+        else:
+            try:
+                total[key] = _money(Decimal(total[key]) + Decimal(value))
+            except (InvalidOperation, TypeError):
+                continue
+    return total
+
+
+def merge_payloads(payloads):
+    """Sum several organization snapshots (an owner with more than one organization)."""
+    total = {}
+    for payload in payloads:
+        _merge(total, payload)
+    return total
+
+
+def with_occupancy_rate(payload):
+    occupancy = payload.get("weekly_occupancy")
+    if occupancy:
+        available = occupancy.get("room_hours_available") or 0
+        occupancy["occupancy_rate"] = (
+            round(occupancy.get("room_hours_booked", 0) / available, 4) if available else None
+        )
+    return payload
@@ -1,12 +1,53 @@
-﻿from django.contrib.auth import get_user_model
-from rest_framework.decorators import api_view, permission_classes
+﻿from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from studio.models import Establishment, Organization, OrganizationMembership, Room, Student
+from studio.modules.core.conditional import compute_etag, etag_response
+from studio.modules.core.services import get_owned_org_ids
 from studio.modules.users.services import is_owner, is_platform_admin
 
-User = get_user_model()
+from .jobs import schedule_snapshot_refresh
+from .models import DashboardSnapshot
+from .snapshots import PLATFORM_SCOPE, is_stale, merge_payloads, refresh_snapshot, snapshot_scope, with_occupancy_rate
+
+
+def _load_snapshots(organization_ids=(), include_platform=False):
+    """Missing snapshots are built on the spot; stale ones are served and queued for refresh."""
+    targets = [(snapshot_scope(organization_id), organization_id) for organization_id in organization_ids]
+    if include_platform:
+        targets.append((PLATFORM_SCOPE, None))
+    stored = {
+        snapshot.scope: snapshot
+        for snapshot in DashboardSnapshot.objects.filter(scope__in=[scope for scope, _id in targets])
+    }
+
+    snapshots = {}
+    for scope, organization_id in targets:
+        snapshot = stored.get(scope)
+        if snapshot is None:
+            snapshot = refresh_snapshot(organization_id)
+        elif is_stale(snapshot):
+            schedule_snapshot_refresh(organization_id)
+        if snapshot is not None:
+            snapshots[scope] = snapshot
+    return snapshots
+
+
+def _summary_response(request, payload, snapshots):
+    # The stored rows are the validator: a refresh written by the job worker changes the ETag
+    # in every web process, with no cache token in between.
+    validators = sorted(
+        f"{snapshot.scope}:{snapshot.id}:{snapshot.generated_at.isoformat()}" for snapshot in snapshots
+    )
+
+    def render():
+        data = with_occupancy_rate(payload)
+        # Oldest contributing snapshot: the figures are at least this fresh.
+        generated_at = min((snapshot.generated_at for snapshot in snapshots), default=None)
+        data["generated_at"] = generated_at.isoformat() if generated_at else None
+        return Response(data)
+
+    return etag_response(request, compute_etag(request, validators=validators), render)
 
 
 @api_view(["GET"])
@@ -15,29 +56,18 @@ def dashboard_summary(request):
     user = request.user
 
     if is_platform_admin(user):
-        return Response(
-            {
-                "organizations": Organization.objects.count(),
-                "establishments": Establishment.objects.count(),
-                "rooms": Room.objects.count(),
-                "students": Student.objects.count(),
-                "users": User.objects.count(),
-            }
-        )
+        snapshot = _load_snapshots(include_platform=True)[PLATFORM_SCOPE]
+        return _summary_response(request, dict(snapshot.payload), [snapshot])
 
     if is_owner(user):
-        org_ids = list(
-            OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-        )
-        return Response(
-            {
-                "organizations": Organization.objects.filter(id__in=org_ids).count(),
-                "establishments": Establishment.objects.filter(organization_id__in=org_ids).count(),
-                "rooms": Room.objects.filter(establishment__organization_id__in=org_ids).count(),
-                "students": Student.objects.filter(organization_id__in=org_ids).count(),
-                "users": User.objects.count(),
-            }
-        )
+        snapshots = _load_snapshots(sorted(get_owned_org_ids(user)), include_platform=True)
+        platform = snapshots.pop(PLATFORM_SCOPE)
+        payload = merge_payloads(snapshot.payload for snapshot in snapshots.values())
+        for key in ("organizations", "establishments", "rooms", "students", "instructors"):
+            payload.setdefault(key, 0)
+        # Same as before the snapshots: owners see the platform user count.
+        payload["users"] = platform.payload.get("users", 0)
+        return _summary_response(request, payload, [*snapshots.values(), platform])
 
     return Response(
         {
@@ -0,0 +1 @@
+"""Jobs module: database-backed background job queue, worker and status API."""
@@ -0,0 +1,27 @@
+from rest_framework import serializers
+
+from .models import BackgroundJob
+
+
+class BackgroundJobSerializer(serializers.ModelSerializer):
+    status_label = serializers.CharField(source="get_status_display", read_only=True)
+
+    class Meta:
+        model = BackgroundJob
+        fields = (
+            "id",
+            "name",
+            "queue",
+            "status",
+            "status_label",
+            "attempts",
+            "max_attempts",
+            "run_at",
+            "organization",
+            "result",
+            "last_error",
+            "created_at",
+            "updated_at",
+            "finished_at",
+        )
+        read_only_fields = fields
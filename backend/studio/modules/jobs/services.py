@@ -0,0 +1,211 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+logger = logging.getLogger(__name__)
+
+JOB_HANDLERS = {}
+
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying cannot help (bad input, disabled feature...)."""
+
+
+def register_job(name, max_attempts=None):
+    """
+    Register `func(payload, job)` as the handler of job `name`.
+
+    Delivery is at-least-once: a retry, or a run requeued after its lock timed out, executes the
+    handler again (possibly while the first run is still going), so handlers must be idempotent.
+    """
+
+    def decorator(func):
+        JOB_HANDLERS[name] = (func, max_attempts)
+        return func
+
+    return decorator
+
+
+def _setting(name, default):
+    return getattr(settings, name, default)
+
+
+def enqueue_job(
+    name,
+    payload=None,
+    idempotency_key=None,
+    organization_id=None,
+    created_by=None,
+    run_at=None,
+    max_attempts=None,
+    queue="default",
+):
+    """
+    Persist a job in the current transaction (it becomes visible to workers on commit).
+
+    Reusing an idempotency key returns the existing job; a failed one is queued again.
+    """
+    if name not in JOB_HANDLERS:
+        raise ValueError(f"Job desconocido: {name}")
+    handler_max_attempts = JOB_HANDLERS[name][1]
+
+    if idempotency_key:
+        existing = BackgroundJob.objects.filter(idempotency_key=idempotency_key).first()
+        if existing:
+            return _requeue_failed(existing)
+
+    try:
+        with transaction.atomic():
+            job = BackgroundJob.objects.create(
+                name=name,
+                queue=queue,
+                payload=payload or {},
+                idempotency_key=idempotency_key or None,
+                organization_id=organization_id,
+                created_by=created_by if getattr(created_by, "pk", None) else None,
+                run_at=run_at or timezone.now(),
+                max_attempts=max_attempts or handler_max_attempts or int(_setting("STUDIO_JOB_MAX_ATTEMPTS", 5)),
+            )
+    except IntegrityError:
+        if not idempotency_key:
+            raise
+        return _requeue_failed(BackgroundJob.objects.get(idempotency_key=idempotency_key))
+
+    if _setting("STUDIO_JOBS_EAGER", False):
+        transaction.on_commit(lambda: run_job_by_id(job.id, worker_id="eager"))
+    return job
+
+
+def _requeue_failed(job):
+    if job.status != BackgroundJob.STATUS_FAILED:
+        return job
+    BackgroundJob.objects.filter(id=job.id, status=BackgroundJob.STATUS_FAILED).update(
+        status=BackgroundJob.STATUS_QUEUED,
+        attempts=0,
+        run_at=timezone.now(),
+        last_error="",
+        finished_at=None,
+        updated_at=timezone.now(),
+    )
+    job.refresh_from_db()
+    return job
+
+
+def _claim(job_id, worker_id, now):
+    return BackgroundJob.objects.filter(id=job_id, status=BackgroundJob.STATUS_QUEUED).update(
+        status=BackgroundJob.STATUS_RUNNING,
+        locked_by=worker_id,
+        locked_at=now,
+        attempts=F("attempts") + 1,
+        updated_at=now,
+    )
+
+
+def claim_next_job(worker_id, queues=None):
+    now = timezone.now()
+    runnable = BackgroundJob.objects.filter(status=BackgroundJob.STATUS_QUEUED, run_at__lte=now)
+    if queues:
+        runnable = runnable.filter(queue__in=queues)
+    runnable = runnable.order_by("run_at", "id")
+
+    if connection.features.has_select_for_update_skip_locked:
+        # Postgres: concurrent workers skip rows another worker is claiming instead of blocking.
+        with transaction.atomic():
+            job_id = runnable.select_for_update(skip_locked=True).values_list("id", flat=True).first()
+            if job_id is None or not _claim(job_id, worker_id, now):
+                return None
+        return BackgroundJob.objects.get(id=job_id)
+
+    # SQLite has no row locks; the conditional UPDATE decides which worker wins each row.
+    for job_id in runnable.values_list("id", flat=True)[:10]:
+        if _claim(job_id, worker_id, now):
+            return BackgroundJob.objects.get(id=job_id)
+    return None
+
+
+def retry_delay(attempts):
+    base = int(_setting("STUDIO_JOB_RETRY_BASE_SECONDS", 10))
+    delay = min(base * (2 ** max(0, attempts - 1)), 3600)
+    return timedelta(seconds=delay + random.uniform(0, base))
+
+
+def _finish(job, **fields):
+    """Record the outcome only while this worker still holds the job; returns False otherwise."""
+    finished = BackgroundJob.objects.filter(
+        id=job.id,
+        status=BackgroundJob.STATUS_RUNNING,
+        locked_by=job.locked_by,
+    ).update(locked_by="", locked_at=None, updated_at=timezone.now(), **fields)
+    if not finished:
+        # Requeued as stale (or failed) while running: keep whatever happened since.
+        logger.warning("Job %s #%s perdio el bloqueo de %s; se descarta su resultado", job.name, job.id, job.locked_by)
+    job.refresh_from_db()
+    return bool(finished)
+
+
+def run_job(job):
+    """Execute a claimed job and record success, a scheduled retry or the final failure."""
+    handler = JOB_HANDLERS.get(job.name)
+    now = timezone.now()
+    try:
+        if handler is None:
+            raise PermanentJobError(f"Job desconocido: {job.name}")
+        result = handler[0](job.payload or {}, job)
+    except Exception as exc:
+        retryable = not isinstance(exc, PermanentJobError) and job.attempts < job.max_attempts
+        logger.warning("Job %s #%s fallo (intento %s/%s): %s", job.name, job.id, job.attempts, job.max_attempts, exc)
+        last_error = "".join(traceback.format_exception_only(type(exc), exc)).strip()[:4000]
+        if retryable:
+            _finish(job, status=BackgroundJob.STATUS_QUEUED, run_at=now + retry_delay(job.attempts), last_error=last_error)
+        else:
+            _finish(job, status=BackgroundJob.STATUS_FAILED, finished_at=now, last_error=last_error)
+        return job
+
+    _finish(job, status=BackgroundJob.STATUS_SUCCEEDED, result=result, finished_at=timezone.now())
+    return job
+
+
+def run_job_by_id(job_id, worker_id):
+    if not _claim(job_id, worker_id, timezone.now()):
+        return None
+    return run_job(BackgroundJob.objects.get(id=job_id))
+
+
+def requeue_stale_jobs(lock_timeout=None):
+    """
+    Put back jobs whose worker died mid-run (running longer than the lock timeout).
+
+    Jobs that already used all their attempts are marked failed instead, so a job that keeps
+    crashing its worker (or always outlives the timeout) is not requeued forever. Returns
+    (requeued, failed).
+    """
+    lock_timeout = lock_timeout or int(_setting("STUDIO_JOB_LOCK_TIMEOUT", 600))
+    now = timezone.now()
+    stale = BackgroundJob.objects.filter(
+        status=BackgroundJob.STATUS_RUNNING,
+        locked_at__lt=now - timedelta(seconds=lock_timeout),
+    )
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=BackgroundJob.STATUS_FAILED,
+        locked_by="",
+        locked_at=None,
+        finished_at=now,
+        last_error=f"Sin respuesta del worker tras {lock_timeout}s en el ultimo intento",
+        updated_at=now,
+    )
+    requeued = stale.filter(attempts__lt=F("max_attempts")).update(
+        status=BackgroundJob.STATUS_QUEUED,
+        locked_by="",
+        locked_at=None,
+        run_at=now,
+        updated_at=now,
+    )
+    return requeued, failed
@@ -0,0 +1,37 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+
+from studio.modules.core.pagination import KeysetPagination
+from studio.modules.core.services import get_owned_org_ids
+from studio.modules.users.services import is_owner, is_platform_admin
+
+from .models import BackgroundJob
+from .serializers import BackgroundJobSerializer
+
+
+class BackgroundJobViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = BackgroundJob.objects.all()
+    serializer_class = BackgroundJobSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "-id")
+
+    def get_queryset(self):
+        user = self.request.user
+        queryset = super().get_queryset()
+
+        job_status = self.request.query_params.get("status")
+        name = self.request.query_params.get("name")
+        organization_id = self.request.query_params.get("organization_id")
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        if name:
+            queryset = queryset.filter(name=name)
+        if organization_id:
+            queryset = queryset.filter(organization_id=organization_id)
+
+        if is_platform_admin(user):
+            return queryset
+        if is_owner(user):
+            return queryset.filter(organization_id__in=get_owned_org_ids(user))
+        return queryset.filter(created_by=user)
@@ -0,0 +1,41 @@
+from django.db import transaction
+
+from studio.modules.jobs.services import PermanentJobError, enqueue_job, register_job
+
+from .models import Invoice, Payment
+from .services import emit_arca_invoice
+
+EMIT_INVOICE_JOB = "payments.emit_arca_invoice"
+
+
+@register_job(EMIT_INVOICE_JOB)
+def emit_invoice_job(payload, job):
+    with transaction.atomic():
+        # The payment row lock makes a second run (retry or stale requeue) wait and reuse the invoice.
+        try:
+            payment = (
+                Payment.objects.select_for_update(of=("self",))
+                .select_related("organization")
+                .get(id=payload.get("payment_id"))
+            )
+        except Payment.DoesNotExist:
+            raise PermanentJobError("Pago no encontrado")
+
+        invoice = Invoice.objects.filter(payment=payment, status=Invoice.STATUS_EMITTED).first()
+        if invoice is None:
+            try:
+                invoice = emit_arca_invoice(payment)
+            except ValueError as exc:
+                raise PermanentJobError(str(exc))
+    return {"invoice_id": invoice.id, "invoice_number": invoice.invoice_number, "cae": invoice.cae}
+
+
+def enqueue_invoice_emission(payment, created_by=None):
+    # One emission job per payment: webhook retries and repeated mark-paid calls reuse it.
+    return enqueue_job(
+        EMIT_INVOICE_JOB,
+        {"payment_id": payment.id},
+        idempotency_key=f"{EMIT_INVOICE_JOB}:{payment.id}",
+        organization_id=payment.organization_id,
+        created_by=created_by,
+    )
@@ -97,6 +97,14 @@ class Payment(models.Model):
 
     class Meta:
         ordering = ("-created_at", "id")
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="payment_created_id_idx"),
+            models.Index(fields=["organization", "-created_at", "id"], name="payment_org_created_id_idx"),
+            models.Index(
+                fields=["organization", "status", "payment_type", "-created_at"],
+                name="payment_org_status_type_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.id} - {self.organization.name} - {self.status}"
@@ -129,6 +137,9 @@ class Invoice(models.Model):
 
     class Meta:
         ordering = ("-created_at", "id")
+        indexes = [
+            models.Index(fields=["organization", "-created_at", "id"], name="invoice_org_created_id_idx"),
+        ]
 
     def __str__(self):
         return f"{self.payment_id} - {self.status}"
@@ -4,19 +4,17 @@ from rest_framework.decorators import action
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
-from studio.models import Invoice, MembershipPlan, OrganizationMembership, Payment
+from studio.models import Invoice, MembershipPlan, Payment
+from studio.modules.core.conditional import ConditionalGetMixin
+from studio.modules.core.pagination import KeysetPagination
+from studio.modules.core.services import get_owned_org_ids
 from studio.modules.users.services import is_owner, is_platform_admin, is_student
 
+from .jobs import enqueue_invoice_emission
 from .serializers import InvoiceSerializer, MembershipPlanSerializer, PaymentSerializer
 from .services import create_mercadopago_checkout, emit_arca_invoice, register_payment_status
 
 
-def get_owned_org_ids(user):
-    return list(
-        OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-    )
-
-
 class MembershipPlanViewSet(viewsets.ModelViewSet):
     queryset = MembershipPlan.objects.select_related("organization").all().order_by("id")
     serializer_class = MembershipPlanSerializer
@@ -76,12 +74,15 @@ class MembershipPlanViewSet(viewsets.ModelViewSet):
         return super().destroy(request, *args, **kwargs)
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Payment.objects.select_related(
         "organization", "student", "studio_class", "membership_plan", "created_by"
     ).all()
     serializer_class = PaymentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "id")
+    conditional_scopes = ("payments", "students", "classes", "organizations", "users")
 
     def get_queryset(self):
         user = self.request.user
@@ -136,10 +137,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         elif payment.provider == Payment.PROVIDER_MANUAL and payment.status == Payment.STATUS_APPROVED:
             register_payment_status(payment, "approved", provider_payment_id=f"MANUAL-{payment.id}")
             if payment.organization.electronic_billing_enabled:
-                try:
-                    emit_arca_invoice(payment)
-                except ValueError:
-                    pass
+                enqueue_invoice_emission(payment, created_by=user)
 
         return Response(self.get_serializer(payment).data, status=status.HTTP_201_CREATED)
 
@@ -197,10 +195,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
         register_payment_status(payment, provider_status, provider_payment_id=provider_payment_id)
         if payment.status == Payment.STATUS_APPROVED and payment.organization.electronic_billing_enabled:
-            try:
-                emit_arca_invoice(payment)
-            except ValueError:
-                pass
+            enqueue_invoice_emission(payment)
 
         return Response({"detail": "ok"}, status=status.HTTP_200_OK)
 
@@ -216,10 +211,7 @@ class PaymentViewSet(viewsets.ModelViewSet):
         provider_payment_id = request.data.get("payment_id") or f"MANUAL-{payment.id}"
         register_payment_status(payment, "approved", provider_payment_id=provider_payment_id)
         if payment.organization.electronic_billing_enabled:
-            try:
-                emit_arca_invoice(payment)
-            except ValueError:
-                pass
+            enqueue_invoice_emission(payment, created_by=user)
         return Response(self.get_serializer(payment).data, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=["post"], url_path="emit-invoice")
@@ -241,6 +233,8 @@ class InvoiceViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Invoice.objects.select_related("organization", "payment", "payment__created_by").all()
     serializer_class = InvoiceSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("-created_at", "id")
 
     def get_queryset(self):
         user = self.request.user
@@ -67,6 +67,9 @@ class SocialPost(models.Model):
 
     class Meta:
         ordering = ("-published_at", "-created_at")
+        indexes = [
+            models.Index(fields=["organization", "-created_at", "-id"], name="socialpost_org_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.organization.name} - {self.title}"
@@ -10,27 +10,16 @@ from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from studio.models import Organization, OrganizationMembership
-from studio.modules.users.services import is_owner, is_platform_admin
+from studio.models import Organization
+from studio.modules.assistant.context import invalidate_business_context
+from studio.modules.core.conditional import bump_data_versions, conditional_get
+from studio.modules.core.pagination import KeysetPagination
+from studio.modules.core.services import get_authorized_org_ids
 
 from .models import SocialAccount, SocialCampaign, SocialPost
 from .serializers import SocialAccountSerializer, SocialCampaignSerializer, SocialPostSerializer
 
 
-def get_owned_org_ids(user):
-    return list(
-        OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-    )
-
-
-def get_authorized_org_ids(user):
-    if is_platform_admin(user):
-        return list(Organization.objects.values_list("id", flat=True))
-    if is_owner(user):
-        return get_owned_org_ids(user)
-    return []
-
-
 def ensure_social_seed(organization):
     if SocialAccount.objects.filter(organization=organization).exists():
         return
@@ -95,6 +84,8 @@ def ensure_social_seed(organization):
                 published_at=now - timedelta(days=index * 7),
             )
 
+    invalidate_business_context(organization.id, "marketing")
+    bump_data_versions(organization.id, "social")
     SocialCampaign.objects.bulk_create(
         [
             SocialCampaign(
@@ -183,6 +174,9 @@ class SocialAccountViewSet(OwnedOrganizationMixin, viewsets.ModelViewSet):
 class SocialPostViewSet(OwnedOrganizationMixin, viewsets.ModelViewSet):
     queryset = SocialPost.objects.select_related("organization", "account").all()
     serializer_class = SocialPostSerializer
+    pagination_class = KeysetPagination
+    # published_at is nullable, so pages are keyed on creation time instead.
+    keyset_ordering = ("-created_at", "-id")
 
 
 class SocialCampaignViewSet(OwnedOrganizationMixin, viewsets.ModelViewSet):
@@ -192,6 +186,7 @@ class SocialCampaignViewSet(OwnedOrganizationMixin, viewsets.ModelViewSet):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@conditional_get("social", "organizations")
 def social_workspace(request):
     org_ids = get_authorized_org_ids(request.user)
     if not org_ids:
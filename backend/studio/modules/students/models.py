@@ -66,6 +66,9 @@ class StudentHistory(models.Model):
 
     class Meta:
         ordering = ("-created_at",)
+        indexes = [
+            models.Index(fields=["student", "-created_at"], name="student_history_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.student_id} - {self.event_type}"
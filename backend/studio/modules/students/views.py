@@ -1,22 +1,18 @@
-from django.contrib.auth.models import Group
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from studio.models import Establishment, Organization, OrganizationMembership, Student, StudentHistory
+from studio.models import Establishment, Organization, Student, StudentHistory
 from studio.modules.classes.models import StudioClass
-from studio.modules.users.services import ensure_roles_exist, is_instructor, is_owner, is_platform_admin, is_student
+from studio.modules.core.conditional import ConditionalGetMixin
+from studio.modules.core.pagination import KeysetPagination
+from studio.modules.core.services import get_owned_org_ids
+from studio.modules.users.services import assign_user_role, is_instructor, is_owner, is_platform_admin, is_student
 
 from .serializers import StudentHistorySerializer, StudentSerializer
 
 
-def get_owned_org_ids(user):
-    return list(
-        OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-    )
-
-
 def get_instructor_org_ids(user):
     return list(StudioClass.objects.filter(instructor=user).values_list("organization_id", flat=True).distinct())
 
@@ -31,10 +27,19 @@ def create_student_history(student, event_type, description, actor=None, metadat
     )
 
 
-class StudentViewSet(viewsets.ModelViewSet):
+class StudentViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Student.objects.select_related("organization", "user").prefetch_related("establishments", "history_events").all().order_by("id")
     serializer_class = StudentSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    keyset_ordering = ("id",)
+    conditional_scopes = ("students", "organizations", "users")
+
+    def get_conditional_scopes(self):
+        # Instructors see the students of organizations they teach in, which follows their classes.
+        if is_instructor(self.request.user):
+            return self.conditional_scopes + ("classes",)
+        return self.conditional_scopes
 
     def _is_admin_owner_or_instructor(self, user):
         return is_platform_admin(user) or is_owner(user) or is_instructor(user)
@@ -111,8 +116,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         student = Student.objects.get(id=response.data["id"])
 
         if student.user_id:
-            ensure_roles_exist()
-            student.user.groups.add(Group.objects.get(name="alumno"))
+            assign_user_role(student.user, "alumno")
 
         create_student_history(
             student,
@@ -181,8 +185,7 @@ class StudentViewSet(viewsets.ModelViewSet):
         except Organization.DoesNotExist:
             return Response({"detail": "La empresa no esta disponible en marketplace"}, status=status.HTTP_400_BAD_REQUEST)
 
-        ensure_roles_exist()
-        request.user.groups.add(Group.objects.get(name="alumno"))
+        assign_user_role(request.user, "alumno")
 
         first_name = (request.data.get("first_name") or request.user.first_name or request.user.username or "Alumno").strip()
         last_name = (request.data.get("last_name") or request.user.last_name or "").strip()
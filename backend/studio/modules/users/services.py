@@ -1,15 +1,149 @@
-﻿from django.contrib.auth.models import Group
+﻿import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import transaction
+
+from studio.models import PlatformSetting, PlatformSubscriptionPlan
+from studio.modules.core.cache import is_shared_cache
 
 ROLE_NAMES = ("admin", "owner", "instructor", "alumno")
 
+ROLE_CACHE_KEY = "studio:user-roles:{user_id}"
+PLATFORM_CATALOG_VERSION_KEY = "studio:platform-catalog-version:{name}"
+PLATFORM_CATALOG_KEY = "studio:platform-catalog:{name}:v{version}"
+_ROLE_NAMES_ATTR = "_studio_role_names"
+
 
 def ensure_roles_exist():
     for role_name in ROLE_NAMES:
         Group.objects.get_or_create(name=role_name)
 
 
+def _get_role_cache_timeout():
+    # Role changes must reach every worker; a process-local cache keeps only the per-request copy.
+    if not is_shared_cache():
+        return 0
+    return int(getattr(settings, "STUDIO_ROLE_CACHE_TIMEOUT", 0) or 0)
+
+
+def _load_role_names(user):
+    # Group names are resolved once per user instance (request.user lives for one request)
+    # and optionally shared across requests through the cache backend.
+    if not user or not getattr(user, "is_authenticated", False) or not user.pk:
+        return ()
+
+    role_names = getattr(user, _ROLE_NAMES_ATTR, None)
+    if role_names is not None:
+        return role_names
+
+    timeout = _get_role_cache_timeout()
+    cache_key = ROLE_CACHE_KEY.format(user_id=user.pk)
+    role_names = cache.get(cache_key) if timeout else None
+    if role_names is None:
+        role_names = tuple(user.groups.values_list("name", flat=True))
+        if timeout:
+            cache.set(cache_key, role_names, timeout)
+
+    setattr(user, _ROLE_NAMES_ATTR, tuple(role_names))
+    return getattr(user, _ROLE_NAMES_ATTR)
+
+
+def invalidate_user_roles(user=None, user_ids=None):
+    ids = set(user_ids or [])
+    if user is not None:
+        if hasattr(user, _ROLE_NAMES_ATTR):
+            delattr(user, _ROLE_NAMES_ATTR)
+        if user.pk:
+            ids.add(user.pk)
+    if ids:
+        keys = [ROLE_CACHE_KEY.format(user_id=user_id) for user_id in ids]
+        # After commit, so no reader can cache the pre-commit groups again (a revoked role would
+        # stay effective for the whole timeout).
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def load_platform_setting():
+    """The PlatformSetting row straight from the database (use it for writes)."""
+    setting, _ = PlatformSetting.objects.get_or_create(singleton_key="default")
+    return setting
+
+
+def _load_active_platform_plans():
+    return tuple(PlatformSubscriptionPlan.objects.filter(is_active=True).order_by("sort_order", "id"))
+
+
+PLATFORM_CATALOGS = {
+    "setting": load_platform_setting,
+    "plans": _load_active_platform_plans,
+}
+
+# name -> (version, checked_at, value), kept per worker process in front of the shared cache.
+_platform_catalog_local = {}
+
+
+def _get_platform_catalog(name, use_local=True):
+    """
+    Rarely-changing platform rows served from process memory, then the shared cache.
+
+    The shared entry is keyed by a version stamp that admin writes bump; the process copy is
+    trusted for STUDIO_PLATFORM_CATALOG_LOCAL_SECONDS before the stamp is checked again
+    (use_local=False always checks it). Returned instances are shared: read them, never save them.
+    Without a shared cache backend the stamp cannot reach other processes, so rows are read directly.
+    """
+    timeout = int(getattr(settings, "STUDIO_PLATFORM_CATALOG_CACHE_TIMEOUT", 0) or 0)
+    if not timeout or not is_shared_cache():
+        return PLATFORM_CATALOGS[name]()
+
+    now = time.monotonic()
+    local = _platform_catalog_local.get(name)
+    if use_local and local and now - local[1] < float(getattr(settings, "STUDIO_PLATFORM_CATALOG_LOCAL_SECONDS", 0) or 0):
+        return local[2]
+
+    version_key = PLATFORM_CATALOG_VERSION_KEY.format(name=name)
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, uuid.uuid4().hex, None)
+        version = cache.get(version_key)
+    if local and local[0] == version:
+        value = local[2]
+    else:
+        cache_key = PLATFORM_CATALOG_KEY.format(name=name, version=version)
+        value = cache.get(cache_key)
+        if value is None:
+            value = PLATFORM_CATALOGS[name]()
+            cache.set(cache_key, value, timeout)
+    _platform_catalog_local[name] = (version, now, value)
+    return value
+
+
+def invalidate_platform_catalog(name):
+    def bump():
+        _platform_catalog_local.pop(name, None)
+        cache.set(PLATFORM_CATALOG_VERSION_KEY.format(name=name), uuid.uuid4().hex, None)
+
+    # After commit, so no reader can cache the pre-commit rows under the new stamp.
+    transaction.on_commit(bump)
+
+
+def get_platform_setting(use_local=True):
+    return _get_platform_catalog("setting", use_local=use_local)
+
+
+def get_active_platform_plans(use_local=True):
+    return _get_platform_catalog("plans", use_local=use_local)
+
+
+def assign_user_role(user, role_name):
+    ensure_roles_exist()
+    user.groups.add(Group.objects.get(name=role_name))
+    invalidate_user_roles(user)
+
+
 def has_role(user, role_name):
-    return user.groups.filter(name=role_name).exists()
+    return role_name in _load_role_names(user)
 
 
 def is_owner(user):
@@ -29,4 +163,4 @@ def is_platform_admin(user):
 
 
 def get_user_roles(user):
-    return list(user.groups.values_list("name", flat=True))
+    return list(_load_role_names(user))
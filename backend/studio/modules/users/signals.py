@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from studio.models import PlatformSetting, PlatformSubscriptionPlan
+from studio.modules.core.marketplace import invalidate_marketplace
+
+from .services import invalidate_platform_catalog, invalidate_user_roles
+
+User = get_user_model()
+
+
+@receiver(m2m_changed, sender=User.groups.through, dispatch_uid="studio_invalidate_user_roles")
+def invalidate_roles_on_group_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("pre_clear", "post_add", "post_remove", "post_clear"):
+        return
+
+    if not reverse:
+        invalidate_user_roles(instance)
+        return
+
+    # Reverse side (group.user_set): pk_set holds user ids, except on clear where we snapshot members first.
+    if action == "pre_clear":
+        invalidate_user_roles(user_ids=list(instance.user_set.values_list("id", flat=True)))
+    elif pk_set:
+        invalidate_user_roles(user_ids=pk_set)
+
+
+@receiver(post_save, sender=PlatformSetting, dispatch_uid="studio_invalidate_platform_setting_save")
+@receiver(post_delete, sender=PlatformSetting, dispatch_uid="studio_invalidate_platform_setting_delete")
+def invalidate_platform_setting_cache(sender, **kwargs):
+    invalidate_platform_catalog("setting")
+    invalidate_marketplace()
+
+
+@receiver(post_save, sender=PlatformSubscriptionPlan, dispatch_uid="studio_invalidate_platform_plans_save")
+@receiver(post_delete, sender=PlatformSubscriptionPlan, dispatch_uid="studio_invalidate_platform_plans_delete")
+def invalidate_platform_plans_cache(sender, **kwargs):
+    invalidate_platform_catalog("plans")
+    invalidate_marketplace()
@@ -1,16 +1,20 @@
-import json
+import hashlib
 import os
 import re
-import urllib.error
+import time
 import urllib.parse
-import urllib.request
-from datetime import timedelta
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
 
+import httpx
+from django.conf import settings
 from django.contrib.auth import authenticate, get_user_model
 from django.contrib.auth.models import Group
+from django.core.cache import cache
 from django.db import transaction
-from django.db.models import Prefetch
 from django.utils import timezone
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
 from rest_framework import status, viewsets
 from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
@@ -19,23 +23,41 @@ from rest_framework_simplejwt.tokens import RefreshToken
 
 from studio.models import (
     Establishment,
+    MarketplaceListing,
     Organization,
     OrganizationMembership,
-    PlatformSetting,
     PlatformSubscriptionPlan,
     Student,
     StudentHistory,
 )
+from studio.modules.core.cache import is_shared_cache
+from studio.modules.core.http_client import get_http_metrics, get_json
+from studio.modules.core.marketplace import get_marketplace_version, serialize_listing
+from studio.modules.core.pagination import KeysetPagination, parse_page_size
+from studio.modules.core.services import get_owned_org_ids
 from studio.modules.students.serializers import StudentSerializer
 
 from .serializers import PlatformSettingSerializer, PlatformSubscriptionPlanSerializer, UserSerializer
-from .services import ROLE_NAMES, ensure_roles_exist, get_user_roles, is_platform_admin, is_student
+from .services import (
+    ROLE_NAMES,
+    assign_user_role,
+    ensure_roles_exist,
+    get_active_platform_plans,
+    get_platform_setting,
+    get_user_roles,
+    invalidate_user_roles,
+    is_platform_admin,
+    is_student,
+    load_platform_setting,
+)
 
 User = get_user_model()
 
-GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v3/userinfo"
-FACEBOOK_ME_URL = "https://graph.facebook.com/me"
-FACEBOOK_DEBUG_TOKEN_URL = "https://graph.facebook.com/debug_token"
+# Overridable so tests can point SSO verification at a local stub (fake_llm_server).
+GOOGLE_USERINFO_URL = os.getenv("GOOGLE_USERINFO_URL", "https://www.googleapis.com/oauth2/v3/userinfo")
+FACEBOOK_ME_URL = os.getenv("FACEBOOK_ME_URL", "https://graph.facebook.com/me")
+FACEBOOK_DEBUG_TOKEN_URL = os.getenv("FACEBOOK_DEBUG_TOKEN_URL", "https://graph.facebook.com/debug_token")
+SSO_IDENTITY_CACHE_KEY = "studio:sso-identity:{provider}:{digest}"
 
 
 class SSOValidationError(Exception):
@@ -45,11 +67,6 @@ class SSOValidationError(Exception):
         self.message = message
 
 
-def get_platform_setting():
-    setting, _ = PlatformSetting.objects.get_or_create(singleton_key="default")
-    return setting
-
-
 def _build_tokens(user):
     refresh = RefreshToken.for_user(user)
     return {"refresh": str(refresh), "access": str(refresh.access_token)}
@@ -98,10 +115,21 @@ def _parse_full_name(full_name):
 
 
 def _http_get_json(url, headers=None):
-    request = urllib.request.Request(url, headers=headers or {})
-    with urllib.request.urlopen(request, timeout=10) as response:
-        body = response.read().decode("utf-8")
-        return json.loads(body)
+    return get_json(url, headers=headers, timeout=10)
+
+
+def _sso_identity_cache_key(provider, token, *scope):
+    # Only a digest of the token is stored; scope ties the entry to the app that verified it.
+    digest = hashlib.sha256("|".join((token, *scope)).encode("utf-8")).hexdigest()
+    return SSO_IDENTITY_CACHE_KEY.format(provider=provider, digest=digest)
+
+
+def _cache_sso_identity(cache_key, identity, expires_at=None):
+    timeout = int(getattr(settings, "STUDIO_SSO_TOKEN_CACHE_TIMEOUT", 0) or 0)
+    if expires_at:
+        timeout = min(timeout, int(expires_at - time.time()))
+    if timeout > 0:
+        cache.set(cache_key, identity, timeout)
 
 
 def _verify_google_access_token(access_token):
@@ -109,6 +137,11 @@ def _verify_google_access_token(access_token):
     if not token:
         raise SSOValidationError("missing_access_token", "google_access_token es requerido")
 
+    cache_key = _sso_identity_cache_key(Student.AUTH_PROVIDER_GOOGLE, token)
+    identity = cache.get(cache_key)
+    if identity is not None:
+        return identity
+
     payload = _http_get_json(
         GOOGLE_USERINFO_URL,
         headers={"Authorization": f"Bearer {token}"},
@@ -117,13 +150,16 @@ def _verify_google_access_token(access_token):
     if not email:
         raise SSOValidationError("email_not_provided", "Google no devolvio email para esta cuenta")
 
-    return {
+    identity = {
         "email": email,
         "first_name": (payload.get("given_name") or "").strip(),
         "last_name": (payload.get("family_name") or "").strip(),
         "full_name": (payload.get("name") or "").strip(),
         "provider_user_id": (payload.get("sub") or "").strip(),
     }
+    # Userinfo carries no expiry; the configured TTL stays well under Google's access token lifetime.
+    _cache_sso_identity(cache_key, identity)
+    return identity
 
 
 def _verify_facebook_access_token(access_token):
@@ -131,6 +167,14 @@ def _verify_facebook_access_token(access_token):
     if not token:
         raise SSOValidationError("missing_access_token", "facebook_access_token es requerido")
 
+    setting = get_platform_setting()
+    app_id = (setting.facebook_app_id or os.getenv("FACEBOOK_APP_ID", "") or "").strip()
+    app_secret = (setting.facebook_app_secret or os.getenv("FACEBOOK_APP_SECRET", "") or "").strip()
+    cache_key = _sso_identity_cache_key(Student.AUTH_PROVIDER_FACEBOOK, token, app_id)
+    identity = cache.get(cache_key)
+    if identity is not None:
+        return identity
+
     query = urllib.parse.urlencode(
         {
             "fields": "id,name,email,first_name,last_name",
@@ -142,9 +186,7 @@ def _verify_facebook_access_token(access_token):
     if not email:
         raise SSOValidationError("email_not_provided", "Facebook no devolvio email. Asegura permiso de email.")
 
-    setting = get_platform_setting()
-    app_id = (setting.facebook_app_id or os.getenv("FACEBOOK_APP_ID", "") or "").strip()
-    app_secret = (setting.facebook_app_secret or os.getenv("FACEBOOK_APP_SECRET", "") or "").strip()
+    expires_at = None
     if app_id and app_secret:
         app_token = f"{app_id}|{app_secret}"
         debug_query = urllib.parse.urlencode({"input_token": token, "access_token": app_token})
@@ -155,32 +197,26 @@ def _verify_facebook_access_token(access_token):
         token_app_id = str(data.get("app_id") or "")
         if token_app_id and token_app_id != app_id:
             raise SSOValidationError("app_not_authorized", "Token de Facebook no corresponde a esta aplicacion")
+        # 0 means a non-expiring token.
+        expires_at = int(data.get("expires_at") or 0) or None
 
-    return {
+    identity = {
         "email": email,
         "first_name": (me_payload.get("first_name") or "").strip(),
         "last_name": (me_payload.get("last_name") or "").strip(),
         "full_name": (me_payload.get("name") or "").strip(),
         "provider_user_id": str(me_payload.get("id") or "").strip(),
     }
+    _cache_sso_identity(cache_key, identity, expires_at=expires_at)
+    return identity
 
 
 def _assign_student_role(user):
-    ensure_roles_exist()
-    user.groups.add(Group.objects.get(name="alumno"))
+    assign_user_role(user, "alumno")
 
 
 def _assign_owner_role(user):
-    ensure_roles_exist()
-    user.groups.add(Group.objects.get(name="owner"))
-
-
-def _get_active_platform_plans():
-    return PlatformSubscriptionPlan.objects.filter(is_active=True).order_by("sort_order", "id")
-
-
-def _get_public_platform_plans():
-    return _get_active_platform_plans().filter(is_public=True)
+    assign_user_role(user, "owner")
 
 
 def _get_self_signup_plan(code):
@@ -242,23 +278,6 @@ def _serialize_public_platform_plan(plan):
     }
 
 
-def _get_marketplace_organizations():
-    active_establishments = Establishment.objects.filter(is_active=True).order_by("name")
-    return (
-        Organization.objects.filter(is_active=True, subscription_enabled=True)
-        .prefetch_related(Prefetch("establishments", queryset=active_establishments))
-        .order_by("name")
-    )
-
-
-def _marketplace_logo_payload(logo):
-    # Avoid sending oversized base64 blobs in public listings.
-    if not logo:
-        return ""
-    value = str(logo)
-    return value if len(value) <= 120_000 else ""
-
-
 def _parse_establishment_ids(raw_value):
     if raw_value is None:
         return []
@@ -331,45 +350,92 @@ def _upsert_student_profile_for_org(
     return student, created
 
 
+MARKETPLACE_PAGE_KEY = "studio:marketplace-page:{digest}"
+
+
+def _marketplace_query(request):
+    """The normalized parameters the marketplace reads; no other query parameter changes the body."""
+    params = request.GET
+    query = {
+        "name": (params.get("name") or "").strip(),
+        "city": (params.get("city") or "").strip().lower(),
+    }
+    if KeysetPagination.cursor_query_param in params or KeysetPagination.page_size_query_param in params:
+        query["page_size"] = parse_page_size(params.get(KeysetPagination.page_size_query_param))
+        query["cursor"] = params.get(KeysetPagination.cursor_query_param) or ""
+    return query
+
+
+def _marketplace_etag(request):
+    # Same version, host (logo and next URLs are absolute) and normalized query means the same body.
+    if not is_shared_cache():
+        # The version only moves in the process that handled the write: no validators, no page cache.
+        return None
+    token, _modified = get_marketplace_version()
+    query = urllib.parse.urlencode(sorted(_marketplace_query(request).items()))
+    raw = f"{token}|{request.scheme}://{request.get_host()}|{query}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def _marketplace_last_modified(_request):
+    if not is_shared_cache():
+        return None
+    _token, modified = get_marketplace_version()
+    return datetime.fromtimestamp(modified, tz=dt_timezone.utc)
+
+
+def _build_marketplace_payload(request):
+    # Built on a version change only, so read the platform catalog past the process copy.
+    setting = get_platform_setting(use_local=False)
+    plans = [_serialize_public_platform_plan(plan) for plan in get_active_platform_plans(use_local=False) if plan.is_public]
+
+    query = _marketplace_query(request)
+    listings = MarketplaceListing.objects.all()
+    if query["name"]:
+        listings = listings.filter(name__icontains=query["name"])
+    if query["city"]:
+        listings = listings.filter(search_cities__contains=query["city"])
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(listings, request)
+    if page is not None:
+        # The next link is cached with the page: build it from the normalized query only.
+        canonical = {key: value for key, value in query.items() if value and key != "cursor"}
+        paginator.base_url = request.build_absolute_uri(f"{request.path}?{urllib.parse.urlencode(canonical)}")
+
+    payload = {
+        "allow_google_sso": setting.allow_google_sso,
+        "allow_facebook_sso": setting.allow_facebook_sso,
+        "google_client_id": setting.google_client_id or os.getenv("GOOGLE_CLIENT_ID", "") or os.getenv("VITE_GOOGLE_CLIENT_ID", ""),
+        "facebook_app_id": setting.facebook_app_id or os.getenv("FACEBOOK_APP_ID", "") or os.getenv("VITE_FACEBOOK_APP_ID", ""),
+        "plans": plans,
+        "organizations": [serialize_listing(listing, request) for listing in (listings if page is None else page)],
+    }
+    if page is not None:
+        payload["next"] = paginator.get_next_link()
+        payload["page_size"] = paginator.page_size
+    return payload
+
+
+@condition(etag_func=_marketplace_etag, last_modified_func=_marketplace_last_modified)
 @api_view(["GET"])
 @permission_classes([AllowAny])
-def auth_marketplace_organizations(_request):
-    setting = get_platform_setting()
-    organizations = _get_marketplace_organizations()
-    plans = [_serialize_public_platform_plan(plan) for plan in _get_public_platform_plans()]
-    payload = [
-        {
-            "id": org.id,
-            "name": org.name,
-            "logo": _marketplace_logo_payload(org.logo),
-            "subscription_plan": org.subscription_plan,
-            "city": org.fiscal_city or "",
-            "address": org.address or "",
-            "establishments": [
-                {
-                    "id": est.id,
-                    "name": est.name,
-                    "address": est.address or "",
-                    "city": est.city or "",
-                    "open_time": est.open_time,
-                    "close_time": est.close_time,
-                    "weekly_hours": est.weekly_hours,
-                }
-                for est in org.establishments.all()
-            ],
-        }
-        for org in organizations
-    ]
-    return Response(
-        {
-            "allow_google_sso": setting.allow_google_sso,
-            "allow_facebook_sso": setting.allow_facebook_sso,
-            "google_client_id": setting.google_client_id or os.getenv("GOOGLE_CLIENT_ID", "") or os.getenv("VITE_GOOGLE_CLIENT_ID", ""),
-            "facebook_app_id": setting.facebook_app_id or os.getenv("FACEBOOK_APP_ID", "") or os.getenv("VITE_FACEBOOK_APP_ID", ""),
-            "plans": plans,
-            "organizations": payload,
-        }
-    )
+def auth_marketplace_organizations(request):
+    """
+    Public marketplace: SSO flags, public plans and listed organizations.
+
+    Served from MarketplaceListing rows and cached per normalized query until the marketplace
+    version changes. `name`/`city` filter; `page_size`/`cursor` opt into keyset pages.
+    """
+    digest = _marketplace_etag(request)
+    cache_key = MARKETPLACE_PAGE_KEY.format(digest=digest) if digest else None
+    payload = cache.get(cache_key) if cache_key else None
+    if payload is None:
+        payload = _build_marketplace_payload(request)
+        if cache_key:
+            cache.set(cache_key, payload, settings.STUDIO_MARKETPLACE_CACHE_TIMEOUT)
+    response = Response(payload)
+    patch_cache_control(response, public=True, max_age=settings.STUDIO_MARKETPLACE_MAX_AGE)
+    return response
 
 
 @api_view(["POST"])
@@ -551,9 +617,10 @@ def _auth_sso(provider, request):
             identity = _verify_facebook_access_token(request.data.get("facebook_access_token"))
     except SSOValidationError as exc:
         return Response({"code": exc.code, "detail": exc.message}, status=status.HTTP_400_BAD_REQUEST)
-    except urllib.error.HTTPError as exc:
-        detail = f"{provider} SSO rechazo el token ({exc.code})"
-        code = "invalid_token" if exc.code in (400, 401, 403) else "provider_http_error"
+    except httpx.HTTPStatusError as exc:
+        status_code = exc.response.status_code
+        detail = f"{provider} SSO rechazo el token ({status_code})"
+        code = "invalid_token" if status_code in (400, 401, 403) else "provider_http_error"
         return Response({"code": code, "detail": detail}, status=status.HTTP_400_BAD_REQUEST)
     except Exception:
         return Response(
@@ -732,9 +799,7 @@ def auth_me(request):
     else:
         portal = "student"
 
-    owned_org_ids = list(
-        OrganizationMembership.objects.filter(user=user, is_active=True).values_list("organization_id", flat=True)
-    )
+    owned_org_ids = get_owned_org_ids(user)
     student_org_ids = list(Student.objects.filter(user=user).values_list("organization_id", flat=True))
 
     return Response(
@@ -836,6 +901,7 @@ class UserViewSet(viewsets.ModelViewSet):
         allowed_groups = Group.objects.filter(name__in=ROLE_NAMES)
         user.groups.remove(*allowed_groups)
         user.groups.add(Group.objects.get(name=role_name))
+        invalidate_user_roles(user)
 
         serializer = self.get_serializer(user)
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -860,7 +926,7 @@ class UserViewSet(viewsets.ModelViewSet):
         except Organization.DoesNotExist:
             return Response({"detail": "Organizacion no encontrada"}, status=status.HTTP_404_NOT_FOUND)
 
-        user.groups.add(Group.objects.get(name="owner"))
+        assign_user_role(user, "owner")
         OrganizationMembership.objects.update_or_create(
             user=user,
             organization=organization,
@@ -919,12 +985,18 @@ class PlatformSettingViewSet(viewsets.ViewSet):
         return Response(serializer.data)
 
     def create(self, request):
-        setting = get_platform_setting()
+        # Write to a fresh row: the cached instance is shared with other requests.
+        setting = load_platform_setting()
         serializer = PlatformSettingSerializer(setting, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"], url_path="http-metrics")
+    def http_metrics(self, _request):
+        # Counters live in each worker process; repeated calls may land on different workers.
+        return Response(get_http_metrics())
+
 
 class PlatformSubscriptionPlanViewSet(viewsets.ModelViewSet):
     queryset = PlatformSubscriptionPlan.objects.all().order_by("sort_order", "id")
@@ -0,0 +1,126 @@
+import asyncio
+import threading
+from http.server import ThreadingHTTPServer
+from unittest import mock
+
+import httpx
+from django.test import SimpleTestCase, override_settings
+
+from studio.management.commands.fake_llm_server import FakeLLMHandler
+from studio.modules.core import http_client
+
+
+class CountingHandler(FakeLLMHandler):
+    hits = 0
+    hits_lock = threading.Lock()
+
+    def do_GET(self):
+        with CountingHandler.hits_lock:
+            CountingHandler.hits += 1
+        super().do_GET()
+
+
+@override_settings(
+    STUDIO_HTTP_BREAKER_THRESHOLD=2,
+    STUDIO_HTTP_BREAKER_COOLDOWN=60,
+    STUDIO_HTTP_RETRY_BUDGET_RATIO=0,
+    STUDIO_HTTP_RETRY_BUDGET_MAX=1,
+)
+class HttpClientTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), CountingHandler)
+        cls.server.daemon_threads = True
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/debug_token"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        # Fresh pool and host state per test: both are process-wide.
+        http_client._hosts.clear()
+        http_client._client = None
+        CountingHandler.hits = 0
+        CountingHandler.status_code = 200
+
+    def tearDown(self):
+        if http_client._client is not None:
+            http_client._client.close()
+            http_client._client = None
+
+    def _open_breaker(self):
+        state = http_client.host_state(self.url)
+        for _ in range(2):
+            state.record(False, 1.0)
+        return state
+
+    def test_pool_reuses_the_connection(self):
+        for _ in range(3):
+            self.assertEqual(http_client.request("GET", self.url).status_code, 200)
+        metrics = http_client.host_state(self.url).snapshot()
+        self.assertEqual(metrics["requests"], 3)
+        self.assertEqual(metrics["new_connections"], 1)
+        self.assertEqual(metrics["connection_reuse_ratio"], 0.667)
+
+    def test_breaker_opens_after_consecutive_failures(self):
+        CountingHandler.status_code = 503
+        for _ in range(2):
+            self.assertEqual(http_client.request("GET", self.url).status_code, 503)
+        with self.assertRaises(http_client.CircuitOpenError):
+            http_client.request("GET", self.url)
+        self.assertEqual(CountingHandler.hits, 2)
+        metrics = http_client.host_state(self.url).snapshot()
+        self.assertEqual(metrics["circuit"], "open")
+        self.assertEqual(metrics["short_circuited"], 1)
+
+    @override_settings(STUDIO_HTTP_BREAKER_COOLDOWN=0)
+    def test_half_open_probe_closes_the_breaker(self):
+        self._open_breaker()
+        self.assertEqual(http_client.request("GET", self.url).status_code, 200)
+        self.assertEqual(http_client.host_state(self.url).snapshot()["circuit"], "closed")
+
+    def test_retry_budget_caps_retries(self):
+        CountingHandler.status_code = 503
+        with mock.patch("studio.modules.core.http_client.time.sleep"):
+            response = http_client.request("GET", self.url, retries=3)
+        self.assertEqual(response.status_code, 503)
+        # One token in the budget and none deposited: a single retry, not three.
+        self.assertEqual(CountingHandler.hits, 2)
+        self.assertEqual(http_client.host_state(self.url).snapshot()["retries"], 1)
+
+    @override_settings(STUDIO_HTTP_BREAKER_COOLDOWN=0)
+    def test_probe_released_after_non_transport_error(self):
+        state = self._open_breaker()
+        with mock.patch.object(httpx.Client, "request", side_effect=httpx.InvalidURL("url invalida")):
+            with self.assertRaises(httpx.InvalidURL):
+                http_client.request("GET", self.url)
+        self.assertFalse(state.half_open_probe)
+        self.assertEqual(http_client.request("GET", self.url).status_code, 200)
+
+    @override_settings(STUDIO_HTTP_BREAKER_COOLDOWN=0)
+    def test_async_probe_released_when_cancelled(self):
+        state = self._open_breaker()
+
+        async def cancelled_stream():
+            with mock.patch.object(httpx.AsyncClient, "stream", side_effect=asyncio.CancelledError):
+                async with http_client.AsyncStream("GET", self.url):
+                    pass
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(cancelled_stream())
+        self.assertFalse(state.half_open_probe)
+        self.assertTrue(state.allow_request())
+
+    def test_async_stream_records_the_request(self):
+        async def fetch():
+            async with http_client.AsyncStream("GET", self.url) as response:
+                await response.aread()
+                return response.status_code
+
+        self.assertEqual(asyncio.run(fetch()), 200)
+        self.assertEqual(http_client.host_state(self.url).snapshot()["requests"], 1)
@@ -1,17 +1,22 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
+from studio.modules.analytics.views import analytics_occupancy, analytics_revenue
+from studio.modules.assistant.streaming import ai_assistant_ask_stream
 from studio.modules.assistant.views import ai_assistant_ask, ai_assistant_config, ai_assistant_history
+from studio.modules.bookings.views import ClassBookingViewSet
 from studio.modules.classes.views import (
     StudioClassViewSet,
     instructor_collection,
     instructor_detail,
     instructor_settlement_collection,
     instructor_settlement_generate,
+    instructor_settlement_generate_batch,
     instructor_settlement_mark_paid,
 )
 from studio.modules.core.views import EstablishmentViewSet, OrganizationViewSet, RoomViewSet
 from studio.modules.dashboard.views import dashboard_summary
+from studio.modules.jobs.views import BackgroundJobViewSet
 from studio.modules.payments.views import InvoiceViewSet, MembershipPlanViewSet, PaymentViewSet
 from studio.modules.social.views import (
     SocialAccountViewSet,
@@ -38,6 +43,7 @@ router.register("organizations", OrganizationViewSet, basename="organization")
 router.register("establishments", EstablishmentViewSet, basename="establishment")
 router.register("rooms", RoomViewSet, basename="room")
 router.register("classes", StudioClassViewSet, basename="class")
+router.register("class-bookings", ClassBookingViewSet, basename="class-booking")
 router.register("membership-plans", MembershipPlanViewSet, basename="membership-plan")
 router.register("payments", PaymentViewSet, basename="payment")
 router.register("invoices", InvoiceViewSet, basename="invoice")
@@ -48,6 +54,7 @@ router.register("students", StudentViewSet, basename="student")
 router.register("users", UserViewSet, basename="user")
 router.register("platform-settings", PlatformSettingViewSet, basename="platform-setting")
 router.register("platform-subscription-plans", PlatformSubscriptionPlanViewSet, basename="platform-subscription-plan")
+router.register("jobs", BackgroundJobViewSet, basename="job")
 
 urlpatterns = [
     path("auth/portal-login/", auth_portal_login, name="auth-portal-login"),
@@ -60,16 +67,24 @@ urlpatterns = [
     path("ai-assistant/config/", ai_assistant_config, name="ai-assistant-config"),
     path("ai-assistant/history/", ai_assistant_history, name="ai-assistant-history"),
     path("ai-assistant/ask/", ai_assistant_ask, name="ai-assistant-ask"),
+    path("ai-assistant/ask/stream/", ai_assistant_ask_stream, name="ai-assistant-ask-stream"),
     path("social/workspace/", social_workspace, name="social-workspace"),
     path("instructors/", instructor_collection, name="instructor-collection"),
     path("instructors/<int:profile_id>/", instructor_detail, name="instructor-detail"),
     path("instructor-settlements/", instructor_settlement_collection, name="instructor-settlement-collection"),
     path("instructor-settlements/generate/", instructor_settlement_generate, name="instructor-settlement-generate"),
+    path(
+        "instructor-settlements/generate-batch/",
+        instructor_settlement_generate_batch,
+        name="instructor-settlement-generate-batch",
+    ),
     path(
         "instructor-settlements/<int:settlement_id>/mark-paid/",
         instructor_settlement_mark_paid,
         name="instructor-settlement-mark-paid",
     ),
     path("dashboard/summary/", dashboard_summary, name="dashboard-summary"),
+    path("analytics/revenue/", analytics_revenue, name="analytics-revenue"),
+    path("analytics/occupancy/", analytics_occupancy, name="analytics-occupancy"),
     path("", include(router.urls)),
 ]